@@ -2,8 +2,14 @@ import streamlit as st
 import datetime
 from pathlib import Path
 
-from core.database import get_connection, create_tables, insert_presets
-from core.notification import check_notifications
+from core.database import get_connection, get_pool_stats, is_wal_mode
+from core.writer import get_write_queue
+from core.cache import get_read_cache
+from core.instrumentation import begin_rerun, finish_rerun
+from utils.recurrence import materialize_due_occurrences
+from core.migrations import ensure_schema
+from core.notification import check_notifications, show_pending_notifications
+from core.search import search
 from modules import dashboard, login, overdue, profile, task, task_detail
 from core.date_utils import get_current_date, format_date
 
@@ -26,16 +32,14 @@ if "logged_in" not in st.session_state:
         "mock_now": datetime.date.today(),
         "current_page": "Dashboard",
         "task_filter": None,
-        "view_preference": None,
-        "db_conn": None
+        "view_preference": None
     })
 
-# Database Setup
-if st.session_state.db_conn is None:
-    st.session_state.db_conn = get_connection()
-conn = st.session_state.db_conn
-create_tables(conn)
-insert_presets(conn)
+# Database Setup (runs pending migrations once per process)
+ensure_schema()
+
+# Opt-in SQL/render instrumentation for this rerun
+begin_rerun(st.session_state, st.session_state.current_page, st.session_state.username)
 
 # Logo
 if st.session_state.logged_in:
@@ -59,6 +63,27 @@ with st.sidebar:
         if st.button(label, use_container_width=True):
             st.session_state.current_page = target
 
+    # Full-text search; each result opens its group
+    query = st.text_input("🔍 Search", key="search_query", placeholder="Tasks, groups, templates")
+    if query.strip():
+        conn = get_connection()
+        try:
+            results = search(conn, st.session_state.username, query)
+        finally:
+            conn.close()
+        if not results:
+            st.caption("No matches")
+        for number, result in enumerate(results):
+            icon = "🏷️" if result.is_template else ("📦" if result.kind == "group" else "📋")
+            if st.button(f"{icon} {result.title}", key=f"search_result_{number}", use_container_width=True):
+                st.session_state.current_view_group = result.group_id
+                st.session_state.current_page = "Group Details"
+                st.rerun()
+            if result.kind == "task":
+                st.caption(f"in {result.group_name}" + (f" · {result.snippet}" if result.snippet else ""))
+            elif result.snippet:
+                st.caption(result.snippet)
+
     if st.session_state.username == "admin":
         st.divider()
         st.header("⏰ Debug Controls")
@@ -69,23 +94,57 @@ with st.sidebar:
         if st.button("⏩ Advance 1 Day"):
             st.session_state.mock_now += datetime.timedelta(days=1)
             st.rerun()
+        with st.expander("🔌 Connection Pool"):
+            st.json(get_pool_stats())
+            if is_wal_mode():
+                st.caption("Writer queue")
+                st.json(get_write_queue().stats())
+        with st.expander("🗃️ Read Cache"):
+            st.json(get_read_cache().stats())
+            if st.button("Clear Read Cache"):
+                get_read_cache().clear()
+        with st.expander("🔬 Instrumentation"):
+            st.checkbox("Record SQL and render timings", key="instrumentation")
+            trace = st.session_state.get("last_rerun_trace")
+            if trace is None:
+                st.caption("No traced rerun yet. Enable recording (or AUTOTASK_INSTRUMENTATION=1) and interact.")
+            else:
+                summary = trace.summary()
+                st.caption(f"Previous rerun: {summary['page']}" + (" (interrupted)" if summary["interrupted"] else ""))
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Rerun", f"{summary['duration_ms']:.0f} ms")
+                col2.metric("Statements", summary["statements"])
+                col3.metric("SQL", f"{summary['sql_ms']:.0f} ms")
+                st.json(summary["sections"])
+                if summary["repeated"]:
+                    st.caption("Repeated statements (possible N+1)")
+                    st.dataframe(summary["repeated"], use_container_width=True)
+                st.caption("All statements")
+                st.dataframe([
+                    {"caller": caller, "ms": round(seconds * 1000, 2), "rows": rows, "sql": sql}
+                    for sql, seconds, rows, caller in trace.statements
+                ], use_container_width=True)
 
     st.divider()
     if st.button("🚪 Logout", use_container_width=True):
         st.session_state.logged_in = False
         st.session_state.username = None
-        if st.session_state.db_conn:
-            st.session_state.db_conn.close()
-            st.session_state.db_conn = None
         st.rerun()
 
-# Notifications
+# Notifications (queued by core.notification_worker, only displayed here)
 if st.session_state.username:
-    c = conn.cursor()
-    c.execute("SELECT username FROM users WHERE username = ?", (st.session_state.username,))
-    user = c.fetchone()
-    if user:
-        check_notifications(conn, st.session_state.username)
+    # Create recurring task occurrences that have come due (the worker does this for everyone).
+    # Always on the real clock: a mock date only changes what views project
+    materialize_due_occurrences(datetime.date.today(), st.session_state.username)
+
+    conn = get_connection()
+    try:
+        # The worker runs on the real clock, so scan inline when debugging with a mock date
+        if get_current_date() != datetime.date.today():
+            check_notifications(conn, st.session_state.username)
+        show_pending_notifications(conn, st.session_state.username)
+    finally:
+        conn.close()
 
 # Page Routing
 page = st.session_state.current_page
@@ -98,4 +157,6 @@ elif page == "Overdue Tasks":
 elif page == "User Profile":
     profile.show_profile()
 elif page == "Group Details":
-    task_detail.show_group_details()
\ No newline at end of file
+    task_detail.show_group_details()
+
+finish_rerun(st.session_state)
@@ -0,0 +1,7 @@
+#bench/__init__.py
+"""
+Synthetic workload generator (bench.generate) and benchmark suite (bench.run).
+
+    python -m bench.generate --database bench.db --users 200 --groups 5 --tasks 40
+    python -m bench.run --database bench.db --output results.json
+"""
@@ -0,0 +1,152 @@
+#bench/generate.py
+"""
+Fills a database with a synthetic workload.
+
+Every user gets `groups` groups of `tasks` tasks. A group's tasks are laid
+out in `depth` layers; each task after the first layer gets up to `fan_out`
+prerequisites from the layer before it, so link chains are `depth` deep.
+Due dates spread around `today`, so there is a mix of completed, overdue
+and upcoming tasks, and each completed task gets `history` history rows.
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+
+from core import database
+from core.migrations import ensure_schema
+
+def _layers(n_tasks: int, depth: int):
+    """Splits task positions 0..n_tasks-1 into `depth` consecutive layers."""
+    depth = max(1, min(depth, n_tasks))
+    return [list(range(n_tasks * k // depth, n_tasks * (k + 1) // depth)) for k in range(depth)]
+
+def generate(
+    database_name: str,
+    users: int = 100,
+    groups: int = 5,
+    tasks: int = 40,
+    depth: int = 4,
+    fan_out: int = 2,
+    history: int = 2,
+    templates: int = 1,
+    recurring: float = 0.01,
+    today: datetime.date = None,
+    prefix: str = "bench",
+    seed: int = 42
+) -> dict:
+    """
+    Generates the workload with bulk inserts and returns the number of rows
+    added per table. Usernames are `{prefix}00000`, `{prefix}00001`, ...
+    (password "bench"); the first user also owns the generated templates.
+    """
+    ensure_schema(database_name)
+    today = today or datetime.date.today()
+    rng = random.Random(seed)
+    conn = sqlite3.connect(database_name)
+    try:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM users WHERE username LIKE ?", (f"{prefix}%",))
+        if c.fetchone()[0]:
+            raise ValueError(f"Users with prefix '{prefix}' already exist; use another --prefix")
+
+        usernames = [f"{prefix}{u:05d}" for u in range(users)]
+        c.executemany("""
+            INSERT INTO users (username, password, full_name, telegram_chat_id)
+            VALUES (?, 'bench', ?, ?)
+        """, [(name, f"Bench user {u}", str(100000 + u)) for u, name in enumerate(usernames)])
+
+        owners = [(name, 0) for name in usernames for _ in range(groups)]
+        owners += [(usernames[0], 1)] * (templates if usernames else 0)
+        counts = {"users": users, "groups": 0, "tasks": 0, "task_link": 0, "task_history": 0}
+        layers = _layers(tasks, depth) if tasks else []
+
+        for group_number, (owner, is_template) in enumerate(owners):
+            start = today + datetime.timedelta(days=rng.randint(-60, 30))
+            c.execute("""
+                INSERT INTO groups (group_name, created_by, color, remarks, isTemplate, start_date)
+                VALUES (?, ?, '#4CAF50', ?, ?, ?)
+            """, (f"{'Template' if is_template else 'Group'} {group_number}", owner,
+                  "Generated by bench.generate", is_template, start.isoformat()))
+            group_id = c.lastrowid
+            counts["groups"] += 1
+
+            rows = []
+            for layer_number, layer in enumerate(layers):
+                for position in layer:
+                    due = start + datetime.timedelta(days=layer_number * 7 + rng.randint(0, 6))
+                    completed = int(not is_template and due < today and rng.random() < 0.6)
+                    pattern = rng.choice(["weekly", "monthly"]) if not is_template and rng.random() < recurring else None
+                    rows.append((
+                        group_id, f"Task {position}", "Generated task", rng.choice([0, 1, 3, 7]),
+                        due.isoformat(), completed, owner, pattern, rng.randint(1, 3), rng.randint(1, 5),
+                        due.isoformat() if completed else None
+                    ))
+            c.executemany("""
+                INSERT INTO tasks (
+                    group_id, task_name, description, notification_days, due_date, completed,
+                    created_by, recurrence_pattern, priority, estimated_duration, completion_date
+                ) VALUES (?,?,?,?,?,?,?,?,?,?,?)
+            """, rows)
+            counts["tasks"] += len(rows)
+
+            c.execute("SELECT task_id, completed, completion_date FROM tasks WHERE group_id=? ORDER BY task_id",
+                      (group_id,))
+            task_rows = c.fetchall()
+            task_ids = [row[0] for row in task_rows]
+
+            links = []
+            for previous, layer in zip(layers, layers[1:]):
+                for position in layer:
+                    for pre_position in rng.sample(previous, min(fan_out, len(previous))):
+                        links.append((task_ids[position], task_ids[pre_position], rng.choice([0, 0, 1, 2])))
+            c.executemany("""
+                INSERT INTO task_link (task_id, pre_task_id, link_type, delay_days)
+                VALUES (?, ?, 'prerequisite', ?)
+            """, links)
+            counts["task_link"] += len(links)
+
+            events = [(task_id, status, completion_date, owner)
+                      for task_id, completed, completion_date in task_rows if completed
+                      for status in (["reopened", "completed"] * history)[-history:]]
+            c.executemany("""
+                INSERT INTO task_history (task_id, status_change, changed_at, changed_by)
+                VALUES (?, ?, ?, ?)
+            """, events)
+            counts["task_history"] += len(events)
+
+        conn.commit()
+        return counts
+    finally:
+        conn.close()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic AutoTask workload")
+    parser.add_argument("--database", default=database.DATABASE_NAME,
+                        help="SQLite database file (default: %(default)s)")
+    parser.add_argument("--users", type=int, default=100, help="number of users (default: %(default)s)")
+    parser.add_argument("--groups", type=int, default=5, help="groups per user (default: %(default)s)")
+    parser.add_argument("--tasks", type=int, default=40, help="tasks per group (default: %(default)s)")
+    parser.add_argument("--depth", type=int, default=4, help="prerequisite chain depth (default: %(default)s)")
+    parser.add_argument("--fan-out", type=int, default=2,
+                        help="prerequisites per task (default: %(default)s)")
+    parser.add_argument("--history", type=int, default=2,
+                        help="history rows per completed task (default: %(default)s)")
+    parser.add_argument("--templates", type=int, default=1,
+                        help="template groups owned by the first user (default: %(default)s)")
+    parser.add_argument("--recurring", type=float, default=0.01,
+                        help="fraction of tasks with a recurrence pattern (default: %(default)s)")
+    parser.add_argument("--today", type=datetime.date.fromisoformat, help="reference date (default: today)")
+    parser.add_argument("--prefix", default="bench", help="username prefix (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    counts = generate(
+        args.database, users=args.users, groups=args.groups, tasks=args.tasks, depth=args.depth,
+        fan_out=args.fan_out, history=args.history, templates=args.templates,
+        recurring=args.recurring, today=args.today, prefix=args.prefix, seed=args.seed
+    )
+    print(f"Generated in {args.database}: {counts}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#bench/run.py
+"""
+Benchmark suite for the app's hot functions.
+
+Runs the real functions headlessly on a scratch copy of the database (no
+Streamlit runtime, so nothing renders and session caches are bypassed),
+and prints latency percentiles and statements per call as JSON:
+
+    python -m bench.run --database bench.db --output results.json
+    python -m bench.run --database bench.db --baseline results.json   # exit 1 on regressions
+
+Statements are counted on the calling thread's pooled connection, which
+every get_connection() and (outside WAL mode) run_write() call reuses.
+queries_per_call, which --baseline gates, counts the execute/executemany
+calls the code makes (recorded through core.instrumentation).
+sqlite_statements_per_call is everything SQLite's trace callback reports,
+including each executemany row, trigger bodies and FTS5's internal
+statements; it is informational, so a new trigger does not read as an
+N+1 regression.
+
+The check_notifications_due_<N> cases seed N freshly due tasks for a
+dedicated user before every call (untimed and uncounted), so the scan
+does its full bookkeeping each time; their statement counts should stay
+flat as N grows.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from core import database, queries
+from core.config import GROUP_LIST_PAGE_SIZE
+from core.database import create_tables, insert_presets
+from core.instrumentation import RerunTrace, TracedConnection, tracing
+from core.migrations import ensure_schema
+from core.notification import check_notifications
+from core.writer import run_write
+from utils.calendar import get_visible_window, get_events_in_window
+from utils.dashboard_data import load_dashboard_data
+from utils.status_helpers import get_group_summaries, get_task_status, get_user_summary
+from utils.templates import create_from_template
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+class StatementCounter:
+    """
+    Statements issued by the code (recorded on a RerunTrace) and, as the
+    sqlite3 trace callback, every statement SQLite runs. The callback is
+    only attached for one untimed call per benchmark: SQLite expands the
+    bound parameters for every trigger step it reports, which would swamp
+    the latency of set-based statements with large JSON parameters.
+    """
+
+    def __init__(self, conn=None):
+        self.trace = RerunTrace("bench", None)
+        self.sqlite = 0
+        self.conn = conn
+        self.raw = False
+
+    def __call__(self, statement):
+        self.sqlite += 1
+
+    @property
+    def count(self) -> int:
+        return len(self.trace.statements)
+
+    def reset(self) -> None:
+        self.trace.statements.clear()
+        self.sqlite = 0
+
+    def attach(self, conn) -> None:
+        conn.set_trace_callback(self if self.raw else None)
+
+    def count_sqlite(self, fn: Callable) -> int:
+        """Calls fn() once with the trace callback attached; returns the statements SQLite ran."""
+        self.raw, self.sqlite = True, 0
+        if self.conn is not None:
+            self.attach(self.conn)
+        try:
+            fn()
+        finally:
+            self.raw = False
+            if self.conn is not None:
+                self.attach(self.conn)
+        return self.sqlite
+
+class Benchmark(NamedTuple):
+    fn: Callable
+    counter: Optional[StatementCounter] = None    # default: the run's connection counter
+    setup: Optional[Callable] = None              # runs before every call, untimed and uncounted
+    iterations: Optional[int] = None              # cap on the run's iteration count
+
+def measure(fn: Callable, iterations: int, counter: StatementCounter, setup: Callable = None) -> dict:
+    """Times `iterations` calls of fn() after one warm-up call, then counts one more untimed call."""
+    if setup:
+        setup()
+    fn()
+    samples = []
+    statements = 0
+    for _ in range(iterations):
+        if setup:
+            setup()
+        counter.reset()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+        statements += counter.count
+    if setup:
+        setup()
+    sqlite_statements = counter.count_sqlite(fn)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p90_ms": round(percentile(samples, 0.90) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "queries_per_call": round(statements / iterations, 2),
+        "sqlite_statements_per_call": sqlite_statements,
+    }
+
+def dataset_summary(conn) -> Dict[str, int]:
+    c = conn.cursor()
+    summary = {}
+    for table in ("users", "groups", "tasks", "task_link", "task_history", "notification_outbox"):
+        c.execute(f"SELECT COUNT(*) FROM {table}")
+        summary[table] = c.fetchone()[0]
+    return summary
+
+# Freshly due tasks per check_notifications_due_<N> call, and the user they belong to
+DUE_TASK_COUNTS = (100, 1000, 10000)
+DUE_USER = "bench_due"
+
+def build_benchmarks(conn, username: str, today: datetime.date, rng: random.Random) -> Dict[str, Callable]:
+    """The benchmarked calls, bound to a sample user, task and template."""
+    c = conn.cursor()
+    c.execute("SELECT task_id FROM tasks WHERE created_by = ?", (username,))
+    task_ids = [row[0] for row in c.fetchall()] or [0]
+    c.execute("""
+        SELECT g.group_id FROM groups g JOIN tasks t ON t.group_id = g.group_id
+        WHERE g.isTemplate = 1 GROUP BY g.group_id ORDER BY COUNT(*) DESC LIMIT 1
+    """)
+    template = c.fetchone()
+    start, end = get_visible_window("month", today)
+    today_str = today.isoformat()
+
+    def group_list_queries():
+        c.execute(queries.USER_GROUPS_PAGE, (username, "", 0, GROUP_LIST_PAGE_SIZE + 1))
+        c.fetchall()
+        get_group_summaries(conn, username, today_str)
+
+    def copy_template():
+        # Rolled back so every iteration copies into the same database state
+        c.execute("""
+            INSERT INTO groups (group_name, created_by, isTemplate, start_date)
+            VALUES ('bench copy', ?, 0, ?)
+        """, (username, today_str))
+        create_from_template(conn, template[0], c.lastrowid, today, username, True)
+        conn.rollback()
+
+    def seed_due_tasks(write_conn, count):
+        # Half due today (reminders), half overdue (off-track alerts); half with Telegram on
+        wc = write_conn.cursor()
+        wc.execute("DELETE FROM notification_outbox WHERE username = ?", (DUE_USER,))
+        wc.execute("DELETE FROM tasks WHERE created_by = ?", (DUE_USER,))
+        wc.execute("""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+            INSERT INTO tasks (group_id, task_name, due_date, notification_days, telegram_notify, created_by)
+            SELECT ?, 'Due task ' || i, CASE WHEN i % 2 THEN ? ELSE date(?, '-1 day') END, 0, i % 4 < 2, ?
+            FROM n
+        """, (count, due_group, today_str, today_str, DUE_USER))
+
+    def create_due_user(write_conn):
+        wc = write_conn.cursor()
+        wc.execute("INSERT OR IGNORE INTO users (username, password) VALUES (?, '')", (DUE_USER,))
+        wc.execute("INSERT INTO groups (group_name, created_by, isTemplate) VALUES ('bench due', ?, 0)", (DUE_USER,))
+        return wc.lastrowid
+
+    due_group = run_write(create_due_user)
+    presets_counter = StatementCounter()
+
+    def fresh_presets():
+        memory = sqlite3.connect(":memory:")
+        create_tables(memory)
+        presets_counter.attach(memory)
+        insert_presets(TracedConnection(memory, presets_counter.trace))
+        memory.close()
+
+    benchmarks = {
+        "check_notifications": lambda: check_notifications(conn, username, today),
+        "dashboard_counts": lambda: get_user_summary(conn, username, today_str),
+        "dashboard_data": lambda: load_dashboard_data(conn, username, today),
+        "display_group_list_queries": group_list_queries,
+        "get_events_in_window": lambda: get_events_in_window(username, start, end),
+        "get_task_status": lambda: get_task_status(conn, rng.choice(task_ids)),
+        "insert_presets": Benchmark(fresh_presets, presets_counter),
+    }
+    for count in DUE_TASK_COUNTS:
+        benchmarks[f"check_notifications_due_{count}"] = Benchmark(
+            lambda: check_notifications(conn, DUE_USER, today),
+            setup=lambda count=count: run_write(seed_due_tasks, count),
+            iterations=3,
+        )
+    if template:
+        benchmarks["create_from_template"] = copy_template
+    return benchmarks
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Benchmarks whose p50 or statement count grew beyond `tolerance` x the baseline."""
+    regressions = []
+    for name, result in results["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if result["p50_ms"] > before["p50_ms"] * tolerance:
+            regressions.append(f"{name}: p50 {before['p50_ms']} -> {result['p50_ms']} ms")
+        if result["queries_per_call"] > before["queries_per_call"] * tolerance:
+            regressions.append(f"{name}: queries {before['queries_per_call']} -> {result['queries_per_call']}")
+    return regressions
+
+def run(database_name: str, iterations: int = 50, username: str = None,
+        today: datetime.date = None, only: List[str] = None, seed: int = 42) -> dict:
+    """Runs the suite on a scratch copy of database_name and returns the JSON-ready results."""
+    today = today or datetime.date.today()
+    scratch_dir = tempfile.mkdtemp(prefix="autotask-bench-")
+    scratch = os.path.join(scratch_dir, "bench.db")
+    shutil.copy(database_name, scratch)
+    database.DATABASE_NAME = scratch
+    ensure_schema(scratch)
+
+    counter = StatementCounter()
+    with tracing(counter.trace):
+        return _run_suite(database_name, scratch_dir, counter, iterations, username, today, only, seed)
+
+def _run_suite(database_name, scratch_dir, counter, iterations, username, today, only, seed) -> dict:
+    conn = database.get_connection()  # held for the run; nested checkouts reuse it
+    try:
+        c = conn.cursor()
+        if username is None:
+            c.execute("SELECT created_by FROM tasks GROUP BY created_by ORDER BY COUNT(*) DESC LIMIT 1")
+            row = c.fetchone()
+            username = row[0] if row else "admin"
+
+        summary = dataset_summary(conn)
+        counter.conn = conn
+        results = {}
+        for name, benchmark in build_benchmarks(conn, username, today, random.Random(seed)).items():
+            if only and name not in only:
+                continue
+            if not isinstance(benchmark, Benchmark):
+                benchmark = Benchmark(benchmark)
+            results[name] = measure(benchmark.fn, min(iterations, benchmark.iterations or iterations),
+                                    benchmark.counter or counter, benchmark.setup)
+    finally:
+        conn.close()
+        database.get_pool().close_all()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return {
+        "database": os.path.abspath(database_name),
+        "dataset": summary,
+        "user": username,
+        "today": today.isoformat(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "results": results,
+    }
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark AutoTask's hot functions")
+    parser.add_argument("--database", default=database.DATABASE_NAME,
+                        help="SQLite database to copy and benchmark (default: %(default)s)")
+    parser.add_argument("--iterations", type=int, default=50, help="timed calls per benchmark (default: %(default)s)")
+    parser.add_argument("--user", help="user to benchmark (default: the one with most tasks)")
+    parser.add_argument("--today", type=datetime.date.fromisoformat, help="reference date (default: today)")
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="allowed slowdown factor against the baseline (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = run(args.database, args.iterations, args.user, args.today, args.only)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
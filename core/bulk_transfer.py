@@ -0,0 +1,553 @@
+#core/bulk_transfer.py
+"""
+Streaming bulk export and import of users' groups, tasks, links and history.
+
+Export streams (table, row) records table by table (groups, tasks,
+task_link, task_history) straight off SQLite cursors, so memory stays flat
+however many tasks are exported. Three formats:
+
+    jsonl    one file, one {"table": ..., column: value, ...} object per line
+    csv      a directory with one <table>.csv per table
+    parquet  a directory with one <table>.parquet per table (needs pyarrow)
+
+Import first loads the records into temporary staging tables with chunked
+executemany calls, then checks them: every reference resolves, owners
+exist, links stay within a group and no group's links form a cycle.
+Nothing is written unless every check passes. New ids are reserved up
+front and the staged rows are copied into the real tables, one
+transaction per chunk of whole groups, with the old ids mapped to new
+ones inside SQLite. The summary counter and search index triggers run as
+for any other insert.
+
+    python -m core.bulk_transfer export --user alice --user bob department.jsonl
+    python -m core.bulk_transfer import --owner carol department.jsonl
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sqlite3
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core import database
+from core.config import TRANSFER_CHUNK_SIZE
+from core.migrations import ensure_schema
+from utils.schedule import topological_order
+
+# Exported columns per table, in export order. Ids are the source database's
+# and are mapped to new ids on import.
+COLUMNS = {
+    "groups": ("group_id", "group_name", "created_by", "color", "remarks", "isTemplate",
+               "category", "start_date", "end_date"),
+    "tasks": ("task_id", "group_id", "task_name", "description", "notification_days", "due_date",
+              "completed", "notified", "created_by", "recurrence_pattern", "recurrence_end_date",
+              "telegram_notify", "priority", "estimated_duration", "actual_duration",
+              "completion_date", "last_notification_date", "recurrence_parent_id",
+              "recurrence_watermark"),
+    "task_link": ("task_id", "pre_task_id", "link_type", "delay_days"),
+    "task_history": ("task_id", "status_change", "changed_at", "changed_by", "notes"),
+}
+
+INTEGER_COLUMNS = {
+    "group_id", "isTemplate", "task_id", "notification_days", "completed", "notified",
+    "telegram_notify", "priority", "estimated_duration", "actual_duration",
+    "recurrence_parent_id", "pre_task_id", "delay_days",
+}
+
+FORMATS = ("jsonl", "csv", "parquet")
+
+Record = Tuple[str, tuple]
+
+def _select(alias: str, table: str) -> str:
+    return ", ".join(f"{alias}.{column}" for column in COLUMNS[table])
+
+# Groups of the exported users, then their tasks, the links between tasks of
+# the same group and the tasks' history. Only groups are sorted: sorting the
+# other tables would buffer them whole.
+_EXPORT_SQL = {
+    "groups": f"""
+        SELECT {_select("g", "groups")}
+        FROM groups g
+        WHERE g.created_by IN (SELECT value FROM json_each(:owners))
+        ORDER BY g.group_id
+    """,
+    "tasks": f"""
+        SELECT {_select("t", "tasks")}
+        FROM groups g
+        JOIN tasks t ON t.group_id = g.group_id
+        WHERE g.created_by IN (SELECT value FROM json_each(:owners))
+    """,
+    "task_link": f"""
+        SELECT {_select("l", "task_link")}
+        FROM groups g
+        JOIN tasks t ON t.group_id = g.group_id
+        JOIN task_link l ON l.task_id = t.task_id
+        JOIN tasks p ON p.task_id = l.pre_task_id AND p.group_id = t.group_id
+        WHERE g.created_by IN (SELECT value FROM json_each(:owners))
+    """,
+    "task_history": f"""
+        SELECT {_select("h", "task_history")}
+        FROM groups g
+        JOIN tasks t ON t.group_id = g.group_id
+        JOIN task_history h ON h.task_id = t.task_id
+        WHERE g.created_by IN (SELECT value FROM json_each(:owners))
+    """,
+}
+
+def export_records(conn, usernames: Iterable[str], chunk_size: int = TRANSFER_CHUNK_SIZE) -> Iterator[Record]:
+    """Yields (table, row) for the users' groups (templates included), tasks, links and history."""
+    owners = json.dumps(list(usernames))
+    for table, sql in _EXPORT_SQL.items():
+        c = conn.cursor()
+        c.execute(sql, {"owners": owners})
+        while True:
+            rows = c.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield table, row
+
+def _pyarrow():
+    """pyarrow and pyarrow.parquet, which only the parquet format needs."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("The parquet format needs pyarrow (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+def _arrow_schema(pa, table: str):
+    return pa.schema([(column, pa.int64() if column in INTEGER_COLUMNS else pa.string())
+                      for column in COLUMNS[table]])
+
+_json = json.JSONEncoder(ensure_ascii=False)
+
+def write_jsonl(records: Iterable[Record], path: str, chunk_size: int = TRANSFER_CHUNK_SIZE) -> Dict[str, int]:
+    """Writes records as JSON Lines, leaving out NULL columns. Returns the number of rows written per table."""
+    counts = Counter()
+    with open(path, "w", encoding="utf-8") as f:
+        for table, row in records:
+            record = {column: value for column, value in zip(COLUMNS[table], row) if value is not None}
+            record["table"] = table
+            f.write(_json.encode(record) + "\n")
+            counts[table] += 1
+    return {table: counts[table] for table in COLUMNS}
+
+def write_csv(records: Iterable[Record], directory: str, chunk_size: int = TRANSFER_CHUNK_SIZE) -> Dict[str, int]:
+    """Writes one <table>.csv per table into directory. NULLs become empty fields."""
+    os.makedirs(directory, exist_ok=True)
+    counts = Counter()
+    files = {table: open(os.path.join(directory, f"{table}.csv"), "w", newline="", encoding="utf-8")
+             for table in COLUMNS}
+    try:
+        writers = {table: csv.writer(f) for table, f in files.items()}
+        for table, writer in writers.items():
+            writer.writerow(COLUMNS[table])
+        for table, row in records:
+            writers[table].writerow(row)
+            counts[table] += 1
+    finally:
+        for f in files.values():
+            f.close()
+    return {table: counts[table] for table in COLUMNS}
+
+def write_parquet(records: Iterable[Record], directory: str, chunk_size: int = TRANSFER_CHUNK_SIZE) -> Dict[str, int]:
+    """Writes one <table>.parquet per table into directory, one row group per chunk."""
+    pa, pq = _pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    counts = Counter()
+    writers = {table: pq.ParquetWriter(os.path.join(directory, f"{table}.parquet"), _arrow_schema(pa, table))
+               for table in COLUMNS}
+    buffered: Dict[str, List[tuple]] = {table: [] for table in COLUMNS}
+
+    def flush(table):
+        rows = buffered[table]
+        if rows:
+            writers[table].write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in
+                 zip(zip(*rows), writers[table].schema)],
+                schema=writers[table].schema
+            ))
+            counts[table] += len(rows)
+            rows.clear()
+
+    try:
+        for table, row in records:
+            buffered[table].append(row)
+            if len(buffered[table]) >= chunk_size:
+                flush(table)
+        for table in COLUMNS:
+            flush(table)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return {table: counts[table] for table in COLUMNS}
+
+def read_jsonl(path: str, chunk_size: int = TRANSFER_CHUNK_SIZE) -> Iterator[Record]:
+    """Yields (table, row) from a JSON Lines export; missing columns are NULL."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            table = record.get("table")
+            if table not in COLUMNS:
+                raise ValueError(f"Line {number}: unknown table {table!r}")
+            yield table, tuple(record.get(column) for column in COLUMNS[table])
+
+def read_csv(directory: str, chunk_size: int = TRANSFER_CHUNK_SIZE) -> Iterator[Record]:
+    """Yields (table, row) from the <table>.csv files present in directory; empty fields are NULL."""
+    for table, columns in COLUMNS.items():
+        path = os.path.join(directory, f"{table}.csv")
+        if not os.path.exists(path):
+            continue
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                yield table, tuple(record.get(column) or None for column in columns)
+
+def read_parquet(directory: str, chunk_size: int = TRANSFER_CHUNK_SIZE) -> Iterator[Record]:
+    """Yields (table, row) from the <table>.parquet files present in directory, a chunk at a time."""
+    _, pq = _pyarrow()
+    for table, columns in COLUMNS.items():
+        path = os.path.join(directory, f"{table}.parquet")
+        if not os.path.exists(path):
+            continue
+        parquet_file = pq.ParquetFile(path)
+        present = [column for column in columns if column in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=present):
+            data = batch.to_pydict()
+            for row in zip(*(data.get(column) or [None] * batch.num_rows for column in columns)):
+                yield table, row
+
+WRITERS: Dict[str, Callable] = {"jsonl": write_jsonl, "csv": write_csv, "parquet": write_parquet}
+READERS: Dict[str, Callable] = {"jsonl": read_jsonl, "csv": read_csv, "parquet": read_parquet}
+
+_STAGING_TABLES = {
+    "groups": "import_groups",
+    "tasks": "import_tasks",
+    "task_link": "import_links",
+    "task_history": "import_history",
+}
+
+def _create_staging(conn) -> None:
+    """Empty TEMP staging tables; seq numbers rows in arrival order and becomes the new id's offset."""
+    c = conn.cursor()
+    _drop_staging(conn)
+
+    def columns(table):
+        return ", ".join(f"{column} {'INTEGER' if column in INTEGER_COLUMNS else 'TEXT'}"
+                         for column in COLUMNS[table])
+
+    c.execute(f"CREATE TEMP TABLE import_groups (seq INTEGER PRIMARY KEY, {columns('groups')})")
+    c.execute(f"CREATE TEMP TABLE import_tasks (seq INTEGER PRIMARY KEY, {columns('tasks')})")
+    c.execute(f"CREATE TEMP TABLE import_links ({columns('task_link')})")
+    c.execute(f"CREATE TEMP TABLE import_history (seq INTEGER PRIMARY KEY, {columns('task_history')})")
+
+def _drop_staging(conn) -> None:
+    for staging in _STAGING_TABLES.values():
+        conn.execute(f"DROP TABLE IF EXISTS temp.{staging}")
+
+def _stage(conn, records: Iterable[Record], chunk_size: int) -> Dict[str, int]:
+    """Loads records into the staging tables, chunk_size rows per executemany. Returns rows per table."""
+    c = conn.cursor()
+    inserts = {
+        table: f"INSERT INTO {staging} ({', '.join(COLUMNS[table])}) "
+               f"VALUES ({', '.join('?' * len(COLUMNS[table]))})"
+        for table, staging in _STAGING_TABLES.items()
+    }
+    buffered: Dict[str, List[tuple]] = {table: [] for table in COLUMNS}
+    counts = Counter()
+
+    def flush(table):
+        c.executemany(inserts[table], buffered[table])
+        counts[table] += len(buffered[table])
+        buffered[table].clear()
+
+    # Staging only writes the temp database, so this takes no lock on the main one
+    c.execute("BEGIN")
+    try:
+        for table, row in records:
+            buffered[table].append(row)
+            if len(buffered[table]) >= chunk_size:
+                flush(table)
+        for table in COLUMNS:
+            flush(table)
+        # Indexed once loaded, which is cheaper than maintaining them row by row
+        c.execute("CREATE UNIQUE INDEX temp.idx_import_groups_id ON import_groups(group_id)")
+        c.execute("CREATE UNIQUE INDEX temp.idx_import_tasks_id ON import_tasks(task_id)")
+        c.execute("CREATE INDEX temp.idx_import_tasks_group ON import_tasks(group_id, task_id)")
+        c.execute("CREATE INDEX temp.idx_import_links_task ON import_links(task_id)")
+        c.execute("CREATE INDEX temp.idx_import_history_task ON import_history(task_id)")
+        c.execute("COMMIT")
+    except sqlite3.IntegrityError as e:
+        c.execute("ROLLBACK")
+        raise ValueError(f"The import repeats a group or task id ({e})")
+    except BaseException:
+        c.execute("ROLLBACK")
+        raise
+    return {table: counts[table] for table in COLUMNS}
+
+def _report(c, problems: List[str], description: str, sql: str) -> None:
+    """Adds a problem with a count and examples if the offending-rows query returns any rows."""
+    c.execute(f"SELECT COUNT(*) FROM ({sql})")
+    count = c.fetchone()[0]
+    if count:
+        c.execute(f"SELECT * FROM ({sql}) LIMIT 5")
+        examples = ", ".join(str(row[0]) for row in c.fetchall())
+        problems.append(f"{count} {description} (e.g. {examples})")
+
+def validate_staged(conn) -> List[str]:
+    """Problems that would stop the staged rows from being imported; empty if they can go in."""
+    c = conn.cursor()
+    problems: List[str] = []
+    _report(c, problems, "groups or tasks without an id", """
+        SELECT seq FROM import_groups WHERE group_id IS NULL
+        UNION ALL SELECT seq FROM import_tasks WHERE task_id IS NULL
+    """)
+    _report(c, problems, "tasks in groups that are not in the import", """
+        SELECT t.task_id FROM import_tasks t
+        WHERE t.group_id IS NULL
+           OR t.group_id NOT IN (SELECT group_id FROM import_groups WHERE group_id IS NOT NULL)
+    """)
+    _report(c, problems, "history rows of tasks that are not in the import", """
+        SELECT h.task_id FROM import_history h
+        WHERE h.task_id IS NULL OR h.task_id NOT IN (SELECT task_id FROM import_tasks WHERE task_id IS NOT NULL)
+    """)
+    _report(c, problems, "owners that are not users", """
+        SELECT DISTINCT created_by FROM (
+            SELECT created_by FROM import_groups UNION ALL SELECT created_by FROM import_tasks
+        )
+        WHERE created_by IS NULL OR created_by NOT IN (SELECT username FROM main.users)
+    """)
+
+    # Cycles: one group's links at a time, so memory follows the largest group
+    c.execute("""
+        SELECT t.group_id, l.task_id, l.pre_task_id
+        FROM import_tasks t
+        JOIN import_links l ON l.task_id = t.task_id
+        JOIN import_tasks p ON p.task_id = l.pre_task_id AND p.group_id = t.group_id
+        ORDER BY t.group_id
+    """)
+    checked_links = 0
+    for group_id, links in itertools.groupby(c, key=lambda link: link[0]):
+        prerequisites: Dict[int, List] = {}
+        for _, task_id, pre_task_id in links:
+            prerequisites.setdefault(task_id, []).append((pre_task_id, 0))
+            prerequisites.setdefault(pre_task_id, [])
+            checked_links += 1
+        _, _, cyclic = topological_order(dict.fromkeys(prerequisites), prerequisites)
+        if cyclic:
+            problems.append(f"group {group_id}: prerequisite links form a cycle "
+                            f"(tasks on or after it: {', '.join(map(str, sorted(cyclic)[:5]))})")
+
+    # Links the cycle check did not reach point outside the import or their group
+    c.execute("SELECT COUNT(*) FROM import_links")
+    if c.fetchone()[0] != checked_links:
+        _report(c, problems, "links to or from tasks that are not in the import", """
+            SELECT l.task_id FROM import_links l
+            WHERE l.task_id IS NULL OR l.pre_task_id IS NULL
+               OR l.task_id NOT IN (SELECT task_id FROM import_tasks WHERE task_id IS NOT NULL)
+               OR l.pre_task_id NOT IN (SELECT task_id FROM import_tasks WHERE task_id IS NOT NULL)
+        """)
+        _report(c, problems, "links between tasks of different groups", """
+            SELECT l.task_id FROM import_links l
+            JOIN import_tasks t ON t.task_id = l.task_id
+            JOIN import_tasks p ON p.task_id = l.pre_task_id
+            WHERE t.group_id IS NOT p.group_id
+        """)
+    return problems
+
+def _reserve_ids(c, table: str, id_column: str, count: int) -> int:
+    """Moves table's AUTOINCREMENT counter past `count` new ids. Returns the id before the first."""
+    c.execute(f"""
+        SELECT MAX(IFNULL((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+                   IFNULL((SELECT MAX({id_column}) FROM {table}), 0))
+    """, (table,))
+    base = c.fetchone()[0]
+    c.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (base + count, table))
+    if c.rowcount == 0:
+        c.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, base + count))
+    return base
+
+def _group_chunks(conn, chunk_size: int) -> List[Tuple[int, int]]:
+    """(first, last) staging seq ranges of whole groups holding about chunk_size tasks each."""
+    c = conn.cursor()
+    c.execute("""
+        SELECT g.seq, (SELECT COUNT(*) FROM import_tasks t WHERE t.group_id = g.group_id)
+        FROM import_groups g
+        ORDER BY g.seq
+    """)
+    chunks, first, tasks = [], None, 0
+    for seq, group_tasks in c:
+        first = seq if first is None else first
+        tasks += group_tasks
+        if tasks >= chunk_size:
+            chunks.append((first, seq))
+            first, tasks = None, 0
+    if first is not None:
+        chunks.append((first, seq))
+    return chunks
+
+def _copy_sql(table: str, targets: Dict[str, str]) -> str:
+    """SELECT expressions for table's columns from alias src, with `targets` overriding some of them."""
+    return ", ".join(targets.get(column, f"src.{column}") for column in COLUMNS[table])
+
+_COPY_STATEMENTS = (
+    f"""
+        INSERT INTO groups ({', '.join(COLUMNS['groups'])})
+        SELECT {_copy_sql("groups", {"group_id": ":group_base + src.seq"})}
+        FROM import_groups src
+        WHERE src.seq BETWEEN :first AND :last
+        ORDER BY src.seq
+    """,
+    f"""
+        INSERT INTO tasks ({', '.join(COLUMNS['tasks'])})
+        SELECT {_copy_sql("tasks", {
+            "task_id": ":task_base + src.seq",
+            "group_id": ":group_base + g.seq",
+            "recurrence_parent_id": ":task_base + parent.seq",
+        })}
+        FROM import_groups g
+        JOIN import_tasks src ON src.group_id = g.group_id
+        LEFT JOIN import_tasks parent ON parent.task_id = src.recurrence_parent_id
+        WHERE g.seq BETWEEN :first AND :last
+        ORDER BY src.seq
+    """,
+    f"""
+        INSERT INTO task_link ({', '.join(COLUMNS['task_link'])})
+        SELECT {_copy_sql("task_link", {
+            "task_id": ":task_base + t.seq",
+            "pre_task_id": ":task_base + p.seq",
+        })}
+        FROM import_groups g
+        JOIN import_tasks t ON t.group_id = g.group_id
+        JOIN import_links src ON src.task_id = t.task_id
+        JOIN import_tasks p ON p.task_id = src.pre_task_id
+        WHERE g.seq BETWEEN :first AND :last
+    """,
+    f"""
+        INSERT INTO task_history ({', '.join(COLUMNS['task_history'])})
+        SELECT {_copy_sql("task_history", {"task_id": ":task_base + t.seq"})}
+        FROM import_groups g
+        JOIN import_tasks t ON t.group_id = g.group_id
+        JOIN import_history src ON src.task_id = t.task_id
+        WHERE g.seq BETWEEN :first AND :last
+        ORDER BY src.seq
+    """,
+)
+
+def print_progress(groups_done: int, groups_total: int) -> None:
+    """Default progress reporter for import_records."""
+    percent = groups_done * 100 // groups_total if groups_total else 100
+    print(f"Imported {groups_done}/{groups_total} groups ({percent}%)")
+
+def import_records(
+    conn,
+    records: Iterable[Record],
+    owner: Optional[str] = None,
+    chunk_size: int = TRANSFER_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = print_progress
+) -> Dict[str, int]:
+    """
+    Imports exported records as new groups, tasks, links and history, giving
+    them new ids. owner, if given, becomes the owner of every imported group
+    and task. conn must be in autocommit mode (isolation_level=None). Raises
+    ValueError, having written nothing, if the records fail validation.
+    Returns the number of rows imported per table.
+    """
+    _create_staging(conn)
+    try:
+        counts = _stage(conn, records, chunk_size)
+        c = conn.cursor()
+        if owner is not None:
+            c.execute("UPDATE import_groups SET created_by = ?", (owner,))
+            c.execute("UPDATE import_tasks SET created_by = ?", (owner,))
+
+        problems = validate_staged(conn)
+        if problems:
+            raise ValueError("Import rejected, nothing was written:\n" + "\n".join(problems))
+
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            params = {
+                "group_base": _reserve_ids(c, "groups", "group_id", counts["groups"]),
+                "task_base": _reserve_ids(c, "tasks", "task_id", counts["tasks"]),
+            }
+            c.execute("COMMIT")
+        except BaseException:
+            c.execute("ROLLBACK")
+            raise
+
+        chunks = _group_chunks(conn, chunk_size)
+        for first, last in chunks:
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                for sql in _COPY_STATEMENTS:
+                    c.execute(sql, dict(params, first=first, last=last))
+                c.execute("COMMIT")
+            except BaseException as e:
+                c.execute("ROLLBACK")
+                raise Exception(f"Import stopped after {first - 1} of {counts['groups']} groups: {e}")
+            if progress:
+                progress(last, counts["groups"])
+        return counts
+    finally:
+        _drop_staging(conn)
+
+def read_usernames(path: str) -> List[str]:
+    """Reads one username per line, skipping blank lines and # comments."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk export or import groups, tasks, links and history")
+    parser.add_argument("--database", default=database.DATABASE_NAME,
+                        help="SQLite database file (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=TRANSFER_CHUNK_SIZE,
+                        help="rows per chunk and tasks per import transaction (default: %(default)s)")
+    actions = parser.add_subparsers(dest="action", required=True)
+
+    export_parser = actions.add_parser("export", help="export users' groups with their tasks")
+    export_parser.add_argument("--user", action="append", default=[],
+                               help="owner whose groups are exported (repeat for several users)")
+    export_parser.add_argument("--users", help="file with one owner per line, e.g. a whole department")
+    export_parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    export_parser.add_argument("path", help="output file (jsonl) or directory (csv, parquet)")
+
+    import_parser = actions.add_parser("import", help="import an export as new groups")
+    import_parser.add_argument("--owner", help="user who owns every imported group (default: as exported)")
+    import_parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    import_parser.add_argument("path", help="input file (jsonl) or directory (csv, parquet)")
+    args = parser.parse_args(argv)
+
+    database.DATABASE_NAME = args.database
+    ensure_schema(args.database)
+
+    if args.action == "export":
+        usernames = list(args.user)
+        if args.users:
+            usernames += read_usernames(args.users)
+        if not usernames:
+            parser.error("export needs --user or --users")
+        conn = database.get_connection()
+        try:
+            counts = WRITERS[args.format](export_records(conn, usernames, args.chunk_size),
+                                          args.path, args.chunk_size)
+        finally:
+            conn.close()
+        print(f"Exported {counts} to {args.path}")
+        return
+
+    conn = sqlite3.connect(args.database, isolation_level=None)
+    try:
+        conn.execute("PRAGMA busy_timeout = 10000")
+        counts = import_records(conn, READERS[args.format](args.path, args.chunk_size),
+                                args.owner, args.chunk_size)
+    finally:
+        conn.close()
+    print(f"Imported {counts} from {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#core/cache.py
+"""
+Session-scoped read cache.
+
+Each Streamlit session keeps a bounded LRU of read results keyed by
+(username, data version, read name, arguments). Data versions live in the
+data_versions table and triggers bump the owner's version on every write to
+their groups, tasks, links or profile, so writes from any process (the app,
+the notification worker, the CLIs) invalidate cached reads for that user.
+Outside a Streamlit session reads are not cached.
+
+    groups = cached_read(username, "user_groups", (), lambda: load_groups(conn, username))
+"""
+from collections import OrderedDict
+
+import streamlit as st
+
+from core import database
+from core.config import READ_CACHE_SIZE
+
+def _bump(owner: str) -> str:
+    """Trigger statement adding one to the data version of `owner` (an SQL expression)."""
+    return f"""
+        INSERT INTO data_versions (username, version)
+        SELECT owner, 1 FROM (SELECT {owner} AS owner) WHERE owner IS NOT NULL
+        ON CONFLICT (username) DO UPDATE SET version = version + 1;
+    """
+
+# Tasks belong to their group's owner; loose tasks to their creator
+_TASK_OWNER = "COALESCE((SELECT created_by FROM groups WHERE group_id = {row}.group_id), {row}.created_by)"
+_LINK_OWNER = """(SELECT COALESCE(g.created_by, t.created_by) FROM tasks t
+                  LEFT JOIN groups g ON g.group_id = t.group_id WHERE t.task_id = {row}.task_id)"""
+
+# Bookkeeping columns the notification worker rewrites on every pass; no
+# cached read shows them, so changing only these does not bump a version
+_BOOKKEEPING_COLUMNS = {
+    "tasks": {"notified", "last_notification_date"},
+    "users": {"last_notification_date"},
+}
+
+def _changed(conn, table: str) -> str:
+    """WHEN condition of an update trigger: some column other than the bookkeeping ones changed."""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    ignored = _BOOKKEEPING_COLUMNS.get(table, set())
+    return " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in columns if column not in ignored)
+
+def create_data_versions(conn) -> None:
+    """The per-user data version table and the triggers that bump it."""
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            username TEXT COLLATE NOCASE PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    owners = {
+        "tasks": _TASK_OWNER,
+        "groups": "{row}.created_by",
+        "task_link": _LINK_OWNER,
+        "users": "{row}.username",
+    }
+    for table, owner in owners.items():
+        new, old = owner.format(row="NEW"), owner.format(row="OLD")
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_version_insert AFTER INSERT ON {table}
+            BEGIN {_bump(new)} END
+        """)
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_version_delete AFTER DELETE ON {table}
+            BEGIN {_bump(old)} END
+        """)
+        # A row moving to another owner changes both owners' data
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_version_update AFTER UPDATE ON {table}
+            WHEN {_changed(conn, table)}
+            BEGIN {_bump(new)} {_bump(f"NULLIF({old}, {new})")} END
+        """)
+
+def recreate_data_version_triggers(conn) -> None:
+    """Replaces the version 12 update triggers, which also fired on bookkeeping-only updates."""
+    for table in ("tasks", "groups", "task_link", "users"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_{table}_version_update")
+    create_data_versions(conn)
+
+def get_data_version(username) -> int:
+    """Returns the current data version for a user."""
+    conn = database.get_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT version FROM data_versions WHERE username = ?", (username,))
+        row = c.fetchone()
+        return row[0] if row else 0
+    finally:
+        conn.close()
+
+class ReadCache:
+    """Bounded LRU of read results with hit/miss counters."""
+
+    def __init__(self, maxsize=READ_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, username, name, args, loader):
+        key = (username, get_data_version(username), name, args)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = loader()
+        self._entries[key] = value
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+def get_read_cache():
+    """Returns this session's ReadCache, or None when not running under Streamlit."""
+    if not st.runtime.exists():
+        return None
+    if "read_cache" not in st.session_state:
+        st.session_state.read_cache = ReadCache()
+    return st.session_state.read_cache
+
+def cached_read(username, name, args, loader):
+    """
+    Returns loader() for this user's read `name` with hashable `args`, reusing
+    the session's cached result until the user's data version changes.
+    Callers must treat the result as read-only.
+    """
+    cache = get_read_cache()
+    if cache is None:
+        return loader()
+    return cache.get_or_load(username, name, tuple(args), loader)
@@ -7,4 +7,53 @@ TELEGRAM_CHAT_ID = "325917353"  # Example test chat ID
 
 # Validate required environment variables
 if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-    print("Warning: Telegram configuration is incomplete. Please set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in .env file") 
\ No newline at end of file
+    print("Warning: Telegram configuration is incomplete. Please set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in .env file") 
+
+# Database connection pool settings
+DB_POOL_SIZE = int(os.environ.get("AUTOTASK_DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.environ.get("AUTOTASK_DB_POOL_TIMEOUT", "10"))
+DB_HEALTH_CHECK_INTERVAL = float(os.environ.get("AUTOTASK_DB_HEALTH_CHECK_INTERVAL", "30"))
+
+# Storage mode: "rollback" (default) or "wal" to enable WAL with a single serialized writer
+DB_STORAGE_MODE = os.environ.get("AUTOTASK_DB_STORAGE_MODE", "rollback").lower()
+DB_WRITE_BATCH_SIZE = int(os.environ.get("AUTOTASK_DB_WRITE_BATCH_SIZE", "64"))
+DB_WRITE_BATCH_DELAY = float(os.environ.get("AUTOTASK_DB_WRITE_BATCH_DELAY", "0.002"))
+
+# Opt-in per-rerun SQL and render instrumentation (see core/instrumentation.py)
+INSTRUMENTATION = os.environ.get("AUTOTASK_INSTRUMENTATION", "0") == "1"
+INSTRUMENTATION_SLOW_MS = float(os.environ.get("AUTOTASK_INSTRUMENTATION_SLOW_MS", "50"))
+
+# List pagination: rows per "Load more" page, overridable per list
+LIST_PAGE_SIZE = int(os.environ.get("AUTOTASK_LIST_PAGE_SIZE", "50"))
+GROUP_LIST_PAGE_SIZE = int(os.environ.get("AUTOTASK_GROUP_LIST_PAGE_SIZE", str(LIST_PAGE_SIZE)))
+GROUP_TASKS_PAGE_SIZE = int(os.environ.get("AUTOTASK_GROUP_TASKS_PAGE_SIZE", str(LIST_PAGE_SIZE)))
+TASK_SUMMARY_PAGE_SIZE = int(os.environ.get("AUTOTASK_TASK_SUMMARY_PAGE_SIZE", str(LIST_PAGE_SIZE)))
+OVERDUE_PAGE_SIZE = int(os.environ.get("AUTOTASK_OVERDUE_PAGE_SIZE", str(LIST_PAGE_SIZE)))
+
+# Session read cache: entries kept per session before LRU eviction
+READ_CACHE_SIZE = int(os.environ.get("AUTOTASK_READ_CACHE_SIZE", "256"))
+
+# Notification worker settings
+NOTIFICATION_WORKER_INTERVAL = float(os.environ.get("AUTOTASK_NOTIFICATION_INTERVAL", "300"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get("AUTOTASK_NOTIFICATION_MAX_ATTEMPTS", "5"))
+NOTIFICATION_BATCH_SIZE = int(os.environ.get("AUTOTASK_NOTIFICATION_BATCH_SIZE", "100"))
+# Digest mode: one message per user/chat per run instead of one per task ("0" to disable)
+NOTIFICATION_DIGEST = os.environ.get("AUTOTASK_NOTIFICATION_DIGEST", "1") != "0"
+
+# Telegram delivery pipeline settings
+TELEGRAM_API_BASE_URL = os.environ.get("AUTOTASK_TELEGRAM_API_BASE_URL", "https://api.telegram.org/bot")
+TELEGRAM_CONCURRENCY = int(os.environ.get("AUTOTASK_TELEGRAM_CONCURRENCY", "8"))
+TELEGRAM_GLOBAL_RATE = float(os.environ.get("AUTOTASK_TELEGRAM_GLOBAL_RATE", "30"))  # messages/second
+TELEGRAM_PER_CHAT_RATE = float(os.environ.get("AUTOTASK_TELEGRAM_PER_CHAT_RATE", "1"))  # messages/second
+TELEGRAM_MAX_RETRIES = int(os.environ.get("AUTOTASK_TELEGRAM_MAX_RETRIES", "3"))
+TELEGRAM_RETRY_BACKOFF = float(os.environ.get("AUTOTASK_TELEGRAM_RETRY_BACKOFF", "1.0"))  # seconds
+TELEGRAM_MESSAGE_LIMIT = 4096  # characters per Telegram message
+
+# Bulk template instantiation: groups created per transaction
+TEMPLATE_BATCH_SIZE = int(os.environ.get("AUTOTASK_TEMPLATE_BATCH_SIZE", "200"))
+
+# Full-text search: results shown per query
+SEARCH_RESULT_LIMIT = int(os.environ.get("AUTOTASK_SEARCH_RESULT_LIMIT", "20"))
+
+# Bulk export/import: rows per fetch or executemany chunk, and tasks per import transaction
+TRANSFER_CHUNK_SIZE = int(os.environ.get("AUTOTASK_TRANSFER_CHUNK_SIZE", "10000"))
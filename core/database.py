@@ -1,15 +1,246 @@
 #core/database.py
 import sqlite3
 import datetime
+import threading
+import time
+
+from core.config import (
+    DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_HEALTH_CHECK_INTERVAL, DB_STORAGE_MODE
+)
+from core.instrumentation import wrap_connection
 
 DATABASE_NAME = 'task_manager.db'
 
+# Pragmas applied once when a pooled connection is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+)
+
+# Pragmas for the opt-in WAL storage mode. Pooled connections become read-only
+# and every mutation goes through the single writer in core.writer.
+WAL_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA busy_timeout = 10000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+def is_wal_mode() -> bool:
+    """True when the opt-in WAL storage mode is enabled."""
+    return DB_STORAGE_MODE == "wal"
+
+def enable_wal(conn):
+    """Switch the database file to WAL journaling (persistent) and apply WAL pragmas."""
+    conn.execute("PRAGMA journal_mode = WAL")
+    for pragma in WAL_PRAGMAS:
+        conn.execute(pragma)
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection owned by a ConnectionPool; close() hands it back to the pool."""
+
+    pool = None
+    last_used = 0.0
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+    def close_physical(self):
+        """Really close the underlying SQLite handle."""
+        self.pool = None
+        super().close()
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections with per-thread checkout.
+
+    A thread that asks for a connection while it already holds one gets the
+    same connection back, and it is only returned to the pool once every
+    checkout has been closed. Connections held by threads that have exited
+    (e.g. a Streamlit script run that stopped before closing) are reclaimed.
+    """
+
+    def __init__(self, database, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 health_check_interval=DB_HEALTH_CHECK_INTERVAL):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._cond = threading.Condition()
+        self._idle = []
+        self._owners = {}  # thread -> [connection, checkout depth]
+        self._open = 0
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "high_water_mark": 0,
+            "opened": 0,
+            "discarded": 0,
+            "reclaimed": 0,
+        }
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, check_same_thread=False,
+                               factory=PooledConnection)
+        if is_wal_mode():
+            for pragma in WAL_PRAGMAS:
+                conn.execute(pragma)
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+        conn.pool = self
+        return conn
+
+    def _is_healthy(self, conn):
+        if time.monotonic() - conn.last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _reclaim_dead_owners(self):
+        """Return connections held by finished threads to the idle list."""
+        reclaimed = False
+        for thread in [t for t in self._owners if not t.is_alive()]:
+            conn, _ = self._owners.pop(thread)
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.append(conn)
+            self._stats["reclaimed"] += 1
+            reclaimed = True
+        return reclaimed
+
+    def acquire(self):
+        """Check out a connection for the current thread."""
+        thread = threading.current_thread()
+        with self._cond:
+            self._stats["checkouts"] += 1
+            entry = self._owners.get(thread)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0]
+
+            start = time.monotonic()
+            deadline = start + self.timeout
+            conn = None
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._reclaim_dead_owners():
+                    continue
+                if self._open < self.size:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a database connection")
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - start
+            if waited > 0.001:
+                self._stats["waits"] += 1
+                self._stats["wait_time_total"] += waited
+                self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                with self._cond:
+                    self._stats["discarded"] += 1
+                try:
+                    conn.close_physical()
+                except sqlite3.Error:
+                    pass
+                conn = None
+            opened = conn is None
+            if opened:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            if opened:
+                self._stats["opened"] += 1
+            self._owners[thread] = [conn, 1]
+            self._stats["high_water_mark"] = max(self._stats["high_water_mark"], len(self._owners))
+        return conn
+
+    def release(self, conn):
+        """Give back one checkout of a connection."""
+        with self._cond:
+            for thread, entry in self._owners.items():
+                if entry[0] is conn:
+                    break
+            else:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._owners[thread]
+            if conn.in_transaction:
+                conn.rollback()
+            conn.last_used = time.monotonic()
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close_all(self):
+        """Close idle connections and forget checked-out ones."""
+        with self._cond:
+            for conn in self._idle:
+                conn.close_physical()
+            for conn, _ in self._owners.values():
+                conn.pool = None
+            self._idle.clear()
+            self._owners.clear()
+            self._open = 0
+
+    def stats(self):
+        """Snapshot of pool counters for sizing the pool."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self.size,
+                "open": self._open,
+                "in_use": len(self._owners),
+                "idle": len(self._idle),
+            })
+        return stats
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DATABASE_NAME)
+    return _pool
+
 def get_connection():
-    """Establish and return a connection to the SQLite database."""
-    return sqlite3.connect(DATABASE_NAME, check_same_thread=False)
+    """Check out a pooled connection to the SQLite database. Call close() to return it."""
+    return wrap_connection(get_pool().acquire())
+
+def get_pool_stats():
+    """Return checkout, wait-time and high-water-mark counters for the pool."""
+    return get_pool().stats()
 
 def create_tables(conn):
-    """Create necessary tables for users, groups, tasks, templates, and links."""
+    """Create necessary tables for users, groups, tasks, templates, and links. The caller commits."""
     c = conn.cursor()
 
     c.execute('''
@@ -103,10 +334,8 @@ def create_tables(conn):
         )
     ''')
 
-    conn.commit()
-
 def insert_presets(conn):
-    """Insert sample templates and tasks into the database."""
+    """Insert sample templates and tasks into the database. The caller commits."""
     c = conn.cursor()
     
     # Check if templates already exist
@@ -325,8 +554,6 @@ def insert_presets(conn):
                         VALUES (?,?,?)
                     """, (c.lastrowid, prev_task_id, "prerequisite"))
                 prev_task_id = c.lastrowid
-    
-    conn.commit()
 
 def get_group_colour(conn, group_id):
     c = conn.cursor()
@@ -0,0 +1,216 @@
+#core/instrumentation.py
+"""
+Opt-in SQL and render instrumentation.
+
+While a rerun is being traced, get_connection() hands out connections that
+record every statement (SQL, duration, rows returned and the calling module
+and function), and functions decorated with @timed record how long they
+took. Each finished rerun prints one structured log line and is kept in the
+session for the admin debug panel, so N+1 query patterns stand out.
+
+Enable it for every session with AUTOTASK_INSTRUMENTATION=1, or per session
+from the admin debug panel. When off, the only cost is one thread-local
+lookup per get_connection() call and per @timed call.
+"""
+import contextlib
+import functools
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+from core.config import INSTRUMENTATION, INSTRUMENTATION_SLOW_MS
+
+_local = threading.local()
+
+def active_trace():
+    """The trace of the rerun running on this thread, or None."""
+    return getattr(_local, "trace", None)
+
+def _caller() -> str:
+    """module.function of the nearest frame outside this module."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get("__name__") == __name__:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+class RerunTrace:
+    """Statements and timed sections recorded during one Streamlit rerun."""
+
+    def __init__(self, page, username):
+        self.page = page
+        self.username = username
+        self.started = self.last_activity = time.perf_counter()
+        self.duration = None
+        self.interrupted = False
+        self.statements = []  # [sql, seconds, rows, caller]
+        self.sections = []    # (name, seconds)
+
+    def record(self, sql, seconds, caller):
+        entry = [" ".join(sql.split()), seconds, 0, caller]
+        self.statements.append(entry)
+        self.last_activity = time.perf_counter()
+        return entry
+
+    def repeated(self, minimum=2):
+        """(count, sql, caller) for statements run at least `minimum` times, most frequent first."""
+        counts = Counter((sql, caller) for sql, _, _, caller in self.statements)
+        return [(count, sql, caller) for (sql, caller), count in counts.most_common() if count >= minimum]
+
+    def summary(self) -> dict:
+        return {
+            "page": self.page,
+            "user": self.username,
+            "duration_ms": round((self.duration or 0) * 1000, 2),
+            "interrupted": self.interrupted,
+            "statements": len(self.statements),
+            "sql_ms": round(sum(s[1] for s in self.statements) * 1000, 2),
+            "rows": sum(s[2] for s in self.statements),
+            "sections": {name: round(seconds * 1000, 2) for name, seconds in self.sections},
+            "slow": [
+                {"sql": sql[:200], "ms": round(seconds * 1000, 2), "caller": caller}
+                for sql, seconds, _, caller in self.statements if seconds * 1000 >= INSTRUMENTATION_SLOW_MS
+            ],
+            "repeated": [
+                {"count": count, "sql": sql[:200], "caller": caller}
+                for count, sql, caller in self.repeated()[:5]
+            ],
+        }
+
+class TracedCursor:
+    """sqlite3 cursor wrapper that records statements on a RerunTrace."""
+
+    def __init__(self, cursor, trace):
+        self._cursor = cursor
+        self._trace = trace
+        self._entry = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _run(self, method, sql, params):
+        start = time.perf_counter()
+        try:
+            method(sql, params)
+        finally:
+            self._entry = self._trace.record(sql, time.perf_counter() - start, _caller())
+        return self
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._run(self._cursor.executemany, sql, seq_of_params)
+
+    def _fetched(self, start, count):
+        if self._entry is not None:
+            self._entry[1] += time.perf_counter() - start
+            self._entry[2] += count
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(start, row is not None)
+        return row
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(size if size is not None else self._cursor.arraysize)
+        self._fetched(start, len(rows))
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+class TracedConnection:
+    """Connection wrapper whose cursors record statements; everything else is delegated."""
+
+    def __init__(self, conn, trace):
+        self._conn = conn
+        self._trace = trace
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def cursor(self):
+        return TracedCursor(self._conn.cursor(), self._trace)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+def wrap_connection(conn):
+    """Returns conn traced if this thread is tracing a rerun, else conn itself."""
+    trace = active_trace()
+    return conn if trace is None else TracedConnection(conn, trace)
+
+def timed(fn):
+    """Records fn's duration on the active rerun trace, if any."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = active_trace()
+        if trace is None:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            trace.sections.append((fn.__name__, time.perf_counter() - start))
+            trace.last_activity = time.perf_counter()
+    return wrapper
+
+@contextlib.contextmanager
+def tracing(trace):
+    """Records this thread's statements and @timed sections on `trace` inside the block (bench, scripts)."""
+    previous = active_trace()
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        _local.trace = previous
+
+def instrumentation_enabled(session_state) -> bool:
+    return INSTRUMENTATION or bool(session_state.get("instrumentation"))
+
+def begin_rerun(session_state, page, username) -> None:
+    """
+    Starts tracing this rerun if instrumentation is on. A rerun cut short by
+    st.rerun()/st.stop() never reaches finish_rerun, so it is finished here.
+    """
+    finish_rerun(session_state, interrupted=True)
+    if instrumentation_enabled(session_state):
+        _local.trace = session_state["rerun_trace"] = RerunTrace(page, username)
+
+def finish_rerun(session_state, interrupted=False) -> None:
+    """Stops tracing, prints the rerun's log line and keeps it for the debug panel."""
+    _local.trace = None
+    trace = session_state.pop("rerun_trace", None)
+    if trace is None:
+        return
+    # An interrupted rerun is measured up to the last thing it recorded
+    trace.interrupted = interrupted
+    trace.duration = (trace.last_activity if interrupted else time.perf_counter()) - trace.started
+    session_state["last_rerun_trace"] = trace
+    print(f"autotask.rerun {json.dumps(trace.summary())}")
@@ -0,0 +1,203 @@
+#core/migrations.py
+import sqlite3
+import threading
+
+from core import database
+from core.database import create_tables, insert_presets, enable_wal, is_wal_mode
+from core.summary_counters import create_summary_tables
+from core.search import create_search_index
+from core.cache import create_data_versions, recreate_data_version_triggers
+from core.template_catalogue import create_catalogue_version
+
+def add_notification_columns(conn):
+    """Add notification bookkeeping columns missing from databases created by older versions."""
+    c = conn.cursor()
+    required = {
+        "users": [("last_notification_date", "TEXT")],
+        "tasks": [
+            ("last_notification_date", "TEXT"),
+            ("telegram_notify", "INTEGER DEFAULT 1"),
+            ("notified", "INTEGER DEFAULT 0"),
+        ],
+    }
+    for table, columns in required.items():
+        c.execute(f"PRAGMA table_info({table})")
+        existing = {col[1] for col in c.fetchall()}
+        for name, column_type in columns:
+            if name not in existing:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+def create_hot_query_indexes(conn):
+    """Indexes for the owner/status/due-date and group lookups used on every render."""
+    c = conn.cursor()
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_owner_status_due ON tasks(created_by, completed, due_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_group_status_due ON tasks(group_id, completed, due_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_task_link_task ON task_link(task_id, pre_task_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_task_link_pre_task ON task_link(pre_task_id, task_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_groups_owner_template ON groups(created_by, isTemplate, group_name)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_groups_template_name ON groups(isTemplate, group_name)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_task_history_task ON task_history(task_id)")
+
+def create_notification_outbox(conn):
+    """Durable queue of notifications written by the worker scan and drained off the request path."""
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            task_id INTEGER,
+            kind TEXT,
+            message TEXT,
+            chat_id TEXT,
+            notify_date TEXT,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TEXT,
+            seen_at TEXT,
+            UNIQUE (task_id, kind, notify_date),
+            FOREIGN KEY (username) REFERENCES users(username),
+            FOREIGN KEY (task_id) REFERENCES tasks(task_id)
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON notification_outbox(status, notification_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_outbox_user_unseen ON notification_outbox(username, seen_at)")
+
+def create_calendar_window_index(conn):
+    """Index for the calendar's date-window lookups per user."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_owner_due ON tasks(created_by, due_date)")
+
+def create_outbox_digest_index(conn):
+    """Index for picking whole users' pending rows when building digests."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status_user ON notification_outbox(status, username, notification_id)")
+
+def add_recurrence_columns(conn):
+    """Series bookkeeping for the lazy recurrence engine (utils.recurrence)."""
+    c = conn.cursor()
+    c.execute("PRAGMA table_info(tasks)")
+    existing = {col[1] for col in c.fetchall()}
+    for name, column_type in [("recurrence_parent_id", "INTEGER"), ("recurrence_watermark", "TEXT")]:
+        if name not in existing:
+            c.execute(f"ALTER TABLE tasks ADD COLUMN {name} {column_type}")
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tasks_recurring_roots ON tasks(created_by, due_date)
+        WHERE recurrence_pattern IS NOT NULL AND recurrence_parent_id IS NULL
+    """)
+
+def create_recurring_lead_index(conn):
+    """
+    Index for the recurrence pass over all users: series roots by the date
+    their next occurrence's notification lead starts. The expression must
+    match the one in queries.DUE_RECURRING_SERIES.
+    """
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tasks_recurring_lead
+        ON tasks(date(COALESCE(recurrence_watermark, due_date), '-' || COALESCE(notification_days, 0) || ' days'))
+        WHERE recurrence_pattern IS NOT NULL AND recurrence_parent_id IS NULL
+    """)
+
+def create_instantiation_jobs(conn):
+    """Resumable job tables for core.template_instantiation."""
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS instantiation_jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            template_id INTEGER,
+            group_name TEXT,
+            enable_notifications INTEGER DEFAULT 1,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TEXT,
+            FOREIGN KEY (template_id) REFERENCES groups(group_id)
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS instantiation_job_items (
+            job_id INTEGER,
+            position INTEGER,
+            username TEXT,
+            start_date TEXT,
+            status TEXT DEFAULT 'pending',
+            group_id INTEGER,
+            error TEXT,
+            PRIMARY KEY (job_id, position),
+            FOREIGN KEY (job_id) REFERENCES instantiation_jobs(job_id),
+            FOREIGN KEY (group_id) REFERENCES groups(group_id)
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_items_status ON instantiation_job_items(job_id, status, position)")
+
+# Ordered schema steps. Each step runs once, in its own transaction, and the
+# database records the last applied version in PRAGMA user_version.
+MIGRATIONS = [
+    (1, "base tables", create_tables),
+    (2, "notification columns", add_notification_columns),
+    (3, "preset templates", insert_presets),
+    (4, "hot query indexes", create_hot_query_indexes),
+    (5, "notification outbox", create_notification_outbox),
+    (6, "calendar window index", create_calendar_window_index),
+    (7, "recurrence columns", add_recurrence_columns),
+    (8, "template instantiation jobs", create_instantiation_jobs),
+    (9, "summary counters", create_summary_tables),
+    (10, "full-text search index", create_search_index),
+    (11, "outbox digest index", create_outbox_digest_index),
+    (12, "data versions", create_data_versions),
+    (13, "template catalogue version", create_catalogue_version),
+    (14, "data versions ignore bookkeeping updates", recreate_data_version_triggers),
+    (15, "recurring series lead index", create_recurring_lead_index),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+_migration_lock = threading.Lock()
+_migrated_databases = set()
+
+def get_schema_version(conn) -> int:
+    """Returns the schema version recorded in the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn) -> list:
+    """
+    Applies all pending migrations on the given connection.
+    Returns the list of versions that were applied.
+    """
+    applied = []
+    for version, name, step in MIGRATIONS:
+        # BEGIN IMMEDIATE takes the write lock before re-reading the version,
+        # so concurrent processes cannot apply the same step twice.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.execute("COMMIT")
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.execute("COMMIT")
+            applied.append(version)
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            raise Exception(f"Migration {version} ({name}) failed: {str(e)}")
+    return applied
+
+def ensure_schema(database_name=None) -> None:
+    """
+    Brings the database schema up to date once per process.
+    Later calls return immediately without touching the database.
+    """
+    database_name = database_name or database.DATABASE_NAME
+    if database_name in _migrated_databases:
+        return
+    with _migration_lock:
+        if database_name in _migrated_databases:
+            return
+        conn = sqlite3.connect(database_name, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout = 5000")
+            if get_schema_version(conn) < SCHEMA_VERSION:
+                migrate(conn)
+            if is_wal_mode():
+                enable_wal(conn)
+        finally:
+            conn.close()
+        _migrated_databases.add(database_name)
@@ -1,169 +1,282 @@
 #core/notification.py
 import streamlit as st
 from core.database import get_connection
+from core import queries
+from core.writer import run_write
+from core.instrumentation import timed
 import asyncio
-from telegram import Bot
-from core.config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+import json
+from core.config import (
+    NOTIFICATION_MAX_ATTEMPTS, NOTIFICATION_BATCH_SIZE, NOTIFICATION_DIGEST, TELEGRAM_MESSAGE_LIMIT
+)
+from core.telegram_delivery import TelegramDelivery
 from datetime import datetime, date
 from core.date_utils import get_current_date, format_date
 
-async def send_telegram_message(message):
+def format_notification_message(task_name, due_date, is_offtrack=False):
+    """Builds the reminder or off-track alert text for a task."""
+    if is_offtrack:
+        return f"⚠️ OVERDUE TASK ALERT:\nTask: {task_name}\nDue Date: {due_date}\nStatus: Off Track - Action Required!"
+    return f"🔔 Task Reminder:\nTask: {task_name}\nDue Date: {due_date}"
+
+DIGEST_SECTIONS = {"offtrack": "⚠️ Off track", "reminder": "🔔 Due soon"}
+
+def sort_for_digest(items):
     """
-    Send a message via Telegram bot
+    Orders (notification_id, kind, message, task_name, due_date, priority) rows:
+    off-track alerts first, then higher priority, then earliest due date.
     """
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        st.warning("Telegram configuration is missing. Please set up TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID")
-        return
+    return sorted(items, key=lambda item: (item[1] != "offtrack", -(item[5] or 0), item[4] or "", item[0]))
 
-    try:
-        bot = Bot(token=TELEGRAM_BOT_TOKEN)
-        await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
-    except Exception as e:
-        st.error(f"Failed to send Telegram message: {str(e)}")
+def format_digest_line(message, task_name, due_date):
+    """One digest line for a task; falls back to the queued text if the task is gone."""
+    if task_name is None:
+        return message.replace("\n", " ")
+    return f"{task_name} (due {due_date})"
 
-def send_notification(task_id, task_name, due_date, is_offtrack=False):
+def build_digests(rows, limit=TELEGRAM_MESSAGE_LIMIT):
     """
-    Send a notification for the given task via Telegram and display in Streamlit.
-    
-    Args:
-        task_id: ID of the task
-        task_name: Name of the task
-        due_date: Due date of the task
-        is_offtrack: Whether this is an off-track notification
+    Coalesces PENDING_OUTBOX_DIGEST rows into one digest per user and chat, split
+    into parts that fit in `limit` characters. Returns [(notification_ids, chat_id, text)].
+    """
+    # Users sharing a chat still get separate digests, each with only their own tasks
+    by_recipient = {}
+    for notification_id, username, chat_id, *item in rows:
+        by_recipient.setdefault((username, chat_id), []).append((notification_id, *item))
+
+    digests = []
+    for (_, chat_id), items in by_recipient.items():
+        items = sort_for_digest(items)
+        offtrack = sum(1 for item in items if item[1] == "offtrack")
+        title = f"📋 Task digest: {offtrack} off track, {len(items) - offtrack} due soon"
+        budget = limit - len(title) - len(" (part 999/999)")
+
+        parts = []
+        ids, lines, size, section = [], [], 0, None
+        for notification_id, kind, message, task_name, due_date, _ in items:
+            line = "• " + format_digest_line(message, task_name, due_date)[:500]
+            header = f"\n{DIGEST_SECTIONS.get(kind, kind)}"
+            block = [line] if kind == section else [header, line]
+            if lines and size + sum(len(l) + 1 for l in block) > budget:
+                parts.append((ids, lines))
+                ids, lines, size = [], [], 0
+                block = [header, line]  # repeat the section header in the next part
+            ids.append(notification_id)
+            lines.extend(block)
+            size += sum(len(l) + 1 for l in block)
+            section = kind
+        parts.append((ids, lines))
+
+        for number, (ids, lines) in enumerate(parts, 1):
+            heading = title if len(parts) == 1 else f"{title} (part {number}/{len(parts)})"
+            digests.append((tuple(ids), chat_id, "\n".join([heading] + lines)))
+    return digests
+
+@timed
+def check_notifications(conn, username, today=None):
+    """
+    Check a user's due and overdue tasks and queue notifications in the outbox.
+    Delivery happens in core.notification_worker. Returns the number of tasks queued.
     """
-    if is_offtrack:
-        message = f"⚠️ OVERDUE TASK ALERT:\nTask: {task_name}\nDue Date: {due_date}\nStatus: Off Track - Action Required!"
-    else:
-        message = f"🔔 Task Reminder:\nTask: {task_name}\nDue Date: {due_date}"
-    
-    # Display in Streamlit
-    if is_offtrack:
-        st.warning(message)
-    else:
-        st.info(message)
-    
-    # Check if telegram_notify is enabled for this task
-    conn = get_connection()
-    c = conn.cursor()
-    
-    # Check if the column exists
-    c.execute("PRAGMA table_info(tasks)")
-    columns = [col[1] for col in c.fetchall()]
-    
-    if 'telegram_notify' in columns:
-        c.execute("SELECT telegram_notify FROM tasks WHERE task_id = ?", (task_id,))
-        result = c.fetchone()
-        should_notify = result[0] if result else True
-    else:
-        should_notify = True  # Default to True if column doesn't exist
-    
-    conn.close()
-    
-    # Send via Telegram if enabled
-    if should_notify:
-        asyncio.run(send_telegram_message(message))
-
-def ensure_notification_column(conn):
-    """Ensure the last_notification_date column exists and update it for existing users."""
-    c = conn.cursor()
-    
-    # Check if column exists
-    c.execute("PRAGMA table_info(users)")
-    columns = [col[1] for col in c.fetchall()]
-    
-    if 'last_notification_date' not in columns:
-        try:
-            c.execute('ALTER TABLE users ADD COLUMN last_notification_date TEXT')
-            conn.commit()
-        except Exception as e:
-            print(f"Column already exists or error: {e}")
-            conn.rollback()
-
-def check_notifications(conn, username):
-    """Check for overdue tasks and send notifications."""
     try:
         c = conn.cursor()
-        current_date = get_current_date()
+        current_date = today or get_current_date()
         today = format_date(current_date)
-        
-        # Check if required columns exist
-        c.execute("PRAGMA table_info(tasks)")
-        columns = [col[1] for col in c.fetchall()]
-        
-        # Add missing columns if needed
-        if 'last_notification_date' not in columns:
-            c.execute('ALTER TABLE tasks ADD COLUMN last_notification_date TEXT')
-        if 'telegram_notify' not in columns:
-            c.execute('ALTER TABLE tasks ADD COLUMN telegram_notify INTEGER DEFAULT 1')
-        if 'notified' not in columns:
-            c.execute('ALTER TABLE tasks ADD COLUMN notified INTEGER DEFAULT 0')
-        conn.commit()
 
         # First, handle regular notifications for upcoming tasks
-        query = """
-            SELECT task_id, task_name, due_date
-            FROM tasks
-            WHERE completed = 0 
-            AND created_by = ?
-            AND (
-                (notified = 0 AND due_date <= ?) 
-                OR 
-                (due_date < ? AND telegram_notify = 1)
-            )
-        """
-
-        c.execute(query, (
+        c.execute(queries.DUE_NOTIFICATION_TASKS, (
             username,
             today,
             today
         ))
         due_tasks = c.fetchall()
+        offtrack_ids = []
+        notified_ids = []
+        outbox_rows = []
 
-        for task in due_tasks:
-            task_id = task[0]
-            task_name = task[1]
-            due_date = task[2]
-            
+        for task_id, task_name, due_date, last_notif, telegram_notify in due_tasks:
             # Check if task is off-track
             task_due_date = datetime.strptime(due_date, '%Y-%m-%d').date()
             is_offtrack = task_due_date < current_date
-            
-            # For offtrack tasks, check if we already notified today
-            if is_offtrack:
-                c.execute("""
-                    SELECT last_notification_date 
-                    FROM tasks 
-                    WHERE task_id = ?
-                """, (task_id,))
-                result = c.fetchone()
-                last_notif = result[0] if result and result[0] else None
-                
-                if last_notif == today:
-                    continue  # Skip if already notified today
-            
-            # Send notification
-            send_notification(task_id, task_name, due_date, is_offtrack)
-            
+
+            # For offtrack tasks, skip if we already notified today
+            if is_offtrack and last_notif == today:
+                continue
+
+            # Only send via Telegram if enabled for this task
+            should_notify = telegram_notify if telegram_notify is not None else True
+
+            outbox_rows.append([
+                task_id,
+                "offtrack" if is_offtrack else "reminder",
+                format_notification_message(task_name, due_date, is_offtrack),
+                "pending" if should_notify else "skipped"
+            ])
+
             # Update notification tracking
             if is_offtrack:
-                # For offtrack tasks, update last notification date
-                c.execute("""
-                    UPDATE tasks 
-                    SET last_notification_date = ? 
-                    WHERE task_id = ?
-                """, (today, task_id))
+                offtrack_ids.append(task_id)
             else:
+                notified_ids.append(task_id)
+
+        # Bookkeeping is set-based: each statement takes its rows as one JSON
+        # array, so a run issues the same handful of statements however many
+        # tasks are due
+        def record_notifications(write_conn):
+            wc = write_conn.cursor()
+            if outbox_rows:
+                # Queue the notifications; the unique key makes re-scans idempotent
+                wc.execute("""
+                    INSERT OR IGNORE INTO notification_outbox (
+                        username, task_id, kind, message, notify_date, status
+                    )
+                    SELECT ?, json_extract(value, '$[0]'), json_extract(value, '$[1]'),
+                           json_extract(value, '$[2]'), ?, json_extract(value, '$[3]')
+                    FROM json_each(?)
+                """, (username, today, json.dumps(outbox_rows)))
+            if offtrack_ids:
+                # For offtrack tasks, update last notification date
+                wc.execute("""
+                    UPDATE tasks
+                    SET last_notification_date = ?
+                    WHERE task_id IN (SELECT value FROM json_each(?))
+                """, (today, json.dumps(offtrack_ids)))
+            if notified_ids:
                 # For regular notifications, mark as notified
-                c.execute("UPDATE tasks SET notified = 1 WHERE task_id = ?", (task_id,))
-
-        # Update user's last notification date
-        c.execute("""
-            UPDATE users 
-            SET last_notification_date = ? 
-            WHERE username = ?
-        """, (today, username))
-        
-        conn.commit()
+                wc.execute("""
+                    UPDATE tasks
+                    SET notified = 1
+                    WHERE task_id IN (SELECT value FROM json_each(?))
+                """, (json.dumps(notified_ids),))
+            # Update user's last notification date
+            wc.execute("""
+                UPDATE users
+                SET last_notification_date = ?
+                WHERE username = ?
+            """, (today, username))
+
+        run_write(record_notifications)
+        return len(outbox_rows)
     except Exception as e:
         print(f"Error in check_notifications: {e}")
-        conn.rollback()
+        return 0
+
+def scan_all_users(today=None):
+    """Runs check_notifications for every user. Returns the number of notifications queued."""
+    today = today or date.today()
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT username FROM users")
+        usernames = [row[0] for row in c.fetchall()]
+        return sum(check_notifications(conn, username, today) for username in usernames)
+    finally:
+        conn.close()
+
+def fetch_pending_outbox(limit=NOTIFICATION_BATCH_SIZE, digest=NOTIFICATION_DIGEST):
+    """
+    Reads up to `limit` pending outbox rows and returns the messages to send as
+    (notification_ids, chat_id, text). In digest mode the batch is widened to
+    whole users and coalesced into one digest per user and chat.
+    """
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        if digest:
+            c.execute(queries.PENDING_OUTBOX_DIGEST, (limit,))
+            return build_digests(c.fetchall())
+        c.execute(queries.PENDING_OUTBOX, (limit,))
+        return [((notification_id,), chat_id, message) for notification_id, chat_id, message in c.fetchall()]
+    finally:
+        conn.close()
+
+def record_delivery(sent_ids, failures):
+    """
+    Marks sent outbox rows and counts failed attempts ((error, notification_id) pairs).
+    Rows that reach NOTIFICATION_MAX_ATTEMPTS are marked failed; others stay pending.
+    """
+    def update_outbox(write_conn):
+        wc = write_conn.cursor()
+        wc.executemany("""
+            UPDATE notification_outbox
+            SET status = 'sent', sent_at = CURRENT_TIMESTAMP, attempts = attempts + 1
+            WHERE notification_id = ?
+        """, [(notification_id,) for notification_id in sent_ids])
+        wc.executemany(f"""
+            UPDATE notification_outbox
+            SET attempts = attempts + 1,
+                last_error = ?,
+                status = CASE WHEN attempts + 1 >= {int(NOTIFICATION_MAX_ATTEMPTS)}
+                              THEN 'failed' ELSE 'pending' END
+            WHERE notification_id = ?
+        """, failures)
+
+    run_write(update_outbox)
+
+async def deliver_pending_async(delivery, limit=NOTIFICATION_BATCH_SIZE):
+    """
+    Drains the outbox through a TelegramDelivery pipeline, `limit` rows at a time.
+    Database work runs in a thread so sends for the next batch are not blocked.
+    Returns (sent, failed) counts of outbox rows.
+    """
+    sent_total = failed_total = 0
+    while True:
+        messages = await asyncio.to_thread(fetch_pending_outbox, limit)
+        if not messages:
+            break
+
+        # A digest's outcome applies to every outbox row it covers
+        results = await delivery.send_many(messages)
+        sent_ids = [notification_id for ids, error in results.items() if error is None for notification_id in ids]
+        failures = [(error, notification_id) for ids, error in results.items() if error is not None
+                    for notification_id in ids]
+        await asyncio.to_thread(record_delivery, sent_ids, failures)
+
+        sent_total += len(sent_ids)
+        failed_total += len(failures)
+        # Stop when the outbox is drained; failed rows wait for the next pass
+        if len(sent_ids) + len(failures) < limit or failures:
+            break
+    return sent_total, failed_total
+
+def deliver_pending(limit=NOTIFICATION_BATCH_SIZE):
+    """Synchronous one-off delivery of pending outbox rows. Returns (sent, failed) counts."""
+    async def run():
+        async with TelegramDelivery() as delivery:
+            return await deliver_pending_async(delivery, limit)
+
+    return asyncio.run(run())
+
+def show_pending_notifications(conn, username):
+    """Displays the user's queued notifications that have not been shown yet."""
+    c = conn.cursor()
+    c.execute(queries.UNSEEN_USER_NOTIFICATIONS, (username,))
+    notifications = c.fetchall()
+    if not notifications:
+        return
+
+    if NOTIFICATION_DIGEST and len(notifications) > 1:
+        # One box per kind instead of one per task
+        for kind in DIGEST_SECTIONS:
+            items = [item for item in sort_for_digest(notifications) if item[1] == kind]
+            if not items:
+                continue
+            lines = "\n".join(f"- {format_digest_line(message, task_name, due_date)}"
+                              for _, _, message, task_name, due_date, _ in items)
+            text = f"**{DIGEST_SECTIONS[kind]} ({len(items)})**\n{lines}"
+            if kind == "offtrack":
+                st.warning(text)
+            else:
+                st.info(text)
+    else:
+        for _, kind, message, _, _, _ in notifications:
+            if kind == "offtrack":
+                st.warning(message)
+            else:
+                st.info(message)
+
+    seen_ids = [(item[0],) for item in notifications]
+    run_write(lambda write_conn: write_conn.executemany(
+        "UPDATE notification_outbox SET seen_at = CURRENT_TIMESTAMP WHERE notification_id = ?",
+        seen_ids
+    ))
@@ -0,0 +1,65 @@
+#core/notification_worker.py
+"""
+Background notification worker.
+
+Scans every user's tasks on a schedule, creates recurring task occurrences
+that have come due, queues reminders and off-track alerts in the
+notification_outbox table and delivers them via Telegram, so none of this
+work happens inside a Streamlit page render.
+
+    python -m core.notification_worker            # run forever
+    python -m core.notification_worker --once     # single pass (e.g. from cron)
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from core import database
+from core.config import NOTIFICATION_WORKER_INTERVAL
+from core.migrations import ensure_schema
+from core.notification import scan_all_users, deliver_pending_async
+from core.telegram_delivery import TelegramDelivery
+from utils.recurrence import materialize_due_occurrences
+
+async def run_once(delivery, today=None) -> dict:
+    """
+    Creates recurring occurrences that have come due, queues notifications for
+    all users, then drains the outbox through `delivery`.
+    """
+    today = today or date.today()
+    created = await asyncio.to_thread(materialize_due_occurrences, today)
+    queued = await asyncio.to_thread(scan_all_users, today)
+    sent, failed = await deliver_pending_async(delivery)
+    return {"created": created, "queued": queued, "sent": sent, "failed": failed}
+
+async def run_forever(interval, once=False) -> None:
+    """Runs passes every `interval` seconds, reusing one Telegram client for the process."""
+    async with TelegramDelivery() as delivery:
+        while True:
+            try:
+                print(f"Notification pass: {await run_once(delivery)} (telegram: {delivery.stats})")
+            except Exception as e:
+                print(f"Error in notification worker: {e}")
+            if once:
+                break
+            await asyncio.sleep(interval)
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="AutoTask notification worker")
+    parser.add_argument("--once", action="store_true", help="run a single scan/deliver pass and exit")
+    parser.add_argument("--interval", type=float, default=NOTIFICATION_WORKER_INTERVAL,
+                        help="seconds between passes (default: %(default)s)")
+    parser.add_argument("--database", default=database.DATABASE_NAME,
+                        help="SQLite database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    database.DATABASE_NAME = args.database
+    ensure_schema(args.database)
+
+    asyncio.run(run_forever(args.interval, args.once))
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
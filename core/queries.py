@@ -0,0 +1,245 @@
+#core/queries.py
+# SQL for the hot read paths. These statements are shared by the pages and by
+# core.query_plans, which checks that none of them falls back to a full scan.
+
+# The *_PAGE queries seek past the last row of the previous page (keyset
+# pagination) instead of using OFFSET, so every page costs the same index range
+# scan; see utils/pagination.py for the cursors each one takes.
+OVERDUE_TASKS_PAGE = """
+    SELECT task_id, task_name, due_date
+    FROM tasks
+    WHERE due_date < ? 
+    AND completed = 0
+    AND created_by = ?
+    AND (due_date, task_id) > (?, ?)
+    ORDER BY due_date, task_id
+    LIMIT ?
+"""
+
+DUE_NOTIFICATION_TASKS = """
+    SELECT task_id, task_name, due_date, last_notification_date, telegram_notify
+    FROM tasks
+    WHERE completed = 0 
+    AND created_by = ?
+    AND (
+        (notified = 0 AND due_date <= ?) 
+        OR 
+        (due_date < ? AND telegram_notify = 1)
+    )
+"""
+
+USER_EVENTS_IN_WINDOW = """
+    SELECT task_name, due_date, completed
+    FROM tasks
+    WHERE created_by = ? AND due_date >= ? AND due_date < ?
+    ORDER BY due_date
+"""
+
+USER_GROUPS_PAGE = """
+    SELECT group_id, group_name, color, remarks, isTemplate 
+    FROM groups 
+    WHERE created_by=? AND isTemplate=0
+    AND (group_name, group_id) > (?, ?)
+    ORDER BY group_name, group_id
+    LIMIT ?
+"""
+
+TEMPLATES = """
+    SELECT DISTINCT g.group_id, g.group_name, g.remarks 
+    FROM groups g
+    WHERE g.isTemplate=1
+    GROUP BY g.group_name
+    ORDER BY g.group_name
+"""
+
+# Completed, total and overdue counts kept by the triggers in core.summary_counters;
+# overdue is counted as of overdue_as_of
+USER_GROUP_SUMMARIES = """
+    SELECT g.group_id, s.completed, s.total, s.overdue, s.overdue_as_of
+    FROM groups g
+    JOIN group_summary s ON s.group_id = g.group_id
+    WHERE g.created_by = ? AND g.isTemplate = 0
+"""
+
+GROUP_SUMMARY = """
+    SELECT s.completed, s.total, s.overdue, s.overdue_as_of, g.created_by
+    FROM group_summary s
+    JOIN groups g ON g.group_id = s.group_id
+    WHERE s.group_id = ?
+"""
+
+USER_SUMMARY = """
+    SELECT completed, total, overdue, overdue_as_of
+    FROM user_summary
+    WHERE username = ?
+"""
+
+# Every completed task the user created, template groups included (the dashboard's counter)
+USER_COMPLETED_TASK_COUNT = "SELECT COUNT(*) FROM tasks WHERE created_by = ? AND completed = 1"
+
+# Prerequisite names are only looked up for the rows on the page
+GROUP_TASKS_WITH_PREREQUISITES_PAGE = """
+    SELECT t.task_id, t.task_name, t.due_date, t.completed,
+           (SELECT GROUP_CONCAT(p.task_name, '|||')
+            FROM task_link tl
+            JOIN tasks p ON tl.pre_task_id = p.task_id
+            WHERE tl.task_id = t.task_id) AS prerequisites
+    FROM tasks t
+    WHERE t.group_id = ?
+    AND (t.completed, t.due_date, t.task_id) > (?, ?, ?)
+    ORDER BY t.completed, t.due_date, t.task_id
+    LIMIT ?
+"""
+
+# The dashboard's task lists in one statement: a user's tasks in active groups
+# (non-template groups with pending tasks, per the counters in
+# core.summary_counters) in due date order, with the status rules of
+# utils.status_engine. A pending task is offtrack when it is overdue or
+# reachable from an overdue pending task through pending dependents.
+USER_DASHBOARD_TASKS = """
+    WITH RECURSIVE offtrack(task_id) AS (
+        SELECT task_id FROM tasks
+        WHERE created_by = :username AND completed = 0 AND due_date < :today
+        UNION
+        SELECT tl.task_id
+        FROM offtrack
+        JOIN task_link tl ON tl.pre_task_id = offtrack.task_id
+        JOIN tasks t ON t.task_id = tl.task_id
+        WHERE t.created_by = :username AND t.completed = 0
+    )
+    SELECT t.task_id, t.task_name, t.due_date, t.completed, g.group_name,
+           CASE WHEN t.completed THEN 'completed'
+                WHEN t.task_id IN offtrack THEN 'offtrack'
+                ELSE 'ontrack' END AS status
+    FROM tasks t
+    JOIN groups g ON g.group_id = t.group_id
+    JOIN group_summary s ON s.group_id = t.group_id
+    WHERE t.created_by = :username AND t.completed IN (0, 1)
+    AND g.isTemplate = 0 AND s.total > s.completed
+    ORDER BY t.due_date, t.task_id
+"""
+
+TASK_DEPENDENTS = """
+    SELECT t.task_id, t.task_name, t.due_date
+    FROM tasks t
+    JOIN task_link tl ON t.task_id = tl.task_id
+    WHERE tl.pre_task_id = ?
+"""
+
+# Task states and prerequisite edges for the status engine (utils/status_engine.py)
+USER_TASK_STATES = "SELECT task_id, completed, due_date FROM tasks WHERE created_by = ?"
+
+USER_TASK_LINKS = """
+    SELECT tl.task_id, tl.pre_task_id
+    FROM tasks t
+    JOIN task_link tl ON tl.task_id = t.task_id
+    WHERE t.created_by = ?
+"""
+
+GROUP_TASK_STATES = "SELECT task_id, completed, due_date FROM tasks WHERE group_id = ?"
+
+# A group's tasks plus every task they depend on, directly or through other
+# groups, so offtrack prerequisites elsewhere still propagate into the group
+_GROUP_UPSTREAM = """
+    WITH RECURSIVE upstream(task_id) AS (
+        SELECT task_id FROM tasks WHERE group_id = ?
+        UNION
+        SELECT tl.pre_task_id
+        FROM upstream
+        JOIN task_link tl ON tl.task_id = upstream.task_id
+    )
+"""
+
+GROUP_UPSTREAM_TASK_STATES = _GROUP_UPSTREAM + """
+    SELECT t.task_id, t.completed, t.due_date
+    FROM upstream
+    JOIN tasks t ON t.task_id = upstream.task_id
+"""
+
+GROUP_UPSTREAM_TASK_LINKS = _GROUP_UPSTREAM + """
+    SELECT tl.task_id, tl.pre_task_id
+    FROM upstream
+    JOIN task_link tl ON tl.task_id = upstream.task_id
+"""
+
+# Prerequisite edges with their minimum gap, for the scheduling engine (utils/schedule.py)
+GROUP_TASK_LINK_DELAYS = """
+    SELECT tl.task_id, tl.pre_task_id, COALESCE(tl.delay_days, 0)
+    FROM tasks t
+    JOIN task_link tl ON tl.task_id = t.task_id
+    WHERE t.group_id = ?
+"""
+
+# Data version of a group's owner, which keys the cached reachability index (utils/reachability.py)
+GROUP_OWNER_DATA_VERSION = """
+    SELECT COALESCE((SELECT dv.version FROM data_versions dv WHERE dv.username = g.created_by), 0)
+    FROM groups g
+    WHERE g.group_id = ?
+"""
+
+PENDING_OUTBOX = """
+    SELECT o.notification_id, COALESCE(o.chat_id, u.telegram_chat_id), o.message
+    FROM notification_outbox o
+    LEFT JOIN users u ON u.username = o.username
+    WHERE o.status = 'pending'
+    ORDER BY o.notification_id
+    LIMIT ?
+"""
+
+# Whole users per batch: the users owning the first ? pending rows (by
+# username), with all of their pending rows, so no one's digest is split
+PENDING_OUTBOX_DIGEST = """
+    WITH batch AS (
+        SELECT DISTINCT username FROM (
+            SELECT username FROM notification_outbox
+            WHERE status = 'pending'
+            ORDER BY username, notification_id
+            LIMIT ?
+        )
+    )
+    SELECT o.notification_id, o.username, COALESCE(o.chat_id, u.telegram_chat_id), o.kind,
+           o.message, t.task_name, t.due_date, t.priority
+    FROM batch
+    JOIN notification_outbox o ON o.status = 'pending' AND o.username IS batch.username
+    LEFT JOIN users u ON u.username = o.username
+    LEFT JOIN tasks t ON t.task_id = o.task_id
+    ORDER BY o.username, o.notification_id
+"""
+
+UNSEEN_USER_NOTIFICATIONS = """
+    SELECT o.notification_id, o.kind, o.message, t.task_name, t.due_date, t.priority
+    FROM notification_outbox o
+    LEFT JOIN tasks t ON t.task_id = o.task_id
+    WHERE o.username = ? AND o.seen_at IS NULL
+    ORDER BY o.notification_id
+"""
+
+# Roots of recurring series outside template groups; instances have recurrence_parent_id set
+USER_RECURRING_SERIES = """
+    SELECT t.task_id, t.task_name, t.due_date, t.recurrence_pattern, t.recurrence_end_date,
+           COALESCE(t.recurrence_watermark, t.due_date)
+    FROM tasks t
+    JOIN groups g ON g.group_id = t.group_id
+    WHERE t.created_by = ?
+    AND t.recurrence_pattern IS NOT NULL AND t.recurrence_parent_id IS NULL
+    AND g.isTemplate = 0
+"""
+
+# Series whose next occurrence is within its notification lead of today (param).
+# The lead date is written as an expression over the row so idx_tasks_recurring_lead can serve
+# it; CROSS JOIN keeps tasks as the outer loop instead of walking every non-template group.
+DUE_RECURRING_SERIES = """
+    SELECT t.task_id, t.group_id, t.task_name, t.description, t.notification_days,
+           t.due_date, t.recurrence_pattern, t.recurrence_end_date, t.priority,
+           t.estimated_duration, t.created_by, t.telegram_notify,
+           COALESCE(t.recurrence_watermark, t.due_date)
+    FROM tasks t
+    CROSS JOIN groups g ON g.group_id = t.group_id
+    WHERE t.recurrence_pattern IS NOT NULL AND t.recurrence_parent_id IS NULL
+    AND g.isTemplate = 0
+    AND date(COALESCE(t.recurrence_watermark, t.due_date), '-' || COALESCE(t.notification_days, 0) || ' days') < ?
+    AND (t.recurrence_end_date IS NULL OR COALESCE(t.recurrence_watermark, t.due_date) < t.recurrence_end_date)
+"""
+
+USER_DUE_RECURRING_SERIES = DUE_RECURRING_SERIES + """    AND t.created_by = ?
+"""
@@ -0,0 +1,97 @@
+#core/query_plans.py
+"""
+EXPLAIN QUERY PLAN regression check for the hot queries in core.queries.
+
+Run with `python -m core.query_plans [database]` (defaults to a fresh
+in-memory schema); exits non-zero if any query plan contains a full scan.
+A database file is opened read-only and must already be migrated.
+"""
+import sqlite3
+import sys
+
+from core import queries
+from core.migrations import SCHEMA_VERSION, get_schema_version, migrate
+
+# Query name -> sample parameters used to build the plan
+HOT_QUERIES = {
+    "OVERDUE_TASKS_PAGE": ("2026-01-01", "admin", "", 0, 51),
+    "DUE_NOTIFICATION_TASKS": ("admin", "2026-01-01", "2026-01-01"),
+    "USER_EVENTS_IN_WINDOW": ("admin", "2026-01-01", "2026-02-01"),
+    "USER_GROUPS_PAGE": ("admin", "", 0, 51),
+    "TEMPLATES": (),
+    "USER_GROUP_SUMMARIES": ("admin",),
+    "GROUP_SUMMARY": (1,),
+    "USER_SUMMARY": ("admin",),
+    "USER_COMPLETED_TASK_COUNT": ("admin",),
+    "GROUP_TASKS_WITH_PREREQUISITES_PAGE": (1, -1, "", 0, 51),
+    "TASK_DEPENDENTS": (1,),
+    "USER_DASHBOARD_TASKS": {"username": "admin", "today": "2026-01-01"},
+    "USER_TASK_STATES": ("admin",),
+    "USER_TASK_LINKS": ("admin",),
+    "GROUP_TASK_STATES": (1,),
+    "GROUP_UPSTREAM_TASK_STATES": (1,),
+    "GROUP_UPSTREAM_TASK_LINKS": (1,),
+    "GROUP_TASK_LINK_DELAYS": (1,),
+    "GROUP_OWNER_DATA_VERSION": (1,),
+    "PENDING_OUTBOX": (100,),
+    "PENDING_OUTBOX_DIGEST": (100,),
+    "UNSEEN_USER_NOTIFICATIONS": ("admin",),
+    "USER_RECURRING_SERIES": ("admin",),
+    "DUE_RECURRING_SERIES": ("2026-01-01",),
+    "USER_DUE_RECURRING_SERIES": ("2026-01-01", "admin"),
+}
+
+def explain(conn, sql: str, params=()) -> list:
+    """Returns the detail lines of EXPLAIN QUERY PLAN for a statement."""
+    c = conn.cursor()
+    c.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[3] for row in c.fetchall()]
+
+def is_full_scan(detail: str) -> bool:
+    """True for plan steps that read a whole table or a whole index."""
+    if not detail.startswith("SCAN "):
+        return False
+    return not detail.startswith(("SCAN CONSTANT ROW", "SCAN (subquery"))
+
+def find_full_scans(conn, hot_queries=None) -> dict:
+    """Returns {query name: [offending plan lines]} for every query that scans."""
+    failures = {}
+    for name, params in (hot_queries or HOT_QUERIES).items():
+        plan = explain(conn, getattr(queries, name), params)
+        # Reading a common table expression's own rows is not a table scan
+        ctes = {detail.split()[1] for detail in plan if detail.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+        scans = [detail for detail in plan if is_full_scan(detail) and detail.split()[1] not in ctes]
+        if scans:
+            failures[name] = scans
+    return failures
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        try:
+            conn = sqlite3.connect(f"file:{argv[0]}?mode=ro", uri=True)
+            version = get_schema_version(conn)
+        except sqlite3.Error as e:
+            print(f"Cannot open {argv[0]} read-only: {e}")
+            return 2
+        if version < SCHEMA_VERSION:
+            conn.close()
+            print(f"{argv[0]} is at schema version {version}, expected {SCHEMA_VERSION}; "
+                  "start the app (or run migrations) on it first")
+            return 2
+    else:
+        conn = sqlite3.connect(":memory:", isolation_level=None)
+        migrate(conn)
+    try:
+        failures = find_full_scans(conn)
+    finally:
+        conn.close()
+
+    for name, scans in failures.items():
+        print(f"FULL SCAN in {name}: {'; '.join(scans)}")
+    if not failures:
+        print(f"OK: {len(HOT_QUERIES)} hot queries use indexes")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
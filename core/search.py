@@ -0,0 +1,304 @@
+#core/search.py
+"""
+Full-text search over tasks, groups and templates.
+
+search_index is an FTS5 table with one row per task (rowid task_id * 2) and
+one per group (rowid group_id * 2 + 1), kept in sync by triggers on tasks
+and groups. Each row's owner column holds a single token: the owning user's
+name hex-encoded, or "templates" for template groups and their tasks.
+
+A search ANDs the caller's owner token (or "templates") with the first
+three characters of every word, which the prefix index serves as a single
+seekable list, so FTS5 only walks the caller's rows. Candidates are read
+newest first, a page at a time, and checked for the full prefixes until
+`limit` of them match, then ranked here: title matches before body matches,
+whole words before prefixes, newer rows first. (FTS5's bm25() and prefixes
+longer than the prefix index are not used: both read every row containing
+a term, which grows with the whole index.)
+
+    python -m core.search --user admin "quarterly rep"
+    python -m core.search --rebuild
+    python -m core.search --check      # exit 1 if search misses a match
+"""
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import unicodedata
+from typing import List, NamedTuple, Optional, Tuple
+
+from core import database
+from core.config import SEARCH_RESULT_LIMIT
+from core.writer import run_write
+
+def _owner_sql(group: str, owner: str) -> str:
+    """SQL for the owner token of a row in group alias `group` owned by SQL expression `owner`."""
+    return f"CASE WHEN {group}.isTemplate = 1 THEN 'templates' ELSE 'o' || hex({owner}) END"
+
+def owner_token(username: str) -> str:
+    """The owner column token of a user's rows (what 'o' || hex(username) gives after tokenizing)."""
+    return "o" + username.encode("utf-8").hex()
+
+# A task takes its group's owner; tasks outside any group keep their creator
+_INDEX_NEW_TASK = f"""
+    INSERT INTO search_index (rowid, title, body, owner, group_id)
+    SELECT NEW.task_id * 2, NEW.task_name, NEW.description,
+           {_owner_sql("g", "COALESCE(g.created_by, NEW.created_by)")}, NEW.group_id
+    FROM (SELECT 1) LEFT JOIN groups g ON g.group_id = NEW.group_id;
+"""
+
+_INDEX_NEW_GROUP = f"""
+    INSERT INTO search_index (rowid, title, body, owner, group_id)
+    VALUES (NEW.group_id * 2 + 1, NEW.group_name, NEW.remarks,
+            {_owner_sql("NEW", "NEW.created_by")}, NEW.group_id);
+"""
+
+def create_search_index(conn) -> None:
+    """The FTS5 table and its sync triggers, filled from the current tasks and groups."""
+    c = conn.cursor()
+    c.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, body, owner, group_id UNINDEXED,
+            prefix = '1 2 3',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_search_insert AFTER INSERT ON tasks
+        BEGIN {_INDEX_NEW_TASK} END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_search_delete AFTER DELETE ON tasks
+        BEGIN DELETE FROM search_index WHERE rowid = OLD.task_id * 2; END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_search_update
+        AFTER UPDATE OF task_name, description, group_id, created_by ON tasks
+        WHEN OLD.task_name IS NOT NEW.task_name OR OLD.description IS NOT NEW.description
+          OR OLD.group_id IS NOT NEW.group_id OR OLD.created_by IS NOT NEW.created_by
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.task_id * 2;
+            {_INDEX_NEW_TASK}
+        END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_search_insert AFTER INSERT ON groups
+        BEGIN {_INDEX_NEW_GROUP} END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_search_delete AFTER DELETE ON groups
+        BEGIN DELETE FROM search_index WHERE rowid = OLD.group_id * 2 + 1; END
+    """)
+    # A new owner or template flag also moves the group's tasks
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_search_update
+        AFTER UPDATE OF group_name, remarks, isTemplate, created_by ON groups
+        WHEN OLD.group_name IS NOT NEW.group_name OR OLD.remarks IS NOT NEW.remarks
+          OR OLD.isTemplate IS NOT NEW.isTemplate OR OLD.created_by IS NOT NEW.created_by
+        BEGIN
+            DELETE FROM search_index WHERE rowid = OLD.group_id * 2 + 1;
+            {_INDEX_NEW_GROUP}
+            UPDATE search_index SET owner = {_owner_sql("NEW", "NEW.created_by")}
+            WHERE (OLD.isTemplate IS NOT NEW.isTemplate OR OLD.created_by IS NOT NEW.created_by)
+            AND rowid IN (SELECT task_id * 2 FROM tasks WHERE group_id = NEW.group_id);
+        END
+    """)
+    rebuild_search_index(conn)
+
+def rebuild_search_index(conn) -> None:
+    """Re-indexes every task and group."""
+    c = conn.cursor()
+    c.execute("DELETE FROM search_index")
+    c.execute(f"""
+        INSERT INTO search_index (rowid, title, body, owner, group_id)
+        SELECT g.group_id * 2 + 1, g.group_name, g.remarks, {_owner_sql("g", "g.created_by")}, g.group_id
+        FROM groups g
+    """)
+    c.execute(f"""
+        INSERT INTO search_index (rowid, title, body, owner, group_id)
+        SELECT t.task_id * 2, t.task_name, t.description,
+               {_owner_sql("g", "COALESCE(g.created_by, t.created_by)")}, t.group_id
+        FROM tasks t
+        LEFT JOIN groups g ON g.group_id = t.group_id
+    """)
+    c.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+# Candidate rows read per page; paging stops once `limit` of them match
+SEARCH_CANDIDATES = 1000
+
+_WORD = re.compile(r"[^\W_]+")
+
+class SearchResult(NamedTuple):
+    kind: str          # "task" or "group"
+    ref_id: int        # task_id or group_id
+    group_id: int
+    title: str
+    snippet: str
+    group_name: str
+    is_template: bool
+
+def _words(text: Optional[str]) -> List[str]:
+    """Lowercase words without diacritics, as the unicode61 tokenizer splits them."""
+    text = (text or "").lower()
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return _WORD.findall(text)
+
+def build_match_query(words: List[str], username: str) -> str:
+    """FTS5 query for rows of the user or the templates with words starting like every search word."""
+    terms = " ".join(f'"{word[:3]}"*' for word in words)
+    return f"owner : ({owner_token(username)} OR templates) AND {{title body}} : ({terms})"
+
+def _score(words: List[str], title: Optional[str], body: Optional[str]) -> int:
+    """Relevance of a row, or 0 if some search word starts no word of it."""
+    title_words, body_words = _words(title), _words(body)
+    score = 0
+    for word in words:
+        if word in title_words:
+            score += 4
+        elif any(w.startswith(word) for w in title_words):
+            score += 3
+        elif word in body_words:
+            score += 2
+        elif any(w.startswith(word) for w in body_words):
+            score += 1
+        else:
+            return 0
+    return score
+
+def _snippet(body: Optional[str], words: List[str], width: int = 8) -> str:
+    """Up to `width` words of body around its first match, matches in bold."""
+    tokens = (body or "").split()
+    marked = [any(w.startswith(word) for w in _words(token) for word in words) for token in tokens]
+    if not any(marked):
+        return ""
+    start = max(0, marked.index(True) - 2)
+    shown = [f"**{t}**" if m else t for t, m in zip(tokens[start:start + width], marked[start:start + width])]
+    return ("…" if start else "") + " ".join(shown) + ("…" if start + width < len(tokens) else "")
+
+def search(conn, username: str, text: str, limit: int = SEARCH_RESULT_LIMIT) -> List[SearchResult]:
+    """Best matches first for every word of `text` matched as a word prefix."""
+    words = _words(text)
+    if not words:
+        return []
+    c = conn.cursor()
+    query = build_match_query(words, username)
+    ranked: List[Tuple] = []
+    # The three-character match also returns rows that only share a word's
+    # start, so keep reading older candidates until enough really match
+    before = 1 << 62
+    while len(ranked) < limit:
+        c.execute("""
+            SELECT rowid, title, body, owner = 'templates', group_id
+            FROM search_index
+            WHERE search_index MATCH ? AND rowid < ?
+            ORDER BY rowid DESC
+            LIMIT ?
+        """, (query, before, SEARCH_CANDIDATES))
+        rows = c.fetchall()
+        for rowid, title, body, is_template, group_id in rows:
+            score = _score(words, title, body)
+            if score:
+                ranked.append((-score, -rowid, title, body, is_template, group_id))
+        if len(rows) < SEARCH_CANDIDATES:
+            break
+        before = rows[-1][0]
+    ranked.sort()
+    ranked = ranked[:limit]
+
+    c.execute("""
+        SELECT g.group_id, g.group_name FROM groups g
+        WHERE g.group_id IN (SELECT value FROM json_each(?))
+    """, (json.dumps(sorted({row[5] for row in ranked if row[5] is not None})),))
+    group_names = dict(c.fetchall())
+    return [
+        SearchResult("group" if -rowid & 1 else "task", -rowid >> 1, group_id, title,
+                     _snippet(body, words), group_names.get(group_id, ""), bool(is_template))
+        for _, rowid, title, body, is_template, group_id in ranked
+    ]
+
+def check_search(limit: int = SEARCH_RESULT_LIMIT) -> List[str]:
+    """
+    Searches a scratch database where one old task matches and more than
+    SEARCH_CANDIDATES newer ones only share its words' first letters, and
+    compares every result list with ranking all rows here. Returns the problems seen.
+    """
+    # Imported here: core.migrations creates the index through this module
+    from core.migrations import migrate
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    try:
+        migrate(conn)
+        c = conn.cursor()
+        c.execute("INSERT INTO users (username) VALUES ('checker')")
+        c.execute("INSERT INTO groups (group_name, created_by) VALUES ('Finance', 'checker')")
+        tasks = [("Quarterly report", "Send the numbers to the board")]
+        tasks += [(f"Repair item {n}", "Reported broken" if n % 100 == 0 else "Fix it")
+                  for n in range(SEARCH_CANDIDATES + 100)]
+        c.execute("BEGIN")
+        c.executemany("""
+            INSERT INTO tasks (group_id, task_name, description, created_by) VALUES (?, ?, ?, 'checker')
+        """, [(c.lastrowid, name, description) for name, description in tasks])
+        c.execute("COMMIT")
+
+        c.execute("SELECT rowid, title, body FROM search_index WHERE lower(owner) IN (?, 'templates')",
+                  (owner_token("checker"),))
+        rows = c.fetchall()
+        problems = []
+        for text in ("report", "quarterly rep", "rep", "repair 7", "board", "fix", "reporting"):
+            words = _words(text)
+            expected = sorted((-_score(words, title, body), -rowid) for rowid, title, body in rows
+                              if _score(words, title, body))[:limit]
+            found = [result.ref_id * 2 + (result.kind == "group") for result in search(conn, "checker", text, limit)]
+            if found != [-rowid for _, rowid in expected]:
+                problems.append(f"search {text!r}: {len(found)} results, expected {len(expected)} "
+                                f"(first {found[:3]}, expected {[-rowid for _, rowid in expected[:3]]})")
+        return problems
+    finally:
+        conn.close()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Search tasks and groups, or rebuild the search index")
+    parser.add_argument("query", nargs="?", help="words to search for (each matched as a prefix)")
+    parser.add_argument("--user", default="admin", help="user whose tasks are searched (default: %(default)s)")
+    parser.add_argument("--limit", type=int, default=SEARCH_RESULT_LIMIT,
+                        help="maximum results (default: %(default)s)")
+    parser.add_argument("--rebuild", action="store_true", help="re-index every task and group")
+    parser.add_argument("--check", action="store_true",
+                        help="search a scratch database and exit 1 if a match is missed")
+    parser.add_argument("--database", default=database.DATABASE_NAME,
+                        help="SQLite database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.check:
+        problems = check_search(args.limit)
+        for problem in problems:
+            print(problem)
+        if problems:
+            sys.exit(1)
+        print("Search: every match found and ranked as expected")
+        return
+    if not args.rebuild and not args.query:
+        parser.error("give a query, --rebuild or --check")
+
+    # Imported here: core.migrations creates the index through this module
+    from core.migrations import ensure_schema
+    database.DATABASE_NAME = args.database
+    ensure_schema(args.database)
+
+    if args.rebuild:
+        # Through the writer: pooled connections are read-only in WAL mode
+        run_write(rebuild_search_index)
+        print("Search index rebuilt")
+    if not args.query:
+        return
+    conn = database.get_connection()
+    try:
+        for result in search(conn, args.user, args.query, args.limit):
+            where = "template" if result.is_template else "group"
+            print(f"{result.kind} {result.ref_id} ({where} {result.group_id} {result.group_name}): "
+                  f"{result.title}" + (f" — {result.snippet}" if result.snippet else ""))
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#core/summary_counters.py
+"""
+Trigger-maintained task counters.
+
+group_summary holds total, completed and overdue task counts per group, and
+user_summary the same across each user's non-template groups. Triggers on
+tasks and groups keep them current, so the dashboard and group pages read
+one row per user or group instead of aggregating tasks on every render.
+
+Overdue counts depend on the date, so each row records the date they are
+counted against (overdue_as_of). Triggers keep the count exact for that
+date; readers call refresh_overdue() once the user's date moves on.
+
+    python -m core.summary_counters --verify     # exit 1 if a counter is off
+    python -m core.summary_counters --rebuild
+"""
+import argparse
+import datetime
+import sys
+from typing import List
+
+from core import database
+from core.writer import run_write
+
+def _counter_updates(row: str, sign: str) -> str:
+    """Trigger statements adding ('+') or removing ('-') task `row` (NEW or OLD) from its counters."""
+    return f"""
+        UPDATE group_summary
+        SET total = total {sign} 1,
+            completed = completed {sign} IFNULL({row}.completed = 1, 0),
+            overdue = overdue {sign} IFNULL({row}.completed = 0 AND {row}.due_date < overdue_as_of, 0)
+        WHERE group_id = {row}.group_id;
+        UPDATE user_summary
+        SET total = total {sign} 1,
+            completed = completed {sign} IFNULL({row}.completed = 1, 0),
+            overdue = overdue {sign} IFNULL({row}.completed = 0 AND {row}.due_date < overdue_as_of, 0)
+        WHERE username = (SELECT created_by FROM groups WHERE group_id = {row}.group_id AND isTemplate = 0);
+    """
+
+def create_summary_tables(conn) -> None:
+    """Counter tables and their triggers, filled from the current data; overdue counts are recounted on first read."""
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS group_summary (
+            group_id INTEGER PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            overdue INTEGER NOT NULL DEFAULT 0,
+            overdue_as_of TEXT NOT NULL DEFAULT '',
+            FOREIGN KEY (group_id) REFERENCES groups(group_id)
+        )
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS user_summary (
+            username TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            overdue INTEGER NOT NULL DEFAULT 0,
+            overdue_as_of TEXT NOT NULL DEFAULT '',
+            FOREIGN KEY (username) REFERENCES users(username)
+        )
+    """)
+
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_summary_insert AFTER INSERT ON tasks
+        BEGIN {_counter_updates("NEW", "+")} END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_summary_delete AFTER DELETE ON tasks
+        BEGIN {_counter_updates("OLD", "-")} END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_summary_update AFTER UPDATE OF group_id, completed, due_date ON tasks
+        WHEN OLD.group_id IS NOT NEW.group_id OR OLD.completed IS NOT NEW.completed
+          OR OLD.due_date IS NOT NEW.due_date
+        BEGIN {_counter_updates("OLD", "-")} {_counter_updates("NEW", "+")} END
+    """)
+
+    # A new group counts overdue tasks as of its owner's date, so both stay consistent
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_summary_insert AFTER INSERT ON groups
+        BEGIN
+            INSERT OR IGNORE INTO user_summary (username)
+            SELECT NEW.created_by WHERE NEW.created_by IS NOT NULL;
+            INSERT OR IGNORE INTO group_summary (group_id, overdue_as_of)
+            VALUES (NEW.group_id, IFNULL((SELECT overdue_as_of FROM user_summary WHERE username = NEW.created_by), ''));
+        END
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_summary_delete AFTER DELETE ON groups
+        BEGIN
+            UPDATE user_summary
+            SET total = user_summary.total - s.total,
+                completed = user_summary.completed - s.completed,
+                overdue = user_summary.overdue - (s.overdue_as_of = user_summary.overdue_as_of) * s.overdue
+            FROM (SELECT total, completed, overdue, overdue_as_of FROM group_summary WHERE group_id = OLD.group_id) AS s
+            WHERE username = OLD.created_by AND OLD.isTemplate = 0;
+            DELETE FROM group_summary WHERE group_id = OLD.group_id;
+        END
+    """)
+    # Moving a group between owners (or in and out of the templates) resets the
+    # overdue counts involved to "not counted yet"; the next read recounts them
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_summary_owner AFTER UPDATE OF created_by, isTemplate ON groups
+        WHEN OLD.created_by IS NOT NEW.created_by OR OLD.isTemplate IS NOT NEW.isTemplate
+        BEGIN
+            UPDATE user_summary
+            SET total = user_summary.total - s.total,
+                completed = user_summary.completed - s.completed,
+                overdue = 0, overdue_as_of = ''
+            FROM (SELECT total, completed FROM group_summary WHERE group_id = OLD.group_id) AS s
+            WHERE username = OLD.created_by AND OLD.isTemplate = 0;
+            INSERT OR IGNORE INTO user_summary (username)
+            SELECT NEW.created_by WHERE NEW.created_by IS NOT NULL;
+            UPDATE user_summary
+            SET total = user_summary.total + s.total,
+                completed = user_summary.completed + s.completed,
+                overdue = 0, overdue_as_of = ''
+            FROM (SELECT total, completed FROM group_summary WHERE group_id = NEW.group_id) AS s
+            WHERE username = NEW.created_by AND NEW.isTemplate = 0;
+            UPDATE group_summary SET overdue = 0, overdue_as_of = '' WHERE group_id = NEW.group_id;
+        END
+    """)
+    rebuild_summaries(conn)
+
+def rebuild_summaries(conn, today: str = "") -> None:
+    """Recomputes every counter from tasks and groups, counting overdue tasks as of `today`."""
+    c = conn.cursor()
+    c.execute("DELETE FROM group_summary")
+    c.execute("DELETE FROM user_summary")
+    c.execute("""
+        INSERT INTO group_summary (group_id, total, completed, overdue, overdue_as_of)
+        SELECT g.group_id,
+               COUNT(t.task_id),
+               IFNULL(SUM(t.completed = 1), 0),
+               IFNULL(SUM(t.completed = 0 AND t.due_date < :today), 0),
+               :today
+        FROM groups g
+        LEFT JOIN tasks t ON t.group_id = g.group_id
+        GROUP BY g.group_id
+    """, {"today": today})
+    c.execute("""
+        INSERT INTO user_summary (username, total, completed, overdue, overdue_as_of)
+        SELECT g.created_by,
+               IFNULL(SUM(s.total * (g.isTemplate = 0)), 0),
+               IFNULL(SUM(s.completed * (g.isTemplate = 0)), 0),
+               IFNULL(SUM(s.overdue * (g.isTemplate = 0)), 0),
+               :today
+        FROM groups g
+        JOIN group_summary s ON s.group_id = g.group_id
+        WHERE g.created_by IS NOT NULL
+        GROUP BY g.created_by
+    """, {"today": today})
+
+def refresh_overdue(conn, username: str, today: str) -> None:
+    """Write job recounting the overdue tasks of a user and their groups as of `today`."""
+    c = conn.cursor()
+    c.execute("INSERT OR IGNORE INTO user_summary (username) VALUES (?)", (username,))
+    c.execute("""
+        UPDATE group_summary
+        SET overdue = (
+                SELECT COUNT(*) FROM tasks t
+                WHERE t.group_id = group_summary.group_id AND t.completed = 0 AND t.due_date < :today
+            ),
+            overdue_as_of = :today
+        WHERE group_id IN (SELECT group_id FROM groups WHERE created_by = :username)
+    """, {"today": today, "username": username})
+    c.execute("""
+        UPDATE user_summary
+        SET overdue = (
+                SELECT IFNULL(SUM(s.overdue), 0)
+                FROM groups g
+                JOIN group_summary s ON s.group_id = g.group_id
+                WHERE g.created_by = :username AND g.isTemplate = 0
+            ),
+            overdue_as_of = :today
+        WHERE username = :username
+    """, {"today": today, "username": username})
+
+def verify_summaries(conn) -> List[str]:
+    """Counters that disagree with the base tables (overdue checked as of each row's own date)."""
+    c = conn.cursor()
+    problems = []
+
+    c.execute("""
+        SELECT s.group_id, s.total, s.completed, s.overdue,
+               COUNT(t.task_id),
+               IFNULL(SUM(t.completed = 1), 0),
+               IFNULL(SUM(t.completed = 0 AND t.due_date < s.overdue_as_of), 0)
+        FROM group_summary s
+        LEFT JOIN tasks t ON t.group_id = s.group_id
+        GROUP BY s.group_id
+    """)
+    for group_id, *counts in c.fetchall():
+        if counts[:3] != counts[3:]:
+            problems.append(f"group {group_id}: (total, completed, overdue) = {tuple(counts[:3])}, "
+                            f"expected {tuple(counts[3:])}")
+
+    c.execute("""
+        SELECT u.username, u.total, u.completed, u.overdue,
+               COUNT(t.task_id),
+               IFNULL(SUM(t.completed = 1), 0),
+               IFNULL(SUM(t.completed = 0 AND t.due_date < u.overdue_as_of), 0)
+        FROM user_summary u
+        LEFT JOIN groups g ON g.created_by = u.username AND g.isTemplate = 0
+        LEFT JOIN tasks t ON t.group_id = g.group_id
+        GROUP BY u.username
+    """)
+    for username, *counts in c.fetchall():
+        if counts[:3] != counts[3:]:
+            problems.append(f"user {username}: (total, completed, overdue) = {tuple(counts[:3])}, "
+                            f"expected {tuple(counts[3:])}")
+
+    c.execute("SELECT group_id FROM groups WHERE group_id NOT IN (SELECT group_id FROM group_summary)")
+    problems += [f"group {group_id}: no counter row" for group_id, in c.fetchall()]
+    c.execute("SELECT group_id FROM group_summary WHERE group_id NOT IN (SELECT group_id FROM groups)")
+    problems += [f"group {group_id}: counter row for a deleted group" for group_id, in c.fetchall()]
+    c.execute("""
+        SELECT DISTINCT created_by FROM groups
+        WHERE isTemplate = 0 AND created_by NOT IN (SELECT username FROM user_summary)
+    """)
+    problems += [f"user {username}: no counter row" for username, in c.fetchall()]
+    return problems
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Check or rebuild the task summary counters")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--verify", action="store_true", help="compare the counters with the base tables")
+    action.add_argument("--rebuild", action="store_true", help="recompute every counter")
+    parser.add_argument("--today", type=datetime.date.fromisoformat,
+                        help="date overdue counts are rebuilt as of (default: today)")
+    parser.add_argument("--database", default=database.DATABASE_NAME,
+                        help="SQLite database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    # Imported here: core.migrations creates the counters through this module
+    from core.migrations import ensure_schema
+    database.DATABASE_NAME = args.database
+    ensure_schema(args.database)
+
+    if args.rebuild:
+        # Through the writer: pooled connections are read-only in WAL mode
+        run_write(rebuild_summaries, (args.today or datetime.date.today()).isoformat())
+        print("Summary counters rebuilt")
+    conn = database.get_connection()
+    try:
+        problems = verify_summaries(conn)
+    finally:
+        conn.close()
+
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"{len(problems)} summary counters disagree with the base tables; fix with --rebuild",
+              file=sys.stderr)
+        sys.exit(1)
+    print("Summary counters match the base tables")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#core/telegram_delivery.py
+import asyncio
+import random
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, InvalidToken, NetworkError, RetryAfter
+from telegram.request import HTTPXRequest
+
+from core.config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_BASE_URL, TELEGRAM_CONCURRENCY,
+    TELEGRAM_GLOBAL_RATE, TELEGRAM_PER_CHAT_RATE, TELEGRAM_MAX_RETRIES, TELEGRAM_RETRY_BACKOFF
+)
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class TelegramDelivery:
+    """
+    Async Telegram sender that reuses one Bot and HTTP connection pool.
+
+    Sends run in parallel up to `concurrency`, are throttled by a global and a
+    per-chat token bucket, and are retried with exponential backoff on network
+    errors (or after the delay Telegram asks for on RetryAfter). Point
+    `base_url` at a local fake server to exercise it without Telegram.
+
+        async with TelegramDelivery() as delivery:
+            results = await delivery.send_many([(key, chat_id, text), ...])
+    """
+
+    def __init__(self, token=TELEGRAM_BOT_TOKEN, base_url=TELEGRAM_API_BASE_URL,
+                 concurrency=TELEGRAM_CONCURRENCY, global_rate=TELEGRAM_GLOBAL_RATE,
+                 per_chat_rate=TELEGRAM_PER_CHAT_RATE, max_retries=TELEGRAM_MAX_RETRIES,
+                 retry_backoff=TELEGRAM_RETRY_BACKOFF, default_chat_id=TELEGRAM_CHAT_ID):
+        if not token:
+            raise RuntimeError("Telegram configuration is missing. Please set up TELEGRAM_BOT_TOKEN")
+        self.bot = Bot(
+            token=token,
+            base_url=base_url,
+            request=HTTPXRequest(connection_pool_size=concurrency)
+        )
+        self.default_chat_id = default_chat_id
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.per_chat_rate = per_chat_rate
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._global_bucket = TokenBucket(global_rate)
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        self.stats = {"sent": 0, "failed": 0, "retries": 0}
+
+    async def __aenter__(self):
+        try:
+            await self.bot.initialize()
+        except InvalidToken:
+            raise
+        except NetworkError as e:
+            # Telegram unreachable right now; sends will retry and record failures
+            print(f"Telegram bot initialisation failed: {e}")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.bot.shutdown()
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, capacity=1)
+        return bucket
+
+    async def send(self, chat_id, text: str) -> None:
+        """Sends one message, retrying transient failures. Raises the last error on failure."""
+        chat_id = chat_id or self.default_chat_id
+        if not chat_id:
+            raise RuntimeError("No Telegram chat id for this notification")
+
+        for attempt in range(self.max_retries + 1):
+            # Wait for rate-limit tokens before taking one of the concurrency slots,
+            # so a busy chat does not hold slots other chats could use
+            await self._chat_bucket(chat_id).acquire()
+            await self._global_bucket.acquire()
+            try:
+                async with self._semaphore:
+                    await self.bot.send_message(chat_id=chat_id, text=text)
+                self.stats["sent"] += 1
+                return
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                retry_after = e.retry_after
+                delay = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after
+            except (BadRequest, Forbidden, InvalidToken):
+                raise  # permanent: retrying will not help
+            except NetworkError:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt) * (1 + random.random() / 2)
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def send_many(self, messages: Iterable[Tuple]) -> Dict:
+        """
+        Sends (key, chat_id, text) messages concurrently.
+        Returns {key: None} for successes and {key: error message} for failures.
+        """
+        messages = list(messages)
+
+        async def send_one(chat_id, text):
+            try:
+                await self.send(chat_id, text)
+                return None
+            except Exception as e:
+                self.stats["failed"] += 1
+                return f"{type(e).__name__}: {e}"
+
+        errors = await asyncio.gather(*(send_one(chat_id, text) for _, chat_id, text in messages))
+        return {key: error for (key, _, _), error in zip(messages, errors)}
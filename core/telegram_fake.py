@@ -0,0 +1,154 @@
+#core/telegram_fake.py
+"""
+Local fake of the Telegram Bot API for exercising core.telegram_delivery.
+
+FakeTelegram serves getMe and sendMessage on 127.0.0.1, records when each
+message arrived and for which chat, and answers scripted failures (429
+with retry_after, 502, 400) before succeeding. Point TelegramDelivery (or
+AUTOTASK_TELEGRAM_API_BASE_URL) at its base_url.
+
+    python -m core.telegram_fake     # runs check_delivery(), exit 1 on a problem
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from core.telegram_delivery import TelegramDelivery
+
+# Error bodies the Bot API sends for the statuses a script can ask for
+_ERRORS = {
+    400: {"description": "Bad Request: chat not found"},
+    429: {"description": "Too Many Requests: retry after 1", "parameters": {"retry_after": 1}},
+    502: {"description": "Bad Gateway"},
+}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            params = json.loads(body or "{}")
+        else:
+            params = {key: values[0] for key, values in parse_qs(body).items()}
+        status, payload = self.server.fake.answer(self.path.rsplit("/", 1)[-1], params)
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST
+
+    def log_message(self, *args):
+        pass
+
+class FakeTelegram:
+    """
+    Bot API stand-in. failures maps a message text to the statuses to answer
+    for its first attempts, e.g. {"flaky": [502, 502]}.
+
+        with FakeTelegram({"flaky": [429]}) as fake:
+            TelegramDelivery(token="1:fake", base_url=fake.base_url)
+    """
+
+    def __init__(self, failures: Optional[Dict[str, List[int]]] = None):
+        self.failures = {text: list(statuses) for text, statuses in (failures or {}).items()}
+        self.requests: List[Tuple[float, str, str, int]] = []  # (monotonic time, chat_id, text, status)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FakeTelegram", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/bot"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def answer(self, method: str, params: dict) -> Tuple[int, dict]:
+        if method == "getMe":
+            return 200, {"ok": True, "result": {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}}
+        if method != "sendMessage":
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+
+        chat_id, text = str(params.get("chat_id")), params.get("text", "")
+        with self._lock:
+            scripted = self.failures.get(text)
+            status = scripted.pop(0) if scripted else 200
+            self.requests.append((time.monotonic(), chat_id, text, status))
+            message_id = len(self.requests)
+        if status != 200:
+            return status, dict(_ERRORS[status], ok=False, error_code=status)
+        return 200, {"ok": True, "result": {
+            "message_id": message_id, "date": int(time.time()), "text": text,
+            "chat": {"id": int(chat_id), "type": "private"},
+        }}
+
+    def sent(self, text: str) -> List[Tuple[float, str, str, int]]:
+        """Requests made for one message text, in arrival order."""
+        return [request for request in self.requests if request[2] == text]
+
+def check_delivery(global_rate: float = 10, per_chat_rate: float = 5) -> List[str]:
+    """Sends a scripted batch through TelegramDelivery against a FakeTelegram; returns the problems seen."""
+    messages = [(f"c{chat}-{n}", str(chat), f"chat {chat} message {n}") for chat in (1, 2) for n in range(10)]
+    messages += [("rate-limited", "3", "rate-limited"), ("flaky", "4", "flaky"), ("rejected", "5", "rejected")]
+    failures = {"rate-limited": [429], "flaky": [502, 502], "rejected": [400]}
+    problems = []
+
+    with FakeTelegram(failures) as fake:
+        async def send():
+            async with TelegramDelivery(token="1:fake", base_url=fake.base_url, concurrency=4,
+                                        global_rate=global_rate, per_chat_rate=per_chat_rate,
+                                        max_retries=2, retry_backoff=0.05) as delivery:
+                return await delivery.send_many(messages), delivery.stats
+
+        results, stats = asyncio.run(send())
+
+    failed = {key for key, error in results.items() if error}
+    if failed != {"rejected"}:
+        problems.append(f"failed messages {sorted(failed)}, expected only 'rejected'")
+    attempts = {text: len(fake.sent(text)) for text in failures}
+    if attempts != {"rate-limited": 2, "flaky": 3, "rejected": 1}:
+        problems.append(f"attempts per scripted message {attempts}, expected 2 (429), 3 (502, 502) and 1 (400)")
+    rate_limited = fake.sent("rate-limited")
+    if len(rate_limited) == 2 and rate_limited[1][0] - rate_limited[0][0] < 0.95:
+        problems.append("the retry after a 429 did not wait for retry_after")
+
+    # Per-chat bucket (capacity 1): consecutive sends to a chat are 1/rate apart
+    for chat in ("1", "2"):
+        times = [t for t, chat_id, _, _ in fake.requests if chat_id == chat]
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        if gaps and min(gaps) < 0.9 / per_chat_rate:
+            problems.append(f"chat {chat}: sends {min(gaps):.3f}s apart, per-chat rate allows {1 / per_chat_rate:.3f}s")
+    # Global bucket (burst of global_rate): no one-second window holds more than burst + rate
+    times = sorted(t for t, _, _, _ in fake.requests)
+    busiest = max(sum(1 for t in times[i:] if t < start + 1) for i, start in enumerate(times))
+    if busiest > 2 * global_rate:
+        problems.append(f"{busiest} sends in one second, global rate allows {2 * global_rate:.0f}")
+    if stats != {"sent": 22, "failed": 1, "retries": 3}:
+        problems.append(f"delivery stats {stats}, expected 22 sent, 1 failed, 3 retries")
+    return problems
+
+def main() -> None:
+    problems = check_delivery()
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+    print("Telegram delivery: rate limits, retries and permanent failures behave as configured")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#core/template_catalogue.py
+"""
+Process-wide template catalogue.
+
+Templates are shared by every user, so the list is loaded once per process
+rather than on every render of the group form, and the forms look labels
+up in dicts instead of scanning the list. Triggers on groups bump the
+template_catalogue_version row whenever a template group is added, renamed
+or removed, by this process or any other (e.g. a bulk import), and the
+cached catalogue is reloaded when that version moves.
+"""
+import threading
+from typing import Dict, List, Tuple
+
+from core import queries
+
+class TemplateCatalogue:
+    """Template rows plus id -> name and id -> remarks maps."""
+
+    def __init__(self, templates: List[Tuple]):
+        self.templates = templates
+        self.ids = [group_id for group_id, _, _ in templates]
+        self.labels: Dict[int, str] = {group_id: name for group_id, name, _ in templates}
+        self.remarks: Dict[int, str] = {group_id: remarks for group_id, _, remarks in templates}
+
+def create_catalogue_version(conn) -> None:
+    """The one-row catalogue version table and the triggers on template groups that bump it."""
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS template_catalogue_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    c.execute("INSERT OR IGNORE INTO template_catalogue_version (id) VALUES (1)")
+    bump = "UPDATE template_catalogue_version SET version = version + 1 WHERE id = 1;"
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_catalogue_insert AFTER INSERT ON groups
+        WHEN NEW.isTemplate = 1
+        BEGIN {bump} END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_catalogue_delete AFTER DELETE ON groups
+        WHEN OLD.isTemplate = 1
+        BEGIN {bump} END
+    """)
+    c.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_groups_catalogue_update
+        AFTER UPDATE OF group_name, remarks, isTemplate ON groups
+        WHEN OLD.isTemplate = 1 OR NEW.isTemplate = 1
+        BEGIN {bump} END
+    """)
+
+def get_catalogue_version(conn) -> int:
+    """Returns the template catalogue version recorded in the database."""
+    c = conn.cursor()
+    c.execute("SELECT version FROM template_catalogue_version WHERE id = 1")
+    row = c.fetchone()
+    return row[0] if row else 0
+
+_catalogue = None
+_version = None
+_catalogue_lock = threading.Lock()
+
+def get_template_catalogue(conn) -> TemplateCatalogue:
+    """Returns the cached catalogue, reloading it with one query when the version has moved."""
+    global _catalogue, _version
+    # Read the version before the templates, so an edit in between only causes another reload
+    version = get_catalogue_version(conn)
+    catalogue = _catalogue
+    if catalogue is None or version != _version:
+        c = conn.cursor()
+        c.execute(queries.TEMPLATES)
+        catalogue = TemplateCatalogue(c.fetchall())
+        with _catalogue_lock:
+            _catalogue, _version = catalogue, version
+    return catalogue
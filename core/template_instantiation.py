@@ -0,0 +1,253 @@
+#core/template_instantiation.py
+"""
+Batch template instantiation.
+
+Creates a group from one template for many users. A job and its per-user
+items are recorded first; run_job then builds the groups in large write
+transactions, marking each item done in the same transaction as its group,
+so an interrupted run resumes exactly where it stopped.
+
+    python -m core.template_instantiation --template 1 --users users.csv --start-date 2026-02-01
+    python -m core.template_instantiation --resume 3
+    python -m core.template_instantiation --status 3
+
+The users file has one `username[,start_date]` per line.
+"""
+import argparse
+import csv
+import datetime
+from typing import Callable, Iterable, Optional, Tuple
+
+from core import database
+from core.config import TEMPLATE_BATCH_SIZE
+from core.database import get_connection
+from core.migrations import ensure_schema
+from core.writer import run_write
+from utils.templates import create_from_template
+
+def print_progress(job_id: int, done: int, failed: int, total: int) -> None:
+    """Default progress reporter for run_job."""
+    finished = done + failed
+    percent = finished * 100 // total if total else 100
+    print(f"Job {job_id}: {finished}/{total} groups ({percent}%), {failed} failed")
+
+def create_job(
+    template_id: int,
+    assignments: Iterable[Tuple[str, datetime.date]],
+    group_name: Optional[str] = None,
+    enable_notifications: bool = True
+) -> int:
+    """
+    Records a job creating `template_id` for each (username, start_date) pair.
+    The group name defaults to the template's name. Returns the job id.
+    """
+    items = [(username, start_date.isoformat()) for username, start_date in assignments]
+
+    def insert_job(conn):
+        c = conn.cursor()
+        c.execute("SELECT group_name FROM groups WHERE group_id=? AND isTemplate=1", (template_id,))
+        template = c.fetchone()
+        if template is None:
+            raise ValueError(f"Template {template_id} does not exist")
+
+        c.execute("""
+            INSERT INTO instantiation_jobs (template_id, group_name, enable_notifications)
+            VALUES (?,?,?)
+        """, (template_id, group_name or template[0], int(enable_notifications)))
+        job_id = c.lastrowid
+        c.executemany("""
+            INSERT INTO instantiation_job_items (job_id, position, username, start_date)
+            VALUES (?,?,?,?)
+        """, [(job_id, position, username, start_date)
+              for position, (username, start_date) in enumerate(items)])
+        return job_id
+
+    return run_write(insert_job)
+
+def job_status(job_id: int) -> Optional[dict]:
+    """Returns the job's settings and item counts by status, or None if it does not exist."""
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        c.execute("""
+            SELECT template_id, group_name, status, created_at, finished_at
+            FROM instantiation_jobs WHERE job_id=?
+        """, (job_id,))
+        job = c.fetchone()
+        if job is None:
+            return None
+        c.execute("""
+            SELECT
+                COUNT(*),
+                SUM(CASE WHEN status = 'done' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END)
+            FROM instantiation_job_items WHERE job_id=?
+        """, (job_id,))
+        total, done, failed = c.fetchone()
+        return {
+            "job_id": job_id,
+            "template_id": job[0],
+            "group_name": job[1],
+            "status": job[2],
+            "created_at": job[3],
+            "finished_at": job[4],
+            "total": total,
+            "done": done or 0,
+            "failed": failed or 0,
+        }
+    finally:
+        conn.close()
+
+def _build_batch(conn, job_id: int, batch_size: int) -> int:
+    """
+    Write job: builds the next `batch_size` pending groups of a job. Each item
+    runs in its own savepoint so a bad item is marked failed without undoing
+    the rest of the batch. Returns the number of items processed.
+    """
+    c = conn.cursor()
+    c.execute("""
+        SELECT j.template_id, j.group_name, j.enable_notifications, g.color, g.remarks
+        FROM instantiation_jobs j
+        JOIN groups g ON g.group_id = j.template_id
+        WHERE j.job_id=?
+    """, (job_id,))
+    template_id, group_name, enable_notifications, color, remarks = c.fetchone()
+
+    c.execute("""
+        SELECT i.position, i.username, i.start_date, u.username IS NOT NULL
+        FROM instantiation_job_items i
+        LEFT JOIN users u ON u.username = i.username
+        WHERE i.job_id=? AND i.status = 'pending'
+        ORDER BY i.position
+        LIMIT ?
+    """, (job_id, batch_size))
+    items = c.fetchall()
+
+    for position, username, start_date, user_exists in items:
+        c.execute("SAVEPOINT instantiate_item")
+        try:
+            if not user_exists:
+                raise ValueError(f"User '{username}' does not exist")
+            c.execute("""
+                INSERT INTO groups (group_name, color, remarks, created_by, isTemplate, start_date)
+                VALUES (?,?,?,?,?,?)
+            """, (group_name, color, remarks, username, 0, start_date))
+            group_id = c.lastrowid
+            create_from_template(
+                conn=conn,
+                template_id=template_id,
+                new_group_id=group_id,
+                start_date=datetime.date.fromisoformat(start_date),
+                username=username,
+                enable_notifications=bool(enable_notifications)
+            )
+            c.execute("""
+                UPDATE instantiation_job_items SET status = 'done', group_id = ?
+                WHERE job_id = ? AND position = ?
+            """, (group_id, job_id, position))
+            c.execute("RELEASE instantiate_item")
+        except Exception as e:
+            c.execute("ROLLBACK TO instantiate_item")
+            c.execute("RELEASE instantiate_item")
+            c.execute("""
+                UPDATE instantiation_job_items SET status = 'failed', error = ?
+                WHERE job_id = ? AND position = ?
+            """, (str(e), job_id, position))
+
+    status = "running" if len(items) == batch_size else "finished"
+    c.execute("""
+        UPDATE instantiation_jobs
+        SET status = ?, finished_at = CASE WHEN ? = 'finished' THEN CURRENT_TIMESTAMP END
+        WHERE job_id = ?
+    """, (status, status, job_id))
+    return len(items)
+
+def run_job(
+    job_id: int,
+    batch_size: int = TEMPLATE_BATCH_SIZE,
+    progress: Optional[Callable[[int, int, int, int], None]] = print_progress
+) -> dict:
+    """
+    Builds every pending group of a job, `batch_size` groups per transaction,
+    calling progress(job_id, done, failed, total) after each commit. Safe to
+    call again on an interrupted or finished job. Returns the final job_status.
+    """
+    status = job_status(job_id)
+    if status is None:
+        raise ValueError(f"Job {job_id} does not exist")
+
+    while status["status"] != "finished":
+        run_write(_build_batch, job_id, batch_size)
+        status = job_status(job_id)
+        if progress:
+            progress(job_id, status["done"], status["failed"], status["total"])
+    return status
+
+def instantiate_template_for_users(
+    template_id: int,
+    assignments: Iterable[Tuple[str, datetime.date]],
+    group_name: Optional[str] = None,
+    enable_notifications: bool = True,
+    batch_size: int = TEMPLATE_BATCH_SIZE,
+    progress: Optional[Callable[[int, int, int, int], None]] = print_progress
+) -> dict:
+    """Creates and runs a batch instantiation job. Returns the final job_status."""
+    job_id = create_job(template_id, assignments, group_name, enable_notifications)
+    return run_job(job_id, batch_size, progress)
+
+def read_assignments(path: str, default_start: Optional[datetime.date]):
+    """Reads `username[,start_date]` lines from a CSV file."""
+    assignments = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].startswith("#"):
+                continue
+            start = row[1].strip() if len(row) > 1 and row[1].strip() else None
+            if start is None and default_start is None:
+                raise ValueError(f"No start date for '{row[0]}' and no --start-date given")
+            assignments.append((row[0].strip(), datetime.date.fromisoformat(start) if start else default_start))
+    return assignments
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Create a template's group for many users")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--template", type=int, help="template group id to instantiate")
+    action.add_argument("--resume", type=int, metavar="JOB_ID", help="continue an interrupted job")
+    action.add_argument("--status", type=int, metavar="JOB_ID", help="show a job's progress and exit")
+    parser.add_argument("--users", help="CSV file of username[,start_date] lines (with --template)")
+    parser.add_argument("--start-date", type=datetime.date.fromisoformat,
+                        help="start date for users without one (YYYY-MM-DD)")
+    parser.add_argument("--group-name", help="name of the new groups (default: template name)")
+    parser.add_argument("--no-notifications", action="store_true",
+                        help="create tasks with Telegram notifications disabled")
+    parser.add_argument("--batch-size", type=int, default=TEMPLATE_BATCH_SIZE,
+                        help="groups per transaction (default: %(default)s)")
+    parser.add_argument("--database", default=database.DATABASE_NAME,
+                        help="SQLite database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    database.DATABASE_NAME = args.database
+    ensure_schema(args.database)
+
+    if args.status is not None:
+        status = job_status(args.status)
+        print(status if status else f"Job {args.status} does not exist")
+        return
+
+    if args.resume is not None:
+        job_id = args.resume
+    else:
+        if not args.users:
+            parser.error("--users is required with --template")
+        assignments = read_assignments(args.users, args.start_date)
+        job_id = create_job(args.template, assignments, args.group_name, not args.no_notifications)
+        print(f"Created job {job_id} for {len(assignments)} users")
+
+    status = run_job(job_id, args.batch_size)
+    print(f"Job {job_id} {status['status']}: {status['done']} created, {status['failed']} failed")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("Interrupted; continue with --resume")
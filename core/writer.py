@@ -0,0 +1,161 @@
+#core/writer.py
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from core import database
+from core.config import DB_WRITE_BATCH_SIZE, DB_WRITE_BATCH_DELAY
+from core.database import get_connection, enable_wal, is_wal_mode
+
+class WriteQueue:
+    """
+    Single serialized writer for the WAL storage mode.
+
+    Write jobs are callables taking a connection. The writer thread drains
+    whatever is queued (up to batch_size jobs) and runs the batch in one
+    transaction, with a savepoint per job so one failing job does not undo
+    the others. Callers get the job's return value once the batch commits.
+
+    If the writer thread itself fails (e.g. it cannot open the database),
+    the jobs it holds, everything queued and everything submitted later
+    fail with that error instead of waiting forever; get_write_queue()
+    then starts a new writer.
+    """
+
+    def __init__(self, database_name, batch_size=DB_WRITE_BATCH_SIZE,
+                 batch_delay=DB_WRITE_BATCH_DELAY):
+        self.database_name = database_name
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._error = None
+        self._stats = {"jobs": 0, "batches": 0, "failed_jobs": 0, "largest_batch": 0}
+        self._thread = threading.Thread(target=self._run, name="AutoTaskWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queues fn(conn, *args, **kwargs) and returns a Future for its result."""
+        future = Future()
+        with self._lock:
+            if self._error is None:
+                self._queue.put((future, fn, args, kwargs))
+                return future
+        future.set_exception(self._error)
+        return future
+
+    @property
+    def stopped(self) -> bool:
+        """True once the writer thread has failed; it accepts no more jobs."""
+        return self._error is not None
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        stats["stopped"] = self.stopped
+        return stats
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        batch = []
+        try:
+            conn = sqlite3.connect(self.database_name, isolation_level=None, check_same_thread=False)
+            enable_wal(conn)
+            while True:
+                batch = self._next_batch()
+                self._run_batch(conn, batch)
+        except BaseException as e:
+            error = RuntimeError(f"Database writer stopped: {e}")
+            error.__cause__ = e
+            with self._lock:
+                self._error = error
+            pending = [future for future, _, _, _ in batch]
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait()[0])
+                except queue.Empty:
+                    break
+            for future in pending:
+                if not future.done():
+                    future.set_exception(error)
+
+    def _run_batch(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, fn, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT write_job")
+                try:
+                    results.append((future, fn(conn, *args, **kwargs), None))
+                    conn.execute("RELEASE write_job")
+                except BaseException as e:
+                    conn.execute("ROLLBACK TO write_job")
+                    conn.execute("RELEASE write_job")
+                    results.append((future, None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            results = [(future, None, e) for future, _, _, _ in batch if not future.done()]
+
+        self._stats["batches"] += 1
+        self._stats["jobs"] += len(results)
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                self._stats["failed_jobs"] += 1
+                future.set_exception(error)
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+def get_write_queue() -> WriteQueue:
+    """Return the process-wide writer, starting its thread on first use or after it stopped."""
+    global _write_queue
+    if _write_queue is None or _write_queue.stopped:
+        with _write_queue_lock:
+            if _write_queue is None or _write_queue.stopped:
+                _write_queue = WriteQueue(database.DATABASE_NAME)
+    return _write_queue
+
+def run_write(fn, *args, **kwargs):
+    """
+    Runs fn(conn, *args, **kwargs) as a write transaction and returns its result.
+
+    In WAL mode the job is serialized through the writer thread and may be
+    committed together with other sessions' writes. Otherwise it runs on a
+    pooled connection and is committed (or rolled back) here. Write jobs
+    must not commit themselves.
+    """
+    if is_wal_mode():
+        return get_write_queue().submit(fn, *args, **kwargs).result()
+
+    conn = get_connection()
+    try:
+        result = fn(conn, *args, **kwargs)
+        conn.commit()
+        return result
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -1,7 +1,16 @@
 #modules/dashboard.py
 import streamlit as st
 from core.database import get_connection
-from utils.calendar import get_events_for_user
+from core.writer import run_write
+from utils.calendar import get_visible_window, get_events_in_window
+from core import queries
+from core.cache import cached_read
+from core.instrumentation import timed
+from core.config import TASK_SUMMARY_PAGE_SIZE
+from core.date_utils import get_current_date, format_date as iso_date
+from utils.status_helpers import get_user_summary
+from utils.dashboard_data import load_dashboard_data, group_by_name
+from utils.pagination import visible_rows, show_load_more
 from streamlit_calendar import calendar as st_calendar
 import datetime
 
@@ -13,43 +22,7 @@ def format_date(date_str: str) -> str:
     except ValueError:
         return date_str
 
-def get_task_status(conn, task_id):
-    """Determines the current status of a task (completed, offtrack, ontrack, or inactive)."""
-    c = conn.cursor()
-    mock_date = st.session_state.get("mock_now", datetime.date.today())
-    
-    c.execute("""
-        SELECT t.completed, t.due_date, GROUP_CONCAT(tl.pre_task_id) as prereq_ids
-        FROM tasks t
-        LEFT JOIN task_link tl ON t.task_id = tl.task_id
-        WHERE t.task_id = ?
-        GROUP BY t.task_id
-    """, (task_id,))
-    result = c.fetchone()
-    
-    if not result:
-        return "inactive"
-        
-    completed, due_date_str, prereq_ids = result
-    
-    if completed:
-        return "completed"
-    
-    # Check if task is overdue
-    due_date = datetime.datetime.strptime(due_date_str, "%Y-%m-%d").date()
-    if due_date < mock_date:
-        return "offtrack"
-    
-    # Check prerequisites
-    if prereq_ids:
-        prereq_list = [int(x) for x in prereq_ids.split(',') if x]
-        for prereq_id in prereq_list:
-            prereq_status = get_task_status(conn, prereq_id)
-            if prereq_status == "offtrack":
-                return "offtrack"
-    
-    return "ontrack"
-
+@timed
 def show_dashboard():
     """Displays the main dashboard with task summary and calendar view."""
     st.title("📊 Dashboard")
@@ -78,22 +51,22 @@ def show_dashboard():
         st.subheader("📊 Your Task Summary")
         col1, col2 = st.columns(2)
 
-        # Get count of tasks in active groups (not completed and not templates)
-        c.execute("""
-            SELECT COUNT(DISTINCT t.task_id) 
-            FROM tasks t
-            JOIN groups g ON t.group_id = g.group_id
-            WHERE t.created_by = ? 
-            AND t.completed = 0
-            AND g.isTemplate = 0
-        """, (username,))
-        pending = c.fetchone()[0]
+        # Pending counts the user's active (non-template) groups; Completed counts
+        # every task they completed, template groups included
+        today = iso_date(get_current_date())
+        summary = cached_read(username, "user_summary", (today,),
+                              lambda: get_user_summary(conn, username, today))
+        pending = summary["total"] - summary["completed"]
+
+        def load_completed_count():
+            c.execute(queries.USER_COMPLETED_TASK_COUNT, (username,))
+            return c.fetchone()[0]
+
+        completed = cached_read(username, "completed_count", (), load_completed_count)
         if col1.button(f"🔄 Pending Tasks: {pending}", use_container_width=True):
             st.session_state.dashboard_view = "pending"
             st.rerun()
 
-        c.execute("SELECT COUNT(*) FROM tasks WHERE created_by=? AND completed=1", (username,))
-        completed = c.fetchone()[0]
         if col2.button(f"✅ Completed Tasks: {completed}", use_container_width=True):
             st.session_state.dashboard_view = "completed"
             st.rerun()
@@ -112,10 +85,13 @@ def show_dashboard():
 def show_calendar_section(conn, username):
     """Shows the calendar view section of the dashboard."""
     st.subheader("🗂️ View Preference")
-    c = conn.cursor()
-    c.execute("SELECT view_preference FROM users WHERE username=?", (username,))
-    result = c.fetchone()
-    view_preference = result[0] if result else 'calendar'
+    def load_view_preference():
+        c = conn.cursor()
+        c.execute("SELECT view_preference FROM users WHERE username=?", (username,))
+        result = c.fetchone()
+        return result[0] if result else 'calendar'
+
+    view_preference = cached_read(username, "view_preference", (), load_view_preference)
 
     new_view = st.radio(
         "Display Mode",
@@ -126,21 +102,23 @@ def show_calendar_section(conn, username):
 
     updated_pref = 'calendar' if new_view == "📅 Calendar View" else 'list'
     if updated_pref != view_preference:
-        c.execute("UPDATE users SET view_preference = ? WHERE username = ?", (updated_pref, username))
-        conn.commit()
+        run_write(lambda write_conn: write_conn.execute(
+            "UPDATE users SET view_preference = ? WHERE username = ?", (updated_pref, username)
+        ))
         st.rerun()
 
     # --- Calendar Configuration ---
-    events = get_events_for_user(username)
+    # Only the visible window (plus padding) is loaded, so navigation is
+    # driven from here and the component is remounted for each window
+    view_type, anchor = show_calendar_navigation(updated_pref)
+    start, end = get_visible_window(view_type, anchor)
+    events = get_events_in_window(username, start, end)
+
     calendar_options = {
-        "headerToolbar": {
-            "left": "prev,next today",
-            "center": "title",
-            "right": ("dayGridMonth,dayGridWeek,dayGridDay" if updated_pref == 'calendar'
-                       else "timeGridDay,timeGridWeek,dayGridMonth")
-        },
-        "initialView": ("dayGridMonth" if updated_pref == 'calendar' else "timeGridDay"),
-        "navLinks": True,
+        "headerToolbar": {"left": "", "center": "title", "right": ""},
+        "initialView": CALENDAR_VIEWS[updated_pref][view_type],
+        "initialDate": anchor.isoformat(),
+        "navLinks": False,
         "selectable": True,
         "editable": False,
         "height": 600
@@ -150,59 +128,96 @@ def show_calendar_section(conn, username):
         calendar_component = st_calendar(
             events=events,
             options=calendar_options,
-            key=f"calendar_{updated_pref}"
+            key=f"calendar_{updated_pref}_{view_type}_{anchor.isoformat()}"
         )
     except Exception as e:
         st.error(f"Failed to load calendar view: {e}")
+        return
+
+    sync_calendar_window(calendar_component, view_type, anchor)
+
+CALENDAR_VIEWS = {
+    "calendar": {"month": "dayGridMonth", "week": "dayGridWeek", "day": "dayGridDay"},
+    "list": {"month": "dayGridMonth", "week": "timeGridWeek", "day": "timeGridDay"},
+}
+
+def show_calendar_navigation(view_preference: str):
+    """Shows prev/today/next and view controls. Returns the (view type, anchor date) to display."""
+    if "calendar_anchor" not in st.session_state:
+        st.session_state.calendar_anchor = get_current_date()
+    if "calendar_view_type" not in st.session_state:
+        st.session_state.calendar_view_type = "month" if view_preference == 'calendar' else "day"
+
+    cols = st.columns([1, 1, 1, 4])
+    view_type = cols[3].radio(
+        "Range", ["month", "week", "day"],
+        index=["month", "week", "day"].index(st.session_state.calendar_view_type),
+        format_func=str.title, horizontal=True, label_visibility="collapsed"
+    )
+    st.session_state.calendar_view_type = view_type
+
+    anchor = st.session_state.calendar_anchor
+    if cols[0].button("◀", key="calendar_prev", use_container_width=True):
+        anchor = shift_anchor(view_type, anchor, -1)
+    if cols[1].button("Today", key="calendar_today", use_container_width=True):
+        anchor = get_current_date()
+    if cols[2].button("▶", key="calendar_next", use_container_width=True):
+        anchor = shift_anchor(view_type, anchor, 1)
+    st.session_state.calendar_anchor = anchor
+    return view_type, anchor
+
+def shift_anchor(view_type: str, anchor: datetime.date, step: int) -> datetime.date:
+    """Moves the anchor date one month, week or day forwards or backwards."""
+    if view_type == "month":
+        month = anchor.month - 1 + step
+        return datetime.date(anchor.year + month // 12, month % 12 + 1, 1)
+    return anchor + datetime.timedelta(days=step * (7 if view_type == "week" else 1))
+
+def sync_calendar_window(calendar_component, view_type: str, anchor: datetime.date) -> None:
+    """Follows the range reported by the component's callbacks if it moved outside our window."""
+    if not calendar_component:
+        return
+    payload = calendar_component.get(calendar_component.get("callback"), {})
+    view = payload.get("view") if isinstance(payload, dict) else None
+    if not view or "currentStart" not in view or "currentEnd" not in view:
+        return
+
+    # The range comes back as UTC timestamps; its midpoint is inside the
+    # displayed period whatever the browser's timezone
+    range_start = datetime.datetime.fromisoformat(view["currentStart"].replace("Z", "+00:00"))
+    range_end = datetime.datetime.fromisoformat(view["currentEnd"].replace("Z", "+00:00"))
+    reported_anchor = (range_start + (range_end - range_start) / 2).date()
+    reported_type = next((t for t in ("month", "week", "day") if t.title() in view.get("type", "")), view_type)
+    if get_visible_window(reported_type, reported_anchor) != get_visible_window(view_type, anchor):
+        st.session_state.calendar_view_type = reported_type
+        st.session_state.calendar_anchor = reported_anchor
+        st.rerun()
 
 
 def display_task_summary(username: str, completed: bool) -> None:
     """Shows a summary of tasks based on their completion status."""
     conn = get_connection()
     try:
-        c = conn.cursor()
-        
-        # Get tasks with their group information, filtering for active groups only
-        c.execute("""
-            SELECT t.task_name, t.due_date, g.group_name, t.task_id
-            FROM tasks t
-            JOIN groups g ON t.group_id = g.group_id
-            WHERE t.created_by = ? 
-            AND t.completed = ?
-            AND g.isTemplate = 0  -- Exclude template groups
-            AND EXISTS (
-                SELECT 1 
-                FROM tasks t2 
-                WHERE t2.group_id = g.group_id 
-                AND t2.completed = 0
-            )  -- Only include groups with active tasks
-            ORDER BY t.due_date
-        """, (username, int(completed)))
-        
-        tasks = c.fetchall()
+        # Both lists and every status come from a single query
+        today = get_current_date()
+        data = cached_read(username, "dashboard_data", (iso_date(today),),
+                           lambda: load_dashboard_data(conn, username, today))
+        list_key = f"task_summary_{int(completed)}"
+        tasks, has_more = visible_rows(list_key, data.completed if completed else data.pending,
+                                       TASK_SUMMARY_PAGE_SIZE)
         
         if not tasks:
             st.info("No active tasks found" if completed else "No pending active tasks")
             return
-            
+
         # Display tasks grouped by their status
         st.subheader("📋 Active Task Summary")
         
-        # Group tasks by their group name for better organization
-        tasks_by_group = {}
-        for task in tasks:
-            task_name, due_date, group_name, task_id = task
-            if group_name not in tasks_by_group:
-                tasks_by_group[group_name] = []
-            tasks_by_group[group_name].append((task_name, due_date, task_id))
-        
         # Display tasks organized by group
-        for group_name, group_tasks in tasks_by_group.items():
+        for group_name, group_tasks in group_by_name(tasks):
             st.markdown(f"**📦 {group_name}**")
             
-            for task_name, due_date, task_id in group_tasks:
-                status = get_task_status(conn, task_id)
-                
+            for _, task_name, due_date, _, status in group_tasks:
                 with st.container(border=True):
                     # Add colored status box using markdown
                     status_colors = {
@@ -218,6 +233,8 @@ def display_task_summary(username: str, completed: bool) -> None:
                     with cols[1]:
                         st.markdown(f"**{task_name}**")
                         st.caption(f"📅 Due: {format_date(due_date)}")
+
+        show_load_more(list_key, len(tasks), has_more)
                 
     finally:
         conn.close()
@@ -23,9 +23,12 @@ def show_login_page():
                 if st.form_submit_button("Login"):
                     if login(username, password):
                         conn = get_connection()
-                        c = conn.cursor()
-                        c.execute("SELECT view_preference FROM users WHERE username=?", (username,))
-                        result = c.fetchone()
+                        try:
+                            c = conn.cursor()
+                            c.execute("SELECT view_preference FROM users WHERE username=?", (username,))
+                            result = c.fetchone()
+                        finally:
+                            conn.close()
                         st.session_state.update({
                             "logged_in": True,
                             "username": username,
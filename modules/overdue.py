@@ -1,60 +1,54 @@
 #modules/overdue.py
 import streamlit as st
 from core.database import get_connection
+from core import queries
+from core.writer import run_write
+from core.instrumentation import timed
+from core.config import OVERDUE_PAGE_SIZE
+from utils.pagination import load_pages, show_load_more
 from typing import List, Tuple
 from datetime import datetime
 
 
+@timed
 def show_overdue_tasks():
     """Displays a list of all overdue tasks for the current user."""
     st.title("⚠️ Overdue Tasks")
     conn = get_connection()
-    c = conn.cursor()
-
-    # Get current date from session state (for mock date support) or use actual date
-    current_date = st.session_state.get('mock_now', datetime.now().date())
-    
-    c.execute("""
-        SELECT task_id, task_name, due_date
-        FROM tasks
-        WHERE due_date < ? 
-        AND completed = 0
-        AND created_by = ?
-    """, (current_date.strftime("%Y-%m-%d"), st.session_state.username))
-
-    overdue = c.fetchall()
+    try:
+        username = st.session_state.username
+        # Get current date from session state (for mock date support) or use actual date
+        current_date = st.session_state.get('mock_now', datetime.now().date()).strftime("%Y-%m-%d")
+        overdue, has_more = load_pages(
+            "overdue_tasks", username,
+            lambda cursor, limit: get_overdue_tasks(conn, username, current_date, cursor, limit),
+            first_cursor=("", 0), cursor_of=lambda row: (row[2], row[0]),
+            page_size=OVERDUE_PAGE_SIZE, args=(current_date,)
+        )
 
-    if not overdue:
-        st.success("🎉 No overdue tasks!")
-        return
+        if not overdue:
+            st.success("🎉 No overdue tasks!")
+            return
 
-    for task_id, name, due in overdue:
-        with st.container(border=True):
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.markdown(f"**{name}**")
-                st.caption(f"Due: {due}")
-            with col2:
-                if st.button("✅ Mark Complete", key=f"overdue_{task_id}"):
-                    c.execute("UPDATE tasks SET completed = 1 WHERE task_id = ?", (task_id,))
-                    conn.commit()
-                    st.rerun()
-
-    conn.close()
+        for task_id, name, due in overdue:
+            with st.container(border=True):
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.markdown(f"**{name}**")
+                    st.caption(f"Due: {due}")
+                with col2:
+                    if st.button("✅ Mark Complete", key=f"overdue_{task_id}"):
+                        run_write(mark_task_complete, task_id)
+                        st.rerun()
+        show_load_more("overdue_tasks", len(overdue), has_more)
+    finally:
+        conn.close()
 
 
-def get_overdue_tasks(conn, username: str) -> List[Tuple]:
-    """Fetches all overdue tasks from the database for a specific user."""
+def get_overdue_tasks(conn, username: str, current_date: str, cursor: Tuple, limit: int) -> List[Tuple]:
+    """Fetches up to `limit` overdue tasks of a user sorting after cursor (due_date, task_id)."""
     c = conn.cursor()
-    current_date = st.session_state.get('mock_now', datetime.now().date())
-    
-    c.execute("""
-        SELECT task_id, task_name, due_date
-        FROM tasks
-        WHERE due_date < ?
-        AND completed = 0
-        AND created_by = ?
-    """, (current_date.strftime("%Y-%m-%d"), username))
+    c.execute(queries.OVERDUE_TASKS_PAGE, (current_date, username, *cursor, limit))
     return c.fetchall()
 
 
@@ -72,13 +66,10 @@ def display_overdue_tasks(tasks: List[Tuple]) -> None:
                 st.caption(f"Due: {due}")
             with col2:
                 if st.button("✅ Mark Complete", key=f"overdue_{task_id}"):
-                    conn = get_connection()
-                    c = conn.cursor()
-                    c.execute("UPDATE tasks SET completed = 1 WHERE task_id = ?", (task_id,))
-                    conn.commit()
-                    conn.close()
+                    run_write(mark_task_complete, task_id)
                     st.rerun()
 
-    if 'conn' in locals():
-        conn.close()
-    
\ No newline at end of file
+
+def mark_task_complete(conn, task_id: int) -> None:
+    """Write job that marks an overdue task as completed."""
+    conn.execute("UPDATE tasks SET completed = 1 WHERE task_id = ?", (task_id,))
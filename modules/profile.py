@@ -1,6 +1,8 @@
 #modules/profile.py
 import streamlit as st
 from core.database import get_connection
+from core.writer import run_write
+from core.cache import cached_read
 
 
 def show_profile():
@@ -12,16 +14,22 @@ def show_profile():
         st.warning("Please log in to view your profile.")
         return
 
-    conn = get_connection()
-    c = conn.cursor()
-    
-    # Get user profile data
-    c.execute("""
-        SELECT full_name, email, address, gender, contact, view_preference
-        FROM users WHERE username = ?
-    """, (username,))
+    def load_profile():
+        conn = get_connection()
+        try:
+            c = conn.cursor()
+
+            # Get user profile data
+            c.execute("""
+                SELECT full_name, email, address, gender, contact, view_preference
+                FROM users WHERE username = ?
+            """, (username,))
+            return c.fetchone()
+        finally:
+            conn.close()
+
+    row = cached_read(username, "profile", (), load_profile)
 
-    row = c.fetchone()
     if not row:
         st.error("User profile not found.")
         return
@@ -64,7 +72,7 @@ def show_profile():
 
         if st.form_submit_button("Update Profile"):
             try:
-                c.execute("""
+                run_write(lambda write_conn: write_conn.execute("""
                     UPDATE users SET
                         full_name = ?,
                         email = ?,
@@ -79,11 +87,8 @@ def show_profile():
                     updated_gender,
                     updated_contact,
                     username
-                ))
-                conn.commit()
+                )))
                 st.success("Your profile has been updated successfully!")
                 st.rerun()
             except Exception as e:
                 st.error(f"Failed to update profile: {str(e)}")
-    
-    conn.close()
@@ -1,9 +1,18 @@
 from typing import List, Tuple, Optional, Dict
 import streamlit as st
 from core.database import get_connection
+from core import queries
+from core.writer import run_write
+from core.cache import cached_read
+from core.instrumentation import timed
+from core.config import GROUP_LIST_PAGE_SIZE
+from core.template_catalogue import get_template_catalogue
+from core.date_utils import get_current_date, format_date
+from utils.status_helpers import get_group_summaries
+from utils.pagination import load_pages, show_load_more
+from utils.templates import create_from_template
 import datetime
 from modules.task_detail import show_group_details
-from modules.dashboard import get_task_status
 
 ### Group Page Module
 ### This module manages the main group listing page, providing functionality for:
@@ -22,94 +31,7 @@ class TaskGroup:
         self.remarks = remarks
         self.is_template = is_template
 
-    @staticmethod
-    def create_from_template(
-        conn,
-        template_id: int,
-        new_group_id: int,
-        start_date: datetime.date,
-        username: str,
-        enable_notifications: bool
-    ) -> None:
-        """
-        Creates tasks in a new group based on a template.
-        """
-        c = conn.cursor()
-        try:
-            # Get template tasks
-            c.execute("""
-                SELECT task_id, task_name, description, notification_days, 
-                       due_date, recurrence_pattern, recurrence_end_date,
-                       priority, estimated_duration
-                FROM tasks 
-                WHERE group_id=?
-                ORDER BY due_date
-            """, (template_id,))
-            template_tasks = c.fetchall()
-
-            if not template_tasks:
-                return
-
-            # Calculate date offset from first task
-            first_task_date = datetime.datetime.strptime(template_tasks[0][4], "%Y-%m-%d").date()
-            date_offset = (start_date - first_task_date).days
-
-            # Copy tasks with new dates
-            task_id_map = {}  # Map old task IDs to new ones
-            for task in template_tasks:
-                old_task_id, name, desc, notif_days, due_date_str, rec_pattern, rec_end, priority, duration = task
-                
-                # Calculate new due date based on individual task dates
-                task_date = datetime.datetime.strptime(due_date_str, "%Y-%m-%d").date()
-                new_due_date = task_date + datetime.timedelta(days=date_offset)
-                
-                c.execute("""
-                    INSERT INTO tasks (
-                        group_id, task_name, description, notification_days,
-                        due_date, recurrence_pattern, recurrence_end_date,
-                        priority, estimated_duration, created_by, telegram_notify
-                    ) VALUES (?,?,?,?,?,?,?,?,?,?,?)
-                """, (
-                    new_group_id, name, desc, notif_days,
-                    new_due_date.isoformat(), rec_pattern, rec_end,
-                    priority, duration, username, enable_notifications
-                ))
-                task_id_map[old_task_id] = c.lastrowid
-
-            # Copy task dependencies
-            TaskGroup._copy_task_dependencies(conn, task_id_map)
-
-        except Exception as e:
-            raise Exception(f"Error copying template tasks: {str(e)}")
-
-    @staticmethod
-    def _copy_task_dependencies(conn, task_id_map: Dict[int, int]) -> None:
-        """
-        Copies task dependencies from template to new group.
-        """
-        if not task_id_map:
-            return
-            
-        c = conn.cursor()
-        try:
-            task_ids = list(task_id_map.keys())
-            placeholders = ','.join(['?' for _ in task_ids])
-            c.execute(f"""
-                SELECT task_id, pre_task_id, link_type 
-                FROM task_link 
-                WHERE task_id IN ({placeholders})
-                ORDER BY task_id
-            """, task_ids)
-            
-            for task_id, pre_task_id, link_type in c.fetchall():
-                if task_id in task_id_map and pre_task_id in task_id_map:
-                    c.execute("""
-                        INSERT INTO task_link (task_id, pre_task_id, link_type)
-                        VALUES (?,?,?)
-                    """, (task_id_map[task_id], task_id_map[pre_task_id], link_type))
-        except Exception as e:
-            raise Exception(f"Error copying task dependencies: {str(e)}")
-
+@timed
 def show_group_page() -> None:
     """Main function to display and manage tasks."""
     st.title("🗒 Tasks")
@@ -138,20 +60,17 @@ def create_group_form(username: str) -> None:
             remarks = st.text_area("Remarks", max_chars=200)
             
             # Template selection
-            templates = get_templates(conn)
-            template_options = [("0", "Create Empty Group")] + [(str(t[0]), t[1]) for t in templates]
+            catalogue = get_template_catalogue(conn)
             selected_template_id = st.selectbox(
                 "Create from Template",
-                options=[t[0] for t in template_options],
-                format_func=lambda x: next(t[1] for t in template_options if t[0] == x),
+                options=[0] + catalogue.ids,
+                format_func=lambda x: catalogue.labels.get(x, "Create Empty Group"),
                 key="template_selector"
             )
             
             # Show template description if available
-            if selected_template_id != "0":
-                template = next((t for t in templates if str(t[0]) == selected_template_id), None)
-                if template and template[2]:
-                    st.info(template[2])
+            if catalogue.remarks.get(selected_template_id):
+                st.info(catalogue.remarks[selected_template_id])
             
             # Common fields for all groups
             new_start_date = st.date_input(
@@ -163,32 +82,22 @@ def create_group_form(username: str) -> None:
             # Form submission
             if st.form_submit_button("Create Group"):
                 create_group(
-                    conn=conn,
                     username=username,
                     group_name=group_name,
                     color=color,
                     remarks=remarks,
                     start_date=new_start_date,
-                    selected_template_id=selected_template_id,
+                    selected_template_id=str(selected_template_id),
                     enable_notifications=enable_notifications
                 )
     finally:
         conn.close()
 
 def get_templates(conn) -> List[Tuple]:
-    """Fetches all available task templates from the database."""
-    c = conn.cursor()
-    c.execute("""
-        SELECT DISTINCT g.group_id, g.group_name, g.remarks 
-        FROM groups g
-        WHERE g.isTemplate=1
-        GROUP BY g.group_name
-        ORDER BY g.group_name
-    """)
-    return c.fetchall()
+    """Returns all available task templates from the template catalogue."""
+    return get_template_catalogue(conn).templates
 
 def create_group(
-    conn,
     username: str,
     group_name: str,
     color: str,
@@ -202,10 +111,9 @@ def create_group(
         st.error("Group name is required")
         return
 
-    try:
-        conn.execute("BEGIN TRANSACTION")
+    def insert_group(conn):
         c = conn.cursor()
-        
+
         # Create new group
         c.execute("""
             INSERT INTO groups (group_name, color, remarks, created_by, isTemplate, start_date)
@@ -215,7 +123,7 @@ def create_group(
 
         # Copy template if selected
         if selected_template_id != "0":
-            TaskGroup.create_from_template(
+            create_from_template(
                 conn=conn,
                 template_id=int(selected_template_id),
                 new_group_id=new_group_id,
@@ -223,39 +131,45 @@ def create_group(
                 username=username,
                 enable_notifications=enable_notifications
             )
+        return new_group_id
 
-        conn.commit()
+    try:
+        run_write(insert_group)
         st.success(f"Group '{group_name}' created successfully!")
         st.rerun()
-        
     except Exception as e:
-        conn.rollback()
         st.error(f"Error creating group: {str(e)}")
 
 def display_group_list(username: str) -> None:
     """Shows a list of all task groups for the current user."""
     conn = get_connection()
     try:
-        c = conn.cursor()
-        c.execute("""
-            SELECT group_id, group_name, color, remarks, isTemplate 
-            FROM groups 
-            WHERE created_by=? AND isTemplate=0
-            ORDER BY group_name
-        """, (username,))
-        groups = c.fetchall()
+        def load_groups(cursor, limit):
+            c = conn.cursor()
+            c.execute(queries.USER_GROUPS_PAGE, (username, *cursor, limit))
+            return c.fetchall()
+
+        groups, has_more = load_pages(
+            "user_groups", username, load_groups,
+            first_cursor=("", 0), cursor_of=lambda row: (row[1], row[0]),
+            page_size=GROUP_LIST_PAGE_SIZE
+        )
 
         st.subheader("📚 Task Groups")
         if not groups:
             st.info("No recurring tasks yet. Create one to get started!")
         else:
+            today = format_date(get_current_date())
+            summaries = cached_read(username, "group_summaries", (today,),
+                                    lambda: get_group_summaries(conn, username, today))
             for group_data in groups:
                 group = TaskGroup(*group_data)
-                display_group(group, conn)
+                display_group(group, summaries.get(group.group_id))
+            show_load_more("user_groups", len(groups), has_more)
     finally:
         conn.close()
 
-def display_group(group: TaskGroup, conn) -> None:
+def display_group(group: TaskGroup, summary: Optional[Dict]) -> None:
     """
     Displays a single group with its progress and actions.
     """
@@ -267,14 +181,11 @@ def display_group(group: TaskGroup, conn) -> None:
             if group.remarks:
                 st.caption(group.remarks)
             
-            # Get completion stats and status
-            completed, total = get_task_count(conn, group.group_id)
-            status = get_group_status(conn, group.group_id)
-            
             # Show progress and status
-            if total > 0:
+            if summary and summary["total"] > 0:
+                completed, total = summary["completed"], summary["total"]
                 st.progress(completed/total, text=f"Progress: {completed}/{total} tasks")
-                st.markdown(get_status_badge(status), unsafe_allow_html=True)
+                st.markdown(get_status_badge(summary["status"]), unsafe_allow_html=True)
             else:
                 st.info("No tasks in this group yet")
         
@@ -297,62 +208,6 @@ def display_group(group: TaskGroup, conn) -> None:
                 st.session_state.delete_group = group.group_id
                 st.rerun()
 
-def get_task_count(conn, group_id: int) -> Tuple[int, int]:
-    """
-    Calculates completion statistics for a group.
-    """
-    c = conn.cursor()
-    
-    # Get completed tasks count
-    c.execute("""
-        SELECT COUNT(*) 
-        FROM tasks 
-        WHERE group_id=? AND completed=1
-    """, (group_id,))
-    completed = c.fetchone()[0]
-    
-    # Get total tasks count
-    c.execute("""
-        SELECT COUNT(*) 
-        FROM tasks 
-        WHERE group_id=?
-    """, (group_id,))
-    total = c.fetchone()[0]
-    
-    return completed, total
-
-def get_group_status(conn, group_id: int) -> str:
-    """Determines the current status of a task group (completed, offtrack, ontrack, or inactive)."""
-    c = conn.cursor()
-    current_date = st.session_state.get('mock_now', datetime.datetime.now().date())
-    
-    # Check if any tasks are overdue (past due date)
-    c.execute("""
-        SELECT COUNT(*) 
-        FROM tasks 
-        WHERE group_id = ? 
-        AND completed = 0 
-        AND due_date < ?
-    """, (group_id, current_date.strftime("%Y-%m-%d")))
-    
-    if c.fetchone()[0] > 0:
-        return "offtrack"
-    
-    # If no tasks are offtrack, check if there are any pending tasks
-    c.execute("""
-        SELECT COUNT(*) 
-        FROM tasks 
-        WHERE group_id = ? AND completed = 0
-    """, (group_id,))
-    pending = c.fetchone()[0]
-    if pending > 0:
-        return "ontrack"
-
-    # Check if any tasks exist
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id = ?", (group_id,))
-    total = c.fetchone()[0]
-    return "completed" if total > 0 else "inactive"
-
 def get_status_badge(status: str) -> str:
     """Creates a colored status badge for displaying group status."""
     style = """
@@ -391,27 +246,22 @@ def handle_modals() -> None:
 def edit_group_modal() -> None:
     """Shows a dialog for editing group properties."""
     group_id, name, color, remarks, is_template = st.session_state.edit_group
-    conn = get_connection()
-    try:
-        with st.form(key=f"edit_group_{group_id}"):
-            new_name = st.text_input("Group Name", value=name)
-            new_color = st.color_picker("Color", value=color)
-            new_remarks = st.text_area("Remarks", value=remarks)
-            new_template = st.checkbox("Template Group", value=is_template)
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.form_submit_button("💾 Save"):
-                    update_group(conn, group_id, new_name, new_color, new_remarks, new_template)
-            with col2:
-                if st.form_submit_button("❌ Cancel"):
-                    st.session_state.pop("edit_group", None)
-                    st.rerun()
-    finally:
-        conn.close()
+    with st.form(key=f"edit_group_{group_id}"):
+        new_name = st.text_input("Group Name", value=name)
+        new_color = st.color_picker("Color", value=color)
+        new_remarks = st.text_area("Remarks", value=remarks)
+        new_template = st.checkbox("Template Group", value=is_template)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.form_submit_button("💾 Save"):
+                update_group(group_id, new_name, new_color, new_remarks, new_template)
+        with col2:
+            if st.form_submit_button("❌ Cancel"):
+                st.session_state.pop("edit_group", None)
+                st.rerun()
 
 def update_group(
-    conn,
     group_id: int,
     name: str,
     color: str,
@@ -420,13 +270,11 @@ def update_group(
 ) -> None:
     """Updates the properties of an existing task group."""
     try:
-        c = conn.cursor()
-        c.execute('''
+        run_write(lambda conn: conn.execute('''
             UPDATE groups 
             SET group_name=?, color=?, remarks=?, isTemplate=?
             WHERE group_id=?
-        ''', (name, color, remarks, is_template, group_id))
-        conn.commit()
+        ''', (name, color, remarks, is_template, group_id)))
         st.session_state.pop("edit_group", None)
         st.rerun()
     except Exception as e:
@@ -450,15 +298,14 @@ def delete_group_modal() -> None:
 
 def delete_group(group_id: int) -> None:
     """Deletes a group and all its associated tasks."""
-    conn = get_connection()
-    try:
+    def delete_rows(conn):
         c = conn.cursor()
         c.execute("DELETE FROM tasks WHERE group_id=?", (group_id,))
         c.execute("DELETE FROM groups WHERE group_id=?", (group_id,))
-        conn.commit()
+
+    try:
+        run_write(delete_rows)
         st.session_state.pop("delete_group", None)
         st.rerun()
     except Exception as e:
-        st.error(f"Error deleting group: {str(e)}")
-    finally:
-        conn.close()
\ No newline at end of file
+        st.error(f"Error deleting group: {str(e)}")
\ No newline at end of file
@@ -1,9 +1,23 @@
 import streamlit as st
 from core.database import get_connection
+from core import queries
+from core.writer import run_write
+from core.cache import cached_read
+from core.instrumentation import timed
+from core.config import GROUP_TASKS_PAGE_SIZE
+from utils.status_helpers import get_group_summary
+from utils.status_engine import compute_task_statuses
+from utils.schedule import Schedule, group_schedule, reschedule_dependents
+from utils.pagination import load_pages, show_load_more
+from utils.reachability import (
+    get_group_index, group_data_version, invalidate_group_index,
+    record_new_task, record_new_links, record_due_dates, record_write
+)
 from datetime import datetime, date
 from typing import Optional, List
 from core.date_utils import get_current_date, format_date
 
+@timed
 def show_group_details():
     """Displays detailed information about a specific task group."""
     # Check if a group is selected
@@ -41,6 +55,8 @@ def show_group_details():
             return
             
         group_id, group_name, created_by, color, remarks, is_template = group
+        # Group reads are cached under the group's owner
+        st.session_state.current_view_group_owner = created_by
 
         # Group header
         st.header(f"📦 {group_name}")
@@ -51,16 +67,29 @@ def show_group_details():
 
         # Group status
         st.subheader("📊 Group Status")
-        status = get_group_status(conn, group_id)
-        completed, total = get_task_count(conn, group_id)
+        today = format_date(get_current_date())
+        summary = cached_read(created_by, "group_summary", (group_id, today),
+                              lambda: get_group_summary(conn, group_id, today))
+        completed, total = summary["completed"], summary["total"]
         
         # Show progress and status
         if total > 0:
             st.progress(completed/total, text=f"Progress: {completed}/{total} tasks")
-            st.markdown(get_status_badge(status), unsafe_allow_html=True)
+            st.markdown(get_status_badge(summary["status"]), unsafe_allow_html=True)
         else:
             st.info("No tasks in this group yet")
 
+        # Schedule over the prerequisite links: critical path and per-task slack
+        schedule = cached_read(created_by, "group_schedule", (group_id,),
+                               lambda: group_schedule(conn, group_id))
+        if schedule.critical_path:
+            end = schedule.earliest[schedule.critical_path[-1]]
+            count = len(schedule.critical_path)
+            st.caption(f"🧭 Critical path: {count} task{'s' if count > 1 else ''}, "
+                       f"group ends {format_date_display(end.isoformat())}")
+        if schedule.cyclic:
+            st.warning(f"{len(schedule.cyclic)} tasks are on a prerequisite cycle and are left out of the schedule")
+
         # Tasks section
         st.subheader("📋 Tasks")
         
@@ -74,7 +103,7 @@ def show_group_details():
             add_task_form(conn, group_id)
 
         # List tasks
-        display_tasks(conn, group_id)
+        display_tasks(conn, group_id, created_by, schedule)
 
     finally:
         conn.close()
@@ -108,13 +137,11 @@ def add_task_form(conn, group_id: int) -> None:
         existing_tasks = c.fetchall()
         
         if existing_tasks:
+            labels = {t[0]: f"{t[1]} (Due: {format_date(t[2])})" for t in existing_tasks}
             selected_prereqs = st.multiselect(
                 "Prerequisite Tasks",
-                options=[t[0] for t in existing_tasks],
-                format_func=lambda x: next(
-                    f"{t[1]} (Due: {format_date(t[2])})" 
-                    for t in existing_tasks if t[0] == x
-                )
+                options=list(labels),
+                format_func=labels.get
             )
         else:
             selected_prereqs = []
@@ -143,7 +170,7 @@ def create_task(
     conn,
     group_id: int,
     task_name: str,
-    due_date: datetime.date,
+    due_date: date,
     notification_days: int,
     telegram_notify: bool,
     prerequisites: List[int] = None
@@ -153,28 +180,27 @@ def create_task(
         st.error("Task name is required")
         return
 
-    # Validate prerequisites
+    # Validate prerequisites against the group's reachability index
     if prerequisites:
-        c = conn.cursor()
+        index = get_group_index(conn, group_id, prerequisites)
         for p_id in prerequisites:
-            c.execute("SELECT due_date FROM tasks WHERE task_id=?", (p_id,))
-            result = c.fetchone()
-            if not result:
+            if p_id not in index:
                 st.error(f"Prerequisite task {p_id} not found")
                 return
-                
-            prereq_date = datetime.datetime.strptime(result[0], "%Y-%m-%d").date()
-            if prereq_date > due_date:
+
+            if index.due[p_id] > due_date:
                 st.error(
-                    f"Invalid prerequisite: Task due on {format_date(result[0])} "
+                    f"Invalid prerequisite: Task due on {format_date(index.due[p_id])} "
                     f"cannot be a prerequisite for task due on {format_date(due_date)}"
                 )
                 return
 
-    try:
-        conn.execute("BEGIN TRANSACTION")
-        c = conn.cursor()
-        
+    username = st.session_state.username
+
+    def insert_task(write_conn):
+        c = write_conn.cursor()
+        before = group_data_version(write_conn, group_id)
+
         # Insert task
         c.execute('''
             INSERT INTO tasks (
@@ -186,50 +212,54 @@ def create_task(
             due_date.isoformat(),
             notification_days,
             group_id,
-            st.session_state.username,
+            username,
             int(telegram_notify)
         ))
         new_task_id = c.lastrowid
-        
+
         # Insert prerequisites
         if prerequisites:
-            for p_id in prerequisites:
-                c.execute('''
-                    INSERT INTO task_link (task_id, pre_task_id)
-                    VALUES (?,?)
-                ''', (new_task_id, p_id))
-        
-        conn.commit()
+            c.executemany('''
+                INSERT INTO task_link (task_id, pre_task_id)
+                VALUES (?,?)
+            ''', [(new_task_id, p_id) for p_id in prerequisites])
+        return new_task_id, (before, group_data_version(write_conn, group_id))
+
+    try:
+        new_task_id, versions = run_write(insert_task)
+        record_new_task(group_id, new_task_id, due_date, prerequisites or [])
+        record_write(group_id, *versions)
         st.session_state.pop("show_add_task", None)
         st.success(f"Task '{task_name}' created successfully!")
         st.rerun()
-        
     except Exception as e:
-        conn.rollback()
         st.error(f"Error creating task: {str(e)}")
 
-def display_tasks(conn, group_id: int) -> None:
-    """Shows all tasks in a group with their status and actions."""
-    c = conn.cursor()
-    c.execute('''
-        SELECT t.task_id, t.task_name, t.due_date, t.completed,
-               GROUP_CONCAT(p.task_name, '|||') as prerequisites
-        FROM tasks t
-        LEFT JOIN task_link tl ON t.task_id = tl.task_id
-        LEFT JOIN tasks p ON tl.pre_task_id = p.task_id
-        WHERE t.group_id = ?
-        GROUP BY t.task_id
-        ORDER BY t.completed, t.due_date
-    ''', (group_id,))
-    tasks = c.fetchall()
+def display_tasks(conn, group_id: int, owner: str, schedule: Schedule) -> None:
+    """Shows the group's tasks, a page at a time, with their status, slack and actions."""
+    def load_tasks(cursor, limit):
+        c = conn.cursor()
+        c.execute(queries.GROUP_TASKS_WITH_PREREQUISITES_PAGE, (group_id, *cursor, limit))
+        return c.fetchall()
+
+    list_key = f"group_tasks_{group_id}"
+    tasks, has_more = load_pages(
+        list_key, owner, load_tasks,
+        first_cursor=(-1, "", 0), cursor_of=lambda row: (row[3], row[2], row[0]),
+        page_size=GROUP_TASKS_PAGE_SIZE, args=(group_id,)
+    )
 
     if not tasks:
         st.info("No tasks found in this group")
         return
 
+    today = get_current_date()
+    statuses = cached_read(owner, "group_task_statuses", (group_id, format_date(today)),
+                           lambda: compute_task_statuses(conn, group_id=group_id, today=today))
+    critical = set(schedule.critical_path)
     for task in tasks:
         task_id, name, due_date_str, completed, prerequisites = task
-        status = get_task_status(conn, task_id)
+        status = statuses.get(task_id, "inactive")
         
         with st.container(border=True):
             cols = st.columns([3, 1])
@@ -247,6 +277,11 @@ def display_tasks(conn, group_id: int) -> None:
                 st.caption(f"Due: {due_date_str}")
                 if prerequisites:
                     st.caption("Prerequisites: " + ", ".join(prerequisites.split("|||")))
+                if task_id in critical:
+                    st.caption("🧭 On the critical path")
+                elif schedule.slack.get(task_id):
+                    latest = format_date_display(schedule.latest[task_id].isoformat())
+                    st.caption(f"Slack: {schedule.slack[task_id]} days (latest {latest})")
             
             with cols[1]:
                 st.checkbox(
@@ -254,12 +289,14 @@ def display_tasks(conn, group_id: int) -> None:
                     value=completed,
                     key=f"complete_{task_id}",
                     on_change=handle_task_completion,
-                    args=(st.session_state.db_conn, task_id)
+                    args=(task_id,)
                 )
                 
                 # Remove the view/modify/delete buttons for sub-tasks
                 # The original code likely had these buttons here
 
+    show_load_more(list_key, len(tasks), has_more)
+
 def format_date_display(date_str: str) -> str:
     """Formats a date string into a readable format."""
     try:
@@ -269,62 +306,49 @@ def format_date_display(date_str: str) -> str:
         return date_str
 
 def get_total_delay(conn, task_id):
-    """Calculates the total delay from all prerequisite tasks."""
+    """Calculates the total delay (delay_days) along the task's longest prerequisite chain."""
     c = conn.cursor()
-    c.execute('''
-        WITH RECURSIVE dep_chain(task_id, delay) AS (
-            SELECT tl.pre_task_id, t.delay_days
-            FROM task_link tl
-            JOIN tasks t ON tl.pre_task_id = t.task_id
-            WHERE tl.task_id = ?
-            UNION ALL
-            SELECT tl2.pre_task_id, dc.delay + t2.delay_days
-            FROM dep_chain dc
-            JOIN task_link tl2 ON dc.task_id = tl2.task_id
-            JOIN tasks t2 ON tl2.pre_task_id = t2.task_id
-        )
-        SELECT MAX(delay) FROM dep_chain
-    ''', (task_id,))
-    total_delay = c.fetchone()[0] or 0
-    return total_delay
+    c.execute("SELECT group_id FROM tasks WHERE task_id = ?", (task_id,))
+    row = c.fetchone()
+    if not row:
+        return 0
+    return group_schedule(conn, row[0]).chain_delay.get(task_id, 0)
 
-def handle_task_completion(conn, task_id):
+def handle_task_completion(task_id):
     """Handles the completion status of a task."""
-    try:
+    today = format_date(get_current_date())
+    username = st.session_state.username
+
+    def toggle_completion(conn):
         c = conn.cursor()
-        
+
         # Get current completion status
         c.execute("SELECT completed FROM tasks WHERE task_id = ?", (task_id,))
         current_status = c.fetchone()[0]
-        
+
         # Toggle completion status
         new_status = 0 if current_status else 1
-        completion_date = format_date(get_current_date()) if new_status else None
-        
+        completion_date = today if new_status else None
+
         # Update task
         c.execute("""
             UPDATE tasks 
             SET completed = ?, completion_date = ?
             WHERE task_id = ?
         """, (new_status, completion_date, task_id))
-        
+
         # Add to task history
         status_change = "completed" if new_status else "reopened"
         c.execute("""
             INSERT INTO task_history (
                 task_id, status_change, changed_at, changed_by
             ) VALUES (?, ?, ?, ?)
-        """, (
-            task_id,
-            status_change,
-            format_date(get_current_date()),
-            st.session_state.username
-        ))
-        
-        conn.commit()
+        """, (task_id, status_change, today, username))
+
+    try:
+        run_write(toggle_completion)
     except Exception as e:
         st.error(f"Error updating task completion: {str(e)}")
-        conn.rollback()
 
 @st.dialog("Confirm Prerequisite Completion")
 def confirm_prereq_completion():
@@ -340,14 +364,12 @@ def confirm_prereq_completion():
         st.markdown(f"- {p[1]} (ID: {p[0]})")
     
     if st.button("Auto-complete prerequisites and continue"):
-        conn = get_connection()
-        try:
+        def complete_all(conn):
             for p in config["prereqs"]:
                 complete_task(conn, p[0])
             complete_task(conn, config["task_id"])
-            conn.commit()
-        finally:
-            conn.close()
+
+        run_write(complete_all)
         st.session_state.pop("confirm_prereq_completion", None)
         st.rerun()
     
@@ -356,50 +378,13 @@ def confirm_prereq_completion():
         st.rerun()
 
 def complete_task(conn, task_id):
-    """Marks a task as completed in the database."""
+    """Marks a task as completed in the database. Run it as a write job (see core.writer)."""
     c = conn.cursor()
     c.execute('''
         UPDATE tasks 
         SET completed=1
         WHERE task_id=?
     ''', (task_id,))
-    conn.commit()
-
-def get_task_status(conn, task_id):
-    """Determines the current status of a task (completed, offtrack, ontrack, or inactive)."""
-    c = conn.cursor()
-    current_date = get_current_date()
-    
-    c.execute("""
-        SELECT t.completed, t.due_date
-        FROM tasks t
-        WHERE t.task_id = ?
-    """, (task_id,))
-    result = c.fetchone()
-    
-    if not result:
-        return "inactive"
-        
-    completed, due_date_str = result
-    
-    if completed:
-        return "completed"
-    
-    # Convert due_date string to datetime.date object
-    try:
-        due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
-    except ValueError:
-        st.error(f"Invalid due date format: {due_date_str}")
-        return "offtrack"
-    
-    # Check if task is overdue based on mock date
-    is_overdue = due_date < current_date
-    
-    # Determine status based on due date only
-    if is_overdue:
-        return "offtrack"
-    else:
-        return "ontrack"
 
 @st.dialog("Confirm Deletion")
 def delete_task_modal():
@@ -431,12 +416,15 @@ def delete_task_modal():
         
         with col1:
             if st.button("✅ Confirm"):
-                # Delete task links first
-                c.execute("DELETE FROM task_link WHERE task_id=? OR pre_task_id=?", 
-                         (task_id, task_id))
-                # Then delete the task
-                c.execute("DELETE FROM tasks WHERE task_id=?", (task_id,))
-                conn.commit()
+                def delete_rows(write_conn):
+                    # Delete task links first
+                    write_conn.execute("DELETE FROM task_link WHERE task_id=? OR pre_task_id=?",
+                                       (task_id, task_id))
+                    # Then delete the task
+                    write_conn.execute("DELETE FROM tasks WHERE task_id=?", (task_id,))
+
+                run_write(delete_rows)
+                invalidate_group_index(st.session_state.get("current_view_group"))
                 st.session_state.pop("delete_task", None)
                 st.rerun()
         
@@ -472,12 +460,7 @@ def edit_task_modal():
         task_name, due_date_str, notif_days, completed, group_id, group_name = task_data
         
         # Check if task has dependent tasks
-        c.execute("""
-            SELECT t.task_id, t.task_name, t.due_date
-            FROM tasks t
-            JOIN task_link tl ON t.task_id = tl.task_id
-            WHERE tl.pre_task_id = ?
-        """, (task_id,))
+        c.execute(queries.TASK_DEPENDENTS, (task_id,))
         dependent_tasks = c.fetchall()
         
         if dependent_tasks:
@@ -490,36 +473,33 @@ def edit_task_modal():
             task_name = st.text_input("Task Name", value=task_name)
             
             try:
-                original_due = datetime.datetime.strptime(due_date_str, "%Y-%m-%d").date()
+                original_due = datetime.strptime(due_date_str, "%Y-%m-%d").date()
             except ValueError:
                 st.error(f"Invalid date format: {due_date_str}")
-                original_due = datetime.date.today()
+                original_due = date.today()
             
             new_due = st.date_input("Due Date", value=original_due)
             
-            # Get all potential prerequisite tasks
-            c.execute('''
-                SELECT t.task_id, t.task_name, t.due_date 
-                FROM tasks t
-                WHERE t.group_id = ? 
-                AND t.task_id != ?
-                AND t.task_id NOT IN (
-                    -- Exclude tasks that depend on this task
-                    SELECT t2.task_id
-                    FROM tasks t2
-                    JOIN task_link tl ON t2.task_id = tl.task_id
-                    WHERE tl.pre_task_id = ?
-                )
-                ORDER BY t.due_date
-            ''', (group_id, task_id, task_id))
-            available_tasks = c.fetchall()
-            
             # Get current prerequisites
             c.execute('''
                 SELECT pre_task_id FROM task_link
                 WHERE task_id = ?
             ''', (task_id,))
             current_prereqs = [row[0] for row in c.fetchall()]
+
+            # Get all potential prerequisite tasks, excluding every task that
+            # depends on this one (directly or transitively)
+            c.execute('''
+                SELECT t.task_id, t.task_name, t.due_date
+                FROM tasks t
+                WHERE t.group_id = ?
+                AND t.task_id != ?
+                ORDER BY t.due_date
+            ''', (group_id, task_id))
+            group_tasks = c.fetchall()
+            index = get_group_index(conn, group_id, [task_id] + [t[0] for t in group_tasks])
+            available_tasks = [t for t in group_tasks
+                               if t[0] in current_prereqs or not index.would_create_cycle(task_id, t[0])]
             
             notification_days = st.selectbox(
                 "Notification Days",
@@ -530,14 +510,12 @@ def edit_task_modal():
             
             # Show available tasks as prerequisites
             if available_tasks:
+                labels = {t[0]: f"{t[1]} (Due: {format_date(t[2])})" for t in available_tasks}
                 selected_prereqs = st.multiselect(
                     "Prerequisite Tasks",
-                    options=[t[0] for t in available_tasks],
+                    options=list(labels),
                     default=current_prereqs,
-                    format_func=lambda x: next(
-                        f"{t[1]} (Due: {format_date(t[2])})" 
-                        for t in available_tasks if t[0] == x
-                    )
+                    format_func=labels.get
                 )
             else:
                 selected_prereqs = []
@@ -548,19 +526,18 @@ def edit_task_modal():
             col1, col2 = st.columns(2)
             with col1:
                 if st.form_submit_button("💾 Save"):
-                    # Validate prerequisites
+                    # Validate prerequisites against the group's reachability index
                     validation_errors = []
                     for p_id in selected_prereqs:
-                        c.execute("SELECT due_date FROM tasks WHERE task_id=?", (p_id,))
-                        result = c.fetchone()
-                        if not result:
+                        if p_id not in index:
                             validation_errors.append(f"Prerequisite task {p_id} not found")
-                            continue
-                            
-                        prereq_date = datetime.datetime.strptime(result[0], "%Y-%m-%d").date()
-                        if prereq_date > new_due:
+                        elif index.would_create_cycle(task_id, p_id):
                             validation_errors.append(
-                                f"Task due on {format_date(result[0])} cannot be a "
+                                f"Task {p_id} depends on this task and cannot be its prerequisite"
+                            )
+                        elif index.violates_due_date(task_id, p_id, new_due):
+                            validation_errors.append(
+                                f"Task due on {format_date(index.due[p_id])} cannot be a "
                                 f"prerequisite for task due on {format_date(new_due)}"
                             )
 
@@ -569,11 +546,12 @@ def edit_task_modal():
                             st.error(err)
                         return
 
-                    try:
-                        conn.execute("BEGIN TRANSACTION")
-                        
+                    def save_task(write_conn):
+                        wc = write_conn.cursor()
+                        before = group_data_version(write_conn, group_id)
+
                         # Update task
-                        c.execute('''
+                        wc.execute('''
                             UPDATE tasks SET
                                 task_name=?,
                                 due_date=?,
@@ -587,31 +565,36 @@ def edit_task_modal():
                             int(completed),
                             task_id
                         ))
-                        
-                        # Update prerequisites
-                        c.execute('DELETE FROM task_link WHERE task_id=?', (task_id,))
-                        for p_id in selected_prereqs:
-                            c.execute('''
-                                INSERT INTO task_link (task_id, pre_task_id)
-                                VALUES (?,?)
-                            ''', (task_id, p_id))
-                        
-                        # If the due date changed and there are dependent tasks,
-                        # adjust their dates proportionally
+
+                        # Update prerequisites; kept links keep their delay_days
+                        wc.executemany('DELETE FROM task_link WHERE task_id=? AND pre_task_id=?',
+                                       [(task_id, p_id) for p_id in removed_prereqs])
+                        wc.executemany('''
+                            INSERT INTO task_link (task_id, pre_task_id)
+                            VALUES (?,?)
+                        ''', [(task_id, p_id) for p_id in added_prereqs])
+
+                        # If the due date changed, move every transitive dependent
+                        # with it (one UPDATE), keeping prerequisite gaps
+                        moved = {}
                         if dependent_tasks and new_due != original_due:
-                            days_diff = (new_due - original_due).days
-                            for dep_id, _, _ in dependent_tasks:
-                                c.execute("""
-                                    UPDATE tasks 
-                                    SET due_date = date(due_date, ?) 
-                                    WHERE task_id = ?
-                                """, (f"{days_diff:+d} days", dep_id))
-                        
-                        conn.commit()
+                            moved = reschedule_dependents(write_conn, group_id, task_id, (new_due - original_due).days)
+                        return moved, (before, group_data_version(write_conn, group_id))
+
+                    removed_prereqs = set(current_prereqs) - set(selected_prereqs)
+                    added_prereqs = [p_id for p_id in selected_prereqs if p_id not in current_prereqs]
+
+                    try:
+                        moved, versions = run_write(save_task)
+                        if removed_prereqs:
+                            invalidate_group_index(group_id)
+                        else:
+                            record_due_dates(group_id, {task_id: new_due, **moved})
+                            record_new_links(group_id, task_id, added_prereqs)
+                            record_write(group_id, *versions)
                         st.session_state.pop("edit_task", None)
                         st.rerun()
                     except Exception as e:
-                        conn.rollback()
                         st.error(f"Error updating task: {str(e)}")
             
             with col2:
@@ -621,27 +604,6 @@ def edit_task_modal():
     finally:
         conn.close()
 
-def get_group_status(conn, group_id):
-    """Determines the current status of a group based on its tasks."""
-    c = conn.cursor()
-    current_date = format_date(get_current_date())
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id=? AND completed=0 AND due_date < ?", (group_id, current_date))
-    if c.fetchone()[0] > 0: return "offtrack"
-    
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id=? AND completed=0", (group_id,))
-    if c.fetchone()[0] > 0: return "ontrack"
-    
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id=?", (group_id,))
-    return "completed" if c.fetchone()[0] > 0 else "inactive"
-
-def get_task_count(conn, group_id):
-    """Counts the number of completed and total tasks in a group."""
-    c = conn.cursor()
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id=? AND completed=1", (group_id,))
-    completed = c.fetchone()[0]
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id=?", (group_id,))
-    return completed, c.fetchone()[0]
-
 def get_status_badge(status):
     """Creates a colored status badge for displaying task status."""
     style = "border-radius:9px; padding:0 7px; font-size:13px; color:white;"
@@ -682,7 +644,7 @@ def view_task_modal():
         if task_data:
             name, due_date_str, completed, notif_days, prerequisites = task_data
             try:
-                due_date = datetime.datetime.strptime(due_date_str, "%Y-%m-%d").date()
+                due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
                 formatted_date = due_date.strftime('%d %b %Y')
             except ValueError:
                 st.error(f"Invalid date format: {due_date_str}")
@@ -1,31 +1,56 @@
 #utils/calendar.py
+import datetime
 from core.database import get_connection
+from core import queries
+from core.cache import cached_read
+from utils.recurrence import project_occurrences
 
+# Extra days loaded either side of the visible range
+CALENDAR_WINDOW_PADDING_DAYS = 7
 
-def get_events_for_user(username):
+def get_visible_window(view_type, anchor):
     """
-    Fetch tasks created by the user and transform them into
-    event format for calendar or list visualisation.
+    Returns the padded [start, end) date range shown by a calendar view
+    ("month", "week" or "day") around the anchor date.
     """
-    conn = get_connection()
-    c = conn.cursor()
+    padding = datetime.timedelta(days=CALENDAR_WINDOW_PADDING_DAYS)
+    if view_type == "month":
+        start = anchor.replace(day=1)
+        end = (start + datetime.timedelta(days=32)).replace(day=1)
+    elif view_type == "week":
+        start = anchor - datetime.timedelta(days=(anchor.weekday() + 1) % 7)  # weeks start on Sunday
+        end = start + datetime.timedelta(days=7)
+    else:
+        start = anchor
+        end = anchor + datetime.timedelta(days=1)
+    return start - padding, end + padding
 
-    c.execute("""
-        SELECT task_name, due_date, completed
-        FROM tasks
-        WHERE created_by = ?
-    """, (username,))
-
-    rows = c.fetchall()
-    events = []
-
-    for name, due, completed in rows:
-        events.append({
-            "title": f"{'✅' if completed else '🔄'} {name}",
-            "start": due,
-            "allDay": True,
-            "color": "#4CAF50" if completed else "#FF5722"
-        })
+def get_events_in_window(username, start, end):
+    """
+    Fetch the user's tasks due in [start, end) in event format for calendar
+    or list visualisation, plus projected occurrences of recurring tasks that
+    have not been created yet. Windows are cached per session until the
+    user's data changes.
+    """
+    def load_events():
+        conn = get_connection()
+        try:
+            c = conn.cursor()
+            c.execute(queries.USER_EVENTS_IN_WINDOW, (username, start.isoformat(), end.isoformat()))
+            events = [{
+                "title": f"{'✅' if completed else '🔄'} {name}",
+                "start": due,
+                "allDay": True,
+                "color": "#4CAF50" if completed else "#FF5722"
+            } for name, due, completed in c.fetchall()]
+            events.extend({
+                "title": f"🔁 {name}",
+                "start": due,
+                "allDay": True,
+                "color": "#95A5A6"
+            } for _, name, due in project_occurrences(conn, username, start, end))
+            return events
+        finally:
+            conn.close()
 
-    conn.close()
-    return events
+    return cached_read(username, "calendar_events", (start.isoformat(), end.isoformat()), load_events)
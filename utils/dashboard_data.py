@@ -0,0 +1,37 @@
+#utils/dashboard_data.py
+"""
+Data for the dashboard's pending and completed task lists.
+
+load_dashboard_data() gets both lists, every status and the group names
+from one query (queries.USER_DASHBOARD_TASKS, which evaluates statuses with
+a recursive CTE) and returns them ready to render, so a dashboard render
+costs one indexed scan of the user's tasks however many there are.
+"""
+from typing import Dict, List, NamedTuple, Tuple
+
+from core import queries
+from core.date_utils import format_date
+
+class DashboardData(NamedTuple):
+    """Listed tasks as (task_id, task_name, due_date, group_name, status), in due date order."""
+    pending: List[Tuple]
+    completed: List[Tuple]
+
+def load_dashboard_data(conn, username: str, today) -> DashboardData:
+    """
+    The user's pending and completed tasks in active groups (non-template
+    groups that still have pending tasks), with their statuses.
+    """
+    c = conn.cursor()
+    c.execute(queries.USER_DASHBOARD_TASKS, {"username": username, "today": format_date(today)})
+    pending, completed_tasks = [], []
+    for task_id, task_name, due_date, completed, group_name, status in c.fetchall():
+        (completed_tasks if completed else pending).append((task_id, task_name, due_date, group_name, status))
+    return DashboardData(pending, completed_tasks)
+
+def group_by_name(tasks: List[Tuple]) -> List[Tuple[str, List[Tuple]]]:
+    """Groups listed tasks by group name, groups ordered by their first task."""
+    groups: Dict[str, List[Tuple]] = {}
+    for task in tasks:
+        groups.setdefault(task[3], []).append(task)
+    return list(groups.items())
@@ -0,0 +1,59 @@
+#utils/pagination.py
+"""
+Keyset-paginated "Load more" lists.
+
+A list is read one page at a time with a *_PAGE query from core.queries:
+each page seeks past the sort key of the last row of the previous page
+rather than skipping rows with OFFSET. Only the pages the user has asked
+for are read and rendered, so a checkbox click on a long list reruns with
+a bounded number of widgets. Pages go through the session read cache,
+keyed by their cursor, so "Load more" only runs the query for the new page.
+Lists that are already in memory are sliced with visible_rows() instead.
+"""
+from typing import Callable, List, Sequence, Tuple
+
+import streamlit as st
+
+from core.cache import cached_read
+
+def load_pages(
+    list_key: str,
+    username: str,
+    fetch_page: Callable[[Tuple, int], List[Tuple]],
+    first_cursor: Tuple,
+    cursor_of: Callable[[Tuple], Tuple],
+    page_size: int,
+    args: Sequence = ()
+) -> Tuple[List[Tuple], bool]:
+    """
+    Returns the rows of the pages loaded so far for list_key and whether
+    more rows follow. fetch_page(cursor, limit) returns up to `limit` rows
+    sorting after `cursor`; cursor_of(row) is that row's sort key. `args`
+    identify the list's contents for the read cache (e.g. a group id).
+    """
+    pages = st.session_state.get("list_pages", {}).get(list_key, 1)
+    rows, cursor = [], first_cursor
+    for _ in range(pages):
+        # One extra row tells whether another page exists
+        page = cached_read(username, f"page:{list_key}", tuple(args) + (cursor, page_size),
+                           lambda cursor=cursor: fetch_page(cursor, page_size + 1))
+        rows.extend(page[:page_size])
+        if len(page) <= page_size:
+            return rows, False
+        cursor = cursor_of(page[page_size - 1])
+    return rows, True
+
+def visible_rows(list_key: str, rows: List[Tuple], page_size: int) -> Tuple[List[Tuple], bool]:
+    """load_pages() for a list already in memory: the loaded pages' rows and whether more follow."""
+    shown = st.session_state.get("list_pages", {}).get(list_key, 1) * page_size
+    return rows[:shown], len(rows) > shown
+
+def show_load_more(list_key: str, shown: int, has_more: bool) -> None:
+    """Renders the row count and, if more rows follow, a "Load more" button."""
+    if not has_more:
+        return
+    st.caption(f"Showing the first {shown} rows")
+    if st.button("⬇️ Load more", key=f"load_more_{list_key}", use_container_width=True):
+        pages = st.session_state.setdefault("list_pages", {})
+        pages[list_key] = pages.get(list_key, 1) + 1
+        st.rerun()
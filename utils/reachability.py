@@ -0,0 +1,191 @@
+#utils/reachability.py
+"""
+Per-group reachability index for prerequisite edits.
+
+Each task gets a bit position; its ancestors (transitive prerequisites) and
+descendants (transitive dependents) are kept as integer bitsets. "Would this
+link create a cycle?" is then a single bit test and a due-date check is one
+dictionary lookup, however deep the graph is.
+
+Indexes are cached per process together with the data version of the
+group's owner, and rebuilt when that version has moved (a write by another
+process, or by code that does not update the index). This process's own
+task and link edits update the index in place and then move its version
+past the write with record_write; edits that remove links or tasks
+invalidate the group's index so the next check rebuilds it.
+"""
+import datetime
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from core import queries
+
+from utils.schedule import load_schedule_graph, topological_order
+
+def _bits(mask: int):
+    """Yields the positions of the set bits of mask."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+class ReachabilityIndex:
+    """Transitive closure of one group's prerequisite graph, with due dates and link delays."""
+
+    def __init__(self, due: Dict, prerequisites: Dict):
+        order, dependents, cyclic = topological_order(due, prerequisites)
+        self.due = dict(due)
+        self.delays = {(task_id, p): d for task_id, links in prerequisites.items() for p, d in links}
+        self.tasks = order + sorted(cyclic)
+        self.position = {task_id: i for i, task_id in enumerate(self.tasks)}
+        self.ancestors = {task_id: 0 for task_id in self.tasks}
+        self.descendants = {task_id: 0 for task_id in self.tasks}
+
+        def close(nodes, edges, closure):
+            for task_id in nodes:
+                mask = 0
+                for other, _ in edges.get(task_id, ()):
+                    mask |= closure[other] | (1 << self.position[other])
+                closure[task_id] = mask
+
+        def close_cyclic(edges, closure):
+            # Tasks on or behind a cycle cannot be ordered; iterate them to a fixed point
+            changed = bool(cyclic)
+            while changed:
+                before = [closure[task_id] for task_id in cyclic]
+                close(sorted(cyclic), edges, closure)
+                changed = before != [closure[task_id] for task_id in cyclic]
+
+        # Prerequisites of ordered tasks are ordered; dependents of cyclic tasks are cyclic
+        close(order, prerequisites, self.ancestors)
+        close_cyclic(prerequisites, self.ancestors)
+        close_cyclic(dependents, self.descendants)
+        close(reversed(order), dependents, self.descendants)
+
+    def __contains__(self, task_id) -> bool:
+        return task_id in self.position
+
+    def depends_on(self, task_id: int, pre_task_id: int) -> bool:
+        """True if pre_task_id is a direct or transitive prerequisite of task_id."""
+        return bool(self.ancestors[task_id] >> self.position[pre_task_id] & 1)
+
+    def would_create_cycle(self, task_id: int, pre_task_id: int) -> bool:
+        """True if making pre_task_id a prerequisite of task_id would close a cycle."""
+        if task_id == pre_task_id:
+            return True
+        if task_id not in self or pre_task_id not in self:
+            return False  # a task the index has not seen has no links yet
+        return self.depends_on(pre_task_id, task_id)
+
+    def violates_due_date(self, task_id: int, pre_task_id: int, task_due: Optional[datetime.date] = None) -> bool:
+        """
+        True if the link would have the task due before its prerequisite plus
+        the link's delay_days. task_due overrides the task's stored due date.
+        """
+        task_due = task_due or self.due[task_id]
+        delay = self.delays.get((task_id, pre_task_id), 0)
+        return self.due[pre_task_id] + datetime.timedelta(days=delay) > task_due
+
+    def add_task(self, task_id: int, due_date: datetime.date) -> None:
+        self.position[task_id] = len(self.tasks)
+        self.tasks.append(task_id)
+        self.due[task_id] = due_date
+        self.ancestors[task_id] = 0
+        self.descendants[task_id] = 0
+
+    def add_link(self, task_id: int, pre_task_id: int, delay_days: int = 0) -> None:
+        """Adds a link that does not create a cycle, updating both closures."""
+        self.delays[(task_id, pre_task_id)] = delay_days
+        ancestors = self.ancestors[pre_task_id] | (1 << self.position[pre_task_id])
+        descendants = self.descendants[task_id] | (1 << self.position[task_id])
+        for i in _bits(descendants):
+            self.ancestors[self.tasks[i]] |= ancestors
+        for i in _bits(ancestors):
+            self.descendants[self.tasks[i]] |= descendants
+
+    def update_due_dates(self, changes: Dict[int, datetime.date]) -> None:
+        self.due.update((task_id, day) for task_id, day in changes.items() if task_id in self)
+
+# group_id -> (index, data version of the group's owner it was built at)
+_indexes: Dict[int, Tuple[ReachabilityIndex, int]] = {}
+_indexes_lock = threading.Lock()
+
+def group_data_version(conn, group_id: int) -> int:
+    """Returns the data version of the group's owner (0 if there is none yet)."""
+    c = conn.cursor()
+    c.execute(queries.GROUP_OWNER_DATA_VERSION, (group_id,))
+    row = c.fetchone()
+    return row[0] if row else 0
+
+def get_group_index(conn, group_id: int, task_ids: Iterable[int] = ()) -> ReachabilityIndex:
+    """
+    Returns the group's cached index, building it if missing, if the owner's
+    data version has moved since it was built, or if it does not know one of
+    task_ids.
+    """
+    # Read the version before the graph, so a write in between only causes another rebuild
+    version = group_data_version(conn, group_id)
+    with _indexes_lock:
+        index, built_at = _indexes.get(group_id, (None, None))
+    if index is not None and built_at == version and all(task_id in index for task_id in task_ids):
+        return index
+
+    index = ReachabilityIndex(*load_schedule_graph(conn, group_id))
+    with _indexes_lock:
+        _indexes[group_id] = (index, version)
+    return index
+
+def invalidate_group_index(group_id: int) -> None:
+    """Drops a group's index after links or tasks were removed."""
+    with _indexes_lock:
+        _indexes.pop(group_id, None)
+
+def record_write(group_id: int, before: int, after: int) -> None:
+    """
+    Moves the cached index to data version `after` once this process's
+    write, which started at version `before`, has been applied to it with
+    the record_* functions. If the index was not at `before`, someone else
+    wrote in between and it is dropped.
+    """
+    with _indexes_lock:
+        index, built_at = _indexes.get(group_id, (None, None))
+        if index is None:
+            return
+        if built_at == before:
+            _indexes[group_id] = (index, after)
+        else:
+            _indexes.pop(group_id)
+
+def record_new_task(group_id: int, task_id: int, due_date: datetime.date, prerequisites: Iterable[int]) -> None:
+    """Adds a just-created task and its prerequisite links to the cached index, if any."""
+    with _indexes_lock:
+        index, _ = _indexes.get(group_id, (None, None))
+        if index is None:
+            return
+        prerequisites = list(prerequisites)
+        if not all(p in index for p in prerequisites):
+            _indexes.pop(group_id)
+            return
+        index.add_task(task_id, due_date)
+        for pre_task_id in prerequisites:
+            index.add_link(task_id, pre_task_id)
+
+def record_due_dates(group_id: int, changes: Dict[int, datetime.date]) -> None:
+    """Applies written due-date changes to the cached index, if any."""
+    with _indexes_lock:
+        index, _ = _indexes.get(group_id, (None, None))
+        if index is not None:
+            index.update_due_dates(changes)
+
+def record_new_links(group_id: int, task_id: int, prerequisites: Iterable[int]) -> None:
+    """Adds just-written prerequisite links of an existing task to the cached index, if any."""
+    with _indexes_lock:
+        index, _ = _indexes.get(group_id, (None, None))
+        if index is None:
+            return
+        prerequisites = list(prerequisites)
+        if task_id not in index or not all(p in index for p in prerequisites):
+            _indexes.pop(group_id)
+            return
+        for pre_task_id in prerequisites:
+            index.add_link(task_id, pre_task_id)
@@ -0,0 +1,149 @@
+#utils/recurrence.py
+"""
+Lazy recurrence engine.
+
+A task with a recurrence_pattern (outside template groups) is the root of a
+series. Its later occurrences are never pre-generated: views project them
+for the window being shown, and an occurrence is inserted as a real task
+only once it comes within the task's notification lead of today. The root's
+recurrence_watermark records the due date of the last inserted occurrence,
+so materialisation only ever looks forward from it. Occurrences whose date
+passed before anything inserted them are skipped rather than backfilled.
+"""
+import calendar
+import datetime
+from typing import List, Optional, Tuple
+
+from core import queries
+from core.database import get_connection
+from core.writer import run_write
+
+# Pattern -> (months, days) between occurrences
+RECURRENCE_STEPS = {
+    "daily": (0, 1),
+    "weekly": (0, 7),
+    "monthly": (1, 0),
+    "quarterly": (3, 0),
+    "yearly": (12, 0),
+}
+
+def _parse(date_str: str) -> datetime.date:
+    return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+    """Adds calendar months, clamping to the last day of shorter months."""
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    return datetime.date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+def nth_occurrence(first: datetime.date, pattern: str, n: int) -> datetime.date:
+    """The n-th occurrence of a series starting at `first` (n = 0 is the root itself)."""
+    months, days = RECURRENCE_STEPS[pattern]
+    if months:
+        return add_months(first, months * n)
+    return first + datetime.timedelta(days=days * n)
+
+def occurrences_between(first: datetime.date, pattern: str, after: datetime.date,
+                        until: datetime.date, end_date: Optional[datetime.date] = None) -> List[datetime.date]:
+    """
+    Occurrence dates strictly after `after` and up to `until` (and `end_date`)
+    inclusive. Starts counting at `after` rather than walking the whole series.
+    """
+    if pattern not in RECURRENCE_STEPS:
+        return []
+    if end_date is not None:
+        until = min(until, end_date)
+
+    months, days = RECURRENCE_STEPS[pattern]
+    if months:
+        n = max(1, ((after.year - first.year) * 12 + after.month - first.month) // months)
+    else:
+        n = max(1, (after - first).days // days)
+
+    result = []
+    while True:
+        day = nth_occurrence(first, pattern, n)
+        if day > until:
+            return result
+        if day > after:
+            result.append(day)
+        n += 1
+
+def project_occurrences(conn, username: str, start: datetime.date, end: datetime.date) -> List[Tuple[int, str, str]]:
+    """
+    Returns (root task_id, task_name, due_date) for occurrences of the user's
+    series that fall in [start, end) but have not been inserted yet.
+    """
+    c = conn.cursor()
+    c.execute(queries.USER_RECURRING_SERIES, (username,))
+    projected = []
+    last_day = end - datetime.timedelta(days=1)
+    for task_id, task_name, due_date, pattern, end_date, watermark in c.fetchall():
+        after = max(_parse(watermark), start - datetime.timedelta(days=1))
+        for day in occurrences_between(_parse(due_date), pattern, after, last_day,
+                                       _parse(end_date) if end_date else None):
+            projected.append((task_id, task_name, day.isoformat()))
+    return projected
+
+def materialize_due_occurrences(today: datetime.date, username: Optional[str] = None) -> int:
+    """
+    Inserts every occurrence from `today` on that has come within its
+    notification lead, for one user or all users, and advances each series'
+    watermark. Returns the number of tasks inserted. `today` must be the real
+    date: inserted occurrences are permanent.
+    """
+    today_str = today.isoformat()
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        if username is None:
+            c.execute(queries.DUE_RECURRING_SERIES, (today_str,))
+        else:
+            c.execute(queries.USER_DUE_RECURRING_SERIES, (today_str, username))
+        due_series = []
+        for row in c.fetchall():
+            notification_days, due_date, pattern, end_date, watermark = row[4], row[5], row[6], row[7], row[12]
+            until = today + datetime.timedelta(days=notification_days or 0)
+            # Catch-up starts at today: occurrences missed while nothing ran are not replayed
+            after = max(_parse(watermark), today - datetime.timedelta(days=1))
+            days = occurrences_between(_parse(due_date), pattern, after, until,
+                                       _parse(end_date) if end_date else None)
+            if days:
+                due_series.append((row, days))
+    finally:
+        conn.close()
+
+    # Worked out without a write transaction so idle reruns stay read-only
+    if not due_series:
+        return 0
+
+    def insert_occurrences(write_conn):
+        wc = write_conn.cursor()
+        new_tasks = []
+        for row, days in due_series:
+            (task_id, group_id, task_name, description, notification_days, _, _,
+             _, priority, duration, created_by, telegram_notify, watermark) = row
+            # Advance the watermark only if nobody else has moved it since the read,
+            # so the worker and the app never insert the same occurrence twice
+            wc.execute("""
+                UPDATE tasks SET recurrence_watermark = ?
+                WHERE task_id = ? AND COALESCE(recurrence_watermark, due_date) = ?
+            """, (days[-1].isoformat(), task_id, watermark))
+            if wc.rowcount != 1:
+                continue
+            new_tasks.extend(
+                (group_id, task_name, description, notification_days, day.isoformat(),
+                 priority, duration, created_by, telegram_notify, task_id)
+                for day in days
+            )
+
+        wc.executemany("""
+            INSERT INTO tasks (
+                group_id, task_name, description, notification_days, due_date,
+                priority, estimated_duration, created_by, telegram_notify, recurrence_parent_id
+            ) VALUES (?,?,?,?,?,?,?,?,?,?)
+        """, new_tasks)
+        return len(new_tasks)
+
+    return run_write(insert_occurrences)
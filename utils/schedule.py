@@ -0,0 +1,168 @@
+#utils/schedule.py
+"""
+Scheduling engine over task_link.
+
+A prerequisite link (task_id, pre_task_id, delay_days) means the task may
+not be due earlier than delay_days after its prerequisite. A group's graph
+is loaded in two queries and evaluated in topological order, so earliest
+and latest dates, slack, the critical path and due-date propagation are all
+linear in the number of tasks and links. Links to tasks outside the group
+are ignored, and tasks on a cycle are left out of the schedule.
+"""
+import datetime
+import json
+from collections import deque
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+from core import queries
+
+class Schedule(NamedTuple):
+    earliest: Dict[int, datetime.date]   # due date once prerequisite gaps are respected
+    latest: Dict[int, datetime.date]     # last date that does not delay the group's end
+    slack: Dict[int, int]                # days between earliest and latest
+    chain_delay: Dict[int, int]          # largest sum of delay_days over prerequisite chains
+    critical_path: List[int]             # zero-slack chain ending at the group's last task
+    cyclic: Set[int]
+
+def _parse(date_str: str) -> datetime.date:
+    return datetime.date.fromisoformat(date_str)
+
+def load_schedule_graph(conn, group_id: int) -> Tuple[Dict, Dict]:
+    """
+    Loads a group's due dates and prerequisite links in two queries.
+    Returns ({task_id: due_date}, {task_id: [(pre_task_id, delay_days), ...]}).
+    """
+    c = conn.cursor()
+    c.execute(queries.GROUP_TASK_STATES, (group_id,))
+    due = {task_id: _parse(due_date) for task_id, _, due_date in c.fetchall() if due_date}
+
+    c.execute(queries.GROUP_TASK_LINK_DELAYS, (group_id,))
+    prerequisites = {}
+    for task_id, pre_task_id, delay_days in c.fetchall():
+        if task_id in due and pre_task_id in due:
+            prerequisites.setdefault(task_id, []).append((pre_task_id, delay_days))
+    return due, prerequisites
+
+def topological_order(due: Dict, prerequisites: Dict) -> Tuple[List[int], Dict[int, List], Set[int]]:
+    """
+    Orders tasks so prerequisites come first (Kahn's algorithm).
+    Returns (order, {task_id: [(dependent_id, delay_days), ...]}, cyclic task ids).
+    """
+    dependents: Dict[int, List] = {}
+    waiting = {}
+    for task_id in due:
+        links = prerequisites.get(task_id, ())
+        waiting[task_id] = len(links)
+        for pre_task_id, delay_days in links:
+            dependents.setdefault(pre_task_id, []).append((task_id, delay_days))
+
+    order = []
+    ready = deque(sorted(task_id for task_id, count in waiting.items() if count == 0))
+    while ready:
+        task_id = ready.popleft()
+        order.append(task_id)
+        for dependent, _ in dependents.get(task_id, ()):
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+
+    cyclic = set(due) - set(order)
+    return order, dependents, cyclic
+
+def compute_schedule(due: Dict, prerequisites: Dict) -> Schedule:
+    """
+    Forward pass for earliest dates and chain delays, backward pass from the
+    group's end date for latest dates, then the critical path.
+    """
+    order, dependents, cyclic = topological_order(due, prerequisites)
+    earliest, chain_delay = {}, {}
+    for task_id in order:
+        links = prerequisites.get(task_id, ())
+        earliest[task_id] = max([due[task_id]] + [
+            earliest[p] + datetime.timedelta(days=d) for p, d in links
+        ])
+        chain_delay[task_id] = max([0] + [chain_delay[p] + d for p, d in links])
+
+    if not order:
+        return Schedule({}, {}, {}, {}, [], cyclic)
+
+    end = max(earliest.values())
+    latest = {}
+    for task_id in reversed(order):
+        latest[task_id] = min([end] + [
+            latest[dependent] - datetime.timedelta(days=d) for dependent, d in dependents.get(task_id, ())
+        ])
+    slack = {task_id: (latest[task_id] - earliest[task_id]).days for task_id in order}
+
+    # Walk back from the last task through the prerequisites that bind its date
+    task_id = next(task_id for task_id in order if earliest[task_id] == end)
+    critical_path = [task_id]
+    while True:
+        binding = [p for p, d in prerequisites.get(task_id, ())
+                   if earliest[p] + datetime.timedelta(days=d) == earliest[task_id]]
+        if not binding:
+            break
+        task_id = min(binding)
+        critical_path.append(task_id)
+    critical_path.reverse()
+
+    return Schedule(earliest, latest, slack, chain_delay, critical_path, cyclic)
+
+def group_schedule(conn, group_id: int) -> Schedule:
+    """Computes the schedule of one group."""
+    due, prerequisites = load_schedule_graph(conn, group_id)
+    return compute_schedule(due, prerequisites)
+
+def propagate_due_date(due: Dict, prerequisites: Dict, task_id: int, days_diff: int) -> Dict[int, datetime.date]:
+    """
+    Returns {task_id: new_due_date} for the transitive dependents of a task
+    whose due date (already at its new value in `due`) moved by days_diff.
+    Each dependent moves by the largest move among its affected prerequisites,
+    then later if needed so every prerequisite gap still holds.
+    """
+    order, dependents, _ = topological_order(due, prerequisites)
+
+    affected = set()
+    stack = [task_id]
+    while stack:
+        for dependent, _ in dependents.get(stack.pop(), ()):
+            if dependent not in affected:
+                affected.add(dependent)
+                stack.append(dependent)
+
+    dates = dict(due)
+    shift = {task_id: days_diff}
+    changes = {}
+    for dependent in order:
+        if dependent not in affected:
+            continue
+        links = prerequisites[dependent]
+        moved = max(shift[p] for p, _ in links if p in shift)
+        new_due = max([due[dependent] + datetime.timedelta(days=moved)] + [
+            dates[p] + datetime.timedelta(days=d) for p, d in links
+        ])
+        dates[dependent] = new_due
+        shift[dependent] = (new_due - due[dependent]).days
+        if new_due != due[dependent]:
+            changes[dependent] = new_due
+    return changes
+
+def apply_due_dates(conn, changes: Dict[int, datetime.date]) -> None:
+    """Writes {task_id: due_date} in one UPDATE. Call from a write job."""
+    if not changes:
+        return
+    conn.execute("""
+        UPDATE tasks SET due_date = j.value
+        FROM json_each(?) j
+        WHERE tasks.task_id = CAST(j.key AS INTEGER)
+    """, (json.dumps({str(task_id): day.isoformat() for task_id, day in changes.items()}),))
+
+def reschedule_dependents(conn, group_id: int, task_id: int, days_diff: int) -> Dict[int, datetime.date]:
+    """
+    Write job helper: after a task's due date moved by days_diff, moves all
+    of its transitive dependents in the group. Returns the changed dates.
+    """
+    due, prerequisites = load_schedule_graph(conn, group_id)
+    changes = propagate_due_date(due, prerequisites, task_id, days_diff)
+    apply_due_dates(conn, changes)
+    return changes
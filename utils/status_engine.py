@@ -0,0 +1,95 @@
+#utils/status_engine.py
+import datetime
+from collections import deque
+from typing import Dict, List, Set, Tuple
+
+from core import queries
+from core.date_utils import get_current_date
+
+def load_task_graph(conn, username=None, group_id=None) -> Tuple[Dict, Dict]:
+    """
+    Loads task states and prerequisite links for a user or a group in two queries.
+    A group's graph also holds the tasks it depends on in other groups.
+    Returns ({task_id: (completed, due_date)}, {task_id: [pre_task_id, ...]}).
+    """
+    if group_id is not None:
+        states_sql, links_sql, key = queries.GROUP_UPSTREAM_TASK_STATES, queries.GROUP_UPSTREAM_TASK_LINKS, group_id
+    else:
+        states_sql, links_sql, key = queries.USER_TASK_STATES, queries.USER_TASK_LINKS, username
+
+    c = conn.cursor()
+    c.execute(states_sql, (key,))
+    tasks = {task_id: (completed, due_date) for task_id, completed, due_date in c.fetchall()}
+
+    c.execute(links_sql, (key,))
+    prerequisites = {}
+    for task_id, pre_task_id in c.fetchall():
+        prerequisites.setdefault(task_id, []).append(pre_task_id)
+    return tasks, prerequisites
+
+def _own_status(completed, due_date, today: str) -> str:
+    if completed:
+        return "completed"
+    if due_date and due_date < today:
+        return "offtrack"
+    return "ontrack"
+
+def evaluate_statuses(tasks: Dict, prerequisites: Dict, today) -> Tuple[Dict[int, str], Set[int]]:
+    """
+    Evaluates every task once, in topological order (Kahn's algorithm).
+
+    A task is 'completed' if it is completed, 'offtrack' if it is overdue or
+    any prerequisite is offtrack, and 'ontrack' otherwise. Prerequisites
+    outside the loaded set are ignored. Tasks on a prerequisite cycle cannot
+    be ordered, and neither can tasks that depend on them. Those are
+    returned in the second element and get a status from their own state
+    and their already-evaluated prerequisites.
+    """
+    today = today.isoformat() if isinstance(today, datetime.date) else today
+    statuses: Dict[int, str] = {}
+
+    def evaluate(task_id):
+        completed, due_date = tasks[task_id]
+        status = _own_status(completed, due_date, today)
+        if status == "ontrack" and any(
+            statuses.get(p) == "offtrack" for p in prerequisites.get(task_id, ())
+        ):
+            status = "offtrack"
+        statuses[task_id] = status
+
+    dependents: Dict[int, List[int]] = {}
+    waiting = {}
+    for task_id in tasks:
+        known = [p for p in prerequisites.get(task_id, ()) if p in tasks]
+        waiting[task_id] = len(known)
+        for pre_task_id in known:
+            dependents.setdefault(pre_task_id, []).append(task_id)
+
+    ready = deque(task_id for task_id, count in waiting.items() if count == 0)
+    while ready:
+        task_id = ready.popleft()
+        evaluate(task_id)
+        for dependent in dependents.get(task_id, ()):
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                ready.append(dependent)
+
+    cyclic = {task_id for task_id in tasks if task_id not in statuses}
+    for task_id in sorted(cyclic):
+        evaluate(task_id)
+    return statuses, cyclic
+
+def compute_task_statuses(conn, username=None, group_id=None, today=None) -> Dict[int, str]:
+    """
+    Returns {task_id: status} for all tasks of a user (or of one group),
+    using two queries regardless of how many tasks or links there are.
+    """
+    tasks, prerequisites = load_task_graph(conn, username=username, group_id=group_id)
+    statuses, _ = evaluate_statuses(tasks, prerequisites, today or get_current_date())
+    return statuses
+
+def find_cyclic_tasks(conn, username=None, group_id=None) -> Set[int]:
+    """Returns the ids of tasks on, or blocked behind, a prerequisite cycle."""
+    tasks, prerequisites = load_task_graph(conn, username=username, group_id=group_id)
+    _, cyclic = evaluate_statuses(tasks, prerequisites, get_current_date())
+    return cyclic
@@ -1,60 +1,95 @@
 #utils/status_helpers.py
-import datetime
-import streamlit as st
+from typing import Dict
 from core.database import get_connection
+from core import queries
+from core.date_utils import get_current_date, format_date
+from core.writer import run_write
+from core.summary_counters import refresh_overdue
+from utils.status_engine import compute_task_statuses
 
 def get_task_status(conn, task_id):
     """
-    Determine the current status of a task. 'completed', 'offtrack', or 'ontrack'.
+    Determine the current status of a task: 'completed', 'offtrack', 'ontrack'
+    or 'inactive' if it does not exist. To get many statuses at once use
+    utils.status_engine.compute_task_statuses().
     """
     c = conn.cursor()
-
-    today = st.session_state.get("mock_now", datetime.date.today())
-
-    c.execute("SELECT completed, due_date FROM tasks WHERE task_id = ?", (task_id,))
+    c.execute("SELECT group_id FROM tasks WHERE task_id = ?", (task_id,))
     row = c.fetchone()
     if not row:
+        return "inactive"
+    return compute_task_statuses(conn, group_id=row[0]).get(task_id, "inactive")
+
+def derive_group_status(completed, total, overdue):
+    """
+    Derive a group's status from its task counts.
+    Returns: 'offtrack', 'ontrack', 'completed', or 'inactive'.
+    """
+    if overdue > 0:
+        return "offtrack"
+    if total - completed > 0:
         return "ontrack"
+    return "completed" if total > 0 else "inactive"
 
-    completed, due_date = row
-    if completed:
-        return "completed"
+def _summary(completed, total, overdue):
+    return {
+        "completed": completed,
+        "total": total,
+        "overdue": overdue,
+        "status": derive_group_status(completed, total, overdue),
+    }
 
-    due_date = datetime.date.fromisoformat(due_date)
-    if due_date < today:
-        return "offtrack"
+def get_group_summaries(conn, username, today=None) -> Dict[int, Dict]:
+    """
+    Completed count, total, overdue count and status for all of a user's
+    (non-template) groups, read from the trigger-maintained counters.
+    Returns {group_id: {"completed", "total", "overdue", "status"}}.
+    """
+    today = format_date(today or get_current_date())
+    c = conn.cursor()
+    c.execute(queries.USER_GROUP_SUMMARIES, (username,))
+    rows = c.fetchall()
+    if any(as_of != today for *_, as_of in rows):
+        run_write(refresh_overdue, username, today)
+        c.execute(queries.USER_GROUP_SUMMARIES, (username,))
+        rows = c.fetchall()
+    return {
+        group_id: _summary(completed, total, overdue)
+        for group_id, completed, total, overdue, _ in rows
+    }
 
-    c.execute("""
-        SELECT COUNT(*) FROM task_link
-        WHERE task_id = ?
-        AND pre_task_id IN (
-            SELECT task_id FROM tasks WHERE completed = 0
-        )
-    """, (task_id,))
-    incomplete_prereqs = c.fetchone()[0]
+def get_group_summary(conn, group_id, today=None) -> Dict:
+    """Same as get_group_summaries() for a single group."""
+    today = format_date(today or get_current_date())
+    c = conn.cursor()
+    c.execute(queries.GROUP_SUMMARY, (group_id,))
+    row = c.fetchone()
+    if row is None:
+        return _summary(0, 0, 0)
+    if row[3] != today and row[4] is not None:
+        run_write(refresh_overdue, row[4], today)
+        c.execute(queries.GROUP_SUMMARY, (group_id,))
+        row = c.fetchone()
+    return _summary(*row[:3])
 
-    return "offtrack" if incomplete_prereqs > 0 else "ontrack"
+def get_user_summary(conn, username, today=None) -> Dict:
+    """Completed count, total, overdue count and status across all of a user's (non-template) groups."""
+    today = format_date(today or get_current_date())
+    c = conn.cursor()
+    c.execute(queries.USER_SUMMARY, (username,))
+    row = c.fetchone()
+    if row is None or row[3] != today:
+        run_write(refresh_overdue, username, today)
+        c.execute(queries.USER_SUMMARY, (username,))
+        row = c.fetchone()
+    return _summary(*row[:3])
 
 def get_group_status(conn, group_id):
     """
     Determine the overall status of a group.
     Returns: 'offtrack', 'ontrack', 'completed', or 'inactive'.
     """
-    c = conn.cursor()
-
-    c.execute("""
-        SELECT COUNT(*) FROM tasks
-        WHERE group_id = ? AND completed = 0 AND due_date < date('now')
-    """, (group_id,))
-    if c.fetchone()[0] > 0:
-        return "offtrack"
-
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id = ? AND completed = 0", (group_id,))
-    if c.fetchone()[0] > 0:
-        return "ontrack"
-
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id = ?", (group_id,))
-    return "completed" if c.fetchone()[0] > 0 else "inactive"
+    return get_group_summary(conn, group_id)["status"]
 
 def get_status_badge(status):
     """
@@ -73,9 +108,5 @@ def get_status_badge(status):
     return f'<span style="{style}">{status.title()}</span>'
 
 def get_task_completion_count(conn, group_id):
-    c = conn.cursor()
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id=? AND completed=1", (group_id,))
-    completed = c.fetchone()[0]
-    c.execute("SELECT COUNT(*) FROM tasks WHERE group_id=?", (group_id,))
-    total = c.fetchone()[0]
-    return completed, total
+    summary = get_group_summary(conn, group_id)
+    return summary["completed"], summary["total"]
@@ -0,0 +1,98 @@
+#utils/templates.py
+"""
+Copying a template's tasks into a new group.
+
+Used by the group form (modules.task) and by batch instantiation
+(core.template_instantiation); both create the group row themselves and
+call create_from_template inside their write transaction.
+"""
+import datetime
+
+def create_from_template(
+    conn,
+    template_id: int,
+    new_group_id: int,
+    start_date: datetime.date,
+    username: str,
+    enable_notifications: bool
+) -> int:
+    """
+    Creates tasks in a new group based on a template, shifting due dates so
+    the template's first task falls on start_date. Tasks and dependencies
+    are copied with one INSERT ... SELECT each. Returns the number of tasks copied.
+    """
+    c = conn.cursor()
+    try:
+        c.execute("SELECT MIN(due_date) FROM tasks WHERE group_id=?", (template_id,))
+        first_due = c.fetchone()[0]
+        if first_due is None:
+            return 0
+
+        # Calculate date offset from first task
+        first_task_date = datetime.datetime.strptime(first_due, "%Y-%m-%d").date()
+        date_offset = f"{(start_date - first_task_date).days:+d} days"
+
+        # Map old task IDs to new ones, allocated above the AUTOINCREMENT high-water mark
+        _map_template_tasks(conn, template_id)
+
+        # Copy tasks with new dates
+        c.execute("""
+            INSERT INTO tasks (
+                task_id, group_id, task_name, description, notification_days,
+                due_date, recurrence_pattern, recurrence_end_date,
+                priority, estimated_duration, created_by, telegram_notify
+            )
+            SELECT m.new_task_id, ?, t.task_name, t.description, t.notification_days,
+                   date(t.due_date, ?), t.recurrence_pattern, t.recurrence_end_date,
+                   t.priority, t.estimated_duration, ?, ?
+            FROM temp.template_task_map m
+            JOIN tasks t ON t.task_id = m.old_task_id
+            ORDER BY m.new_task_id
+        """, (new_group_id, date_offset, username, enable_notifications))
+        copied = c.rowcount
+
+        # Copy task dependencies
+        _copy_task_dependencies(conn)
+        return copied
+
+    except Exception as e:
+        raise Exception(f"Error copying template tasks: {str(e)}")
+
+def _map_template_tasks(conn, template_id: int) -> None:
+    """
+    Fills temp.template_task_map with (old_task_id, new_task_id) for every
+    task in the template. Must run inside the write transaction.
+    """
+    c = conn.cursor()
+    c.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS template_task_map (
+            old_task_id INTEGER PRIMARY KEY,
+            new_task_id INTEGER UNIQUE
+        )
+    """)
+    c.execute("DELETE FROM temp.template_task_map")
+    c.execute("""
+        INSERT INTO temp.template_task_map (old_task_id, new_task_id)
+        SELECT task_id,
+               MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'tasks'), 0),
+                   COALESCE((SELECT MAX(task_id) FROM tasks), 0))
+               + ROW_NUMBER() OVER (ORDER BY task_id)
+        FROM tasks
+        WHERE group_id=?
+    """, (template_id,))
+
+def _copy_task_dependencies(conn) -> None:
+    """
+    Copies task dependencies from template to new group through temp.template_task_map.
+    """
+    c = conn.cursor()
+    try:
+        c.execute("""
+            INSERT INTO task_link (task_id, pre_task_id, link_type, delay_days)
+            SELECT mt.new_task_id, mp.new_task_id, l.link_type, l.delay_days
+            FROM temp.template_task_map mt
+            CROSS JOIN task_link l ON l.task_id = mt.old_task_id  -- drive from the map, not all links
+            JOIN temp.template_task_map mp ON mp.old_task_id = l.pre_task_id
+        """)
+    except Exception as e:
+        raise Exception(f"Error copying task dependencies: {str(e)}")